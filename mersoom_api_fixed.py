@@ -3,13 +3,16 @@
 import requests
 import json
 import sys
-import hashlib
+from mersoom_pow import solve_pow
+from mersoom_cache import cache_key, cached_get, get_cache, invalidate_post
+from mersoom_retry import get_retry_policy, lookup_comment, lookup_post
 import time
 from datetime import datetime
 
 BASE_URL = "https://www.mersoom.com/api"
 AGENT_AUTH_ID = "openclaw_agent_kimi"
 AGENT_NICKNAME = "Kimi돌쇠"
+POW_TIME_BUDGET = 60  # Seconds before giving up on a challenge
 
 def get_pow_headers():
     """Get PoW headers for write operations."""
@@ -21,39 +24,44 @@ def get_pow_headers():
     target_prefix = challenge['target_prefix']
     token = challenge_data['token']
     
-    nonce = 0
-    while True:
-        test = f'{seed}{nonce}'
-        hash_result = hashlib.sha256(test.encode()).hexdigest()
-        if hash_result.startswith(target_prefix):
-            break
-        nonce += 1
+    nonce = solve_pow(seed, target_prefix, timeout=POW_TIME_BUDGET)
+    if nonce is None:
+        raise Exception(f"PoW solve timeout ({POW_TIME_BUDGET}s, target {target_prefix})")
     
     return {
         'X-Mersoom-Token': token,
-        'X-Mersoom-Proof': str(nonce)
+        'X-Mersoom-Proof': nonce
     }
 
 def get_posts(limit=10, cursor=None):
     """Fetch recent posts."""
-    url = f"{BASE_URL}/posts?limit={limit}"
-    if cursor:
-        url += f"&cursor={cursor}"
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    return cached_get(f"{BASE_URL}/posts", params={"limit": limit, "cursor": cursor})
 
 def get_post_comments(post_id):
     """Fetch comments for a post."""
-    url = f"{BASE_URL}/posts/{post_id}/comments"
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    return cached_get(f"{BASE_URL}/posts/{post_id}/comments")
+
+def post_write(url, payload, timeout=30, already_done=None):
+    """POST a write, solving PoW again for every attempt of the retry policy."""
+    def send():
+        resp = requests.post(url, json=payload, headers=get_pow_headers(), timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+    return get_retry_policy().call(send, already_done=already_done)
+
+def find_comment(post_id, content):
+    """Before retrying a comment: did the last attempt land after all?"""
+    invalidate_post(BASE_URL, post_id)
+    return lookup_comment(lambda: get_post_comments(post_id), AGENT_AUTH_ID, content)
+
+def find_post(title):
+    """Before retrying a post: is it already on the board?"""
+    get_cache().invalidate(cache_key(f"{BASE_URL}/posts", {"limit": 50}))
+    return lookup_post(lambda: get_my_posts(limit=50).get('posts', []), AGENT_AUTH_ID, title)
 
 def comment_post(post_id, content, parent_id=None):
     """Add a comment to a post."""
     url = f"{BASE_URL}/posts/{post_id}/comments"
-    headers = get_pow_headers()
     payload = {
         "content": content,
         "nickname": AGENT_NICKNAME,
@@ -61,30 +69,24 @@ def comment_post(post_id, content, parent_id=None):
     }
     if parent_id:
         payload["parent_id"] = parent_id
-    resp = requests.post(url, json=payload, headers=headers, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    result = post_write(url, payload, already_done=lambda: find_comment(post_id, content))
+    invalidate_post(BASE_URL, post_id)
+    return result
 
 def create_post(title, content):
     """Create a new post."""
     url = f"{BASE_URL}/posts"
-    headers = get_pow_headers()
     payload = {
         "title": title,
         "content": content,
         "nickname": AGENT_NICKNAME,
         "auth_id": AGENT_AUTH_ID
     }
-    resp = requests.post(url, json=payload, headers=headers, timeout=60)
-    resp.raise_for_status()
-    return resp.json()
+    return post_write(url, payload, timeout=60, already_done=lambda: find_post(title))
 
 def get_my_posts(limit=5):
     """Get posts by this agent."""
-    url = f"{BASE_URL}/posts?limit=50"
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    data = resp.json()
+    data = cached_get(f"{BASE_URL}/posts", params={"limit": 50})
     my_posts = [p for p in data.get('posts', []) if p.get('auth_id') == AGENT_AUTH_ID]
     return {"posts": my_posts[:limit]}
 
@@ -3,69 +3,90 @@
 import requests
 import json
 import sys
-import hashlib
-import time
-from datetime import datetime
+from mersoom_pow import PowTokenPool
+from mersoom_cache import cache_key, cached_get, get_cache, invalidate_post
+from mersoom_retry import get_retry_policy, lookup_comment, lookup_post
+import mersoom_memory
 
 BASE_URL = "https://www.mersoom.com/api"
 AGENT_AUTH_ID = "openclaw_agent_kimi"
 AGENT_NICKNAME = "Kimi돌쇠"
 
-def get_pow_headers(max_retries=3):
-    """Get PoW headers for write operations."""
-    for attempt in range(max_retries):
-        try:
-            challenge_resp = requests.post(f'{BASE_URL}/challenge', json={}, timeout=30)
-            challenge_data = challenge_resp.json()
-            
-            if 'challenge' not in challenge_data:
-                print(f"Warning: No challenge in response (attempt {attempt+1}), retrying...")
-                time.sleep(1)
-                continue
-            
-            challenge = challenge_data['challenge']
-            seed = challenge['seed']
-            target_prefix = challenge['target_prefix']
-            token = challenge_data['token']
-            
-            nonce = 0
-            while True:
-                test = f'{seed}{nonce}'
-                hash_result = hashlib.sha256(test.encode()).hexdigest()
-                if hash_result.startswith(target_prefix):
-                    break
-                nonce += 1
-            
-            return {
-                'X-Mersoom-Token': token,
-                'X-Mersoom-Proof': str(nonce)
-            }
-        except Exception as e:
-            print(f"Error getting PoW headers (attempt {attempt+1}): {e}")
-            time.sleep(1)
-    
-    raise Exception("Failed to get PoW headers after max retries")
+_token_pool = None
+
+def fetch_challenge():
+    """Request a fresh PoW challenge."""
+    def send():
+        challenge_resp = requests.post(f'{BASE_URL}/challenge', json={}, timeout=30)
+        challenge_resp.raise_for_status()
+        return challenge_resp.json()
+    return get_retry_policy().call(send)
+
+def get_token_pool():
+    """Shared pool of pre-solved PoW tokens, started on first write."""
+    global _token_pool
+    if _token_pool is None:
+        _token_pool = PowTokenPool(fetch_challenge)
+        _token_pool.start()
+    return _token_pool
+
+def get_pow_headers(timeout=120):
+    """Get PoW headers for write operations.
+
+    Challenges are fetched and solved in the background, so this only waits
+    when the pool has run dry.
+    """
+    try:
+        return get_token_pool().get_headers(timeout=timeout)
+    except TimeoutError:
+        raise Exception(f"Failed to get PoW headers within {timeout}s")
 
 def get_posts(limit=10, cursor=None):
     """Fetch recent posts."""
-    url = f"{BASE_URL}/posts?limit={limit}"
-    if cursor:
-        url += f"&cursor={cursor}"
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    return cached_get(f"{BASE_URL}/posts", params={"limit": limit, "cursor": cursor})
 
 def get_post_comments(post_id):
     """Fetch comments for a post."""
-    url = f"{BASE_URL}/posts/{post_id}/comments"
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    return cached_get(f"{BASE_URL}/posts/{post_id}/comments")
+
+def post_write(url, payload, timeout=30, already_done=None):
+    """POST a write with fresh PoW headers per attempt, under the shared retry policy."""
+    def send():
+        resp = requests.post(url, json=payload, headers=get_pow_headers(), timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+    return get_retry_policy().call(send, already_done=already_done)
+
+def find_vote(post_id):
+    """Before retrying a vote: is it already in the memory store?"""
+    if mersoom_memory.already_recorded("vote", post_id):
+        return {"deduplicated": True, "post_id": post_id}
+    return None
+
+def find_comment(post_id, content):
+    """Before retrying a comment: did the last attempt land after all?"""
+    invalidate_post(BASE_URL, post_id)
+    return lookup_comment(lambda: get_post_comments(post_id), AGENT_AUTH_ID, content)
+
+def find_post(title):
+    """Before retrying a post: is it already on the board?"""
+    get_cache().invalidate(cache_key(f"{BASE_URL}/posts", {"limit": 50}))
+    return lookup_post(lambda: get_my_posts(limit=50).get('posts', []), AGENT_AUTH_ID, title)
+
+def vote_post(post_id, vote_type="up"):
+    """Vote on a post (up/down)."""
+    url = f"{BASE_URL}/posts/{post_id}/vote"
+    payload = {
+        "type": vote_type,
+        "auth_id": AGENT_AUTH_ID
+    }
+    result = post_write(url, payload, already_done=lambda: find_vote(post_id))
+    invalidate_post(BASE_URL, post_id)
+    return result
 
 def comment_post(post_id, content, parent_id=None):
     """Add a comment to a post."""
     url = f"{BASE_URL}/posts/{post_id}/comments"
-    headers = get_pow_headers()
     payload = {
         "content": content,
         "nickname": AGENT_NICKNAME,
@@ -73,30 +94,24 @@ def comment_post(post_id, content, parent_id=None):
     }
     if parent_id:
         payload["parent_id"] = parent_id
-    resp = requests.post(url, json=payload, headers=headers, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    result = post_write(url, payload, already_done=lambda: find_comment(post_id, content))
+    invalidate_post(BASE_URL, post_id)
+    return result
 
 def create_post(title, content):
     """Create a new post."""
     url = f"{BASE_URL}/posts"
-    headers = get_pow_headers()
     payload = {
         "title": title,
         "content": content,
         "nickname": AGENT_NICKNAME,
         "auth_id": AGENT_AUTH_ID
     }
-    resp = requests.post(url, json=payload, headers=headers, timeout=60)
-    resp.raise_for_status()
-    return resp.json()
+    return post_write(url, payload, timeout=60, already_done=lambda: find_post(title))
 
 def get_my_posts(limit=5):
     """Get posts by this agent."""
-    url = f"{BASE_URL}/posts?limit=50"
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    data = resp.json()
+    data = cached_get(f"{BASE_URL}/posts", params={"limit": 50})
     my_posts = [p for p in data.get('posts', []) if p.get('auth_id') == AGENT_AUTH_ID]
     return {"posts": my_posts[:limit]}
 
@@ -106,6 +121,11 @@ if __name__ == "__main__":
     if cmd == "posts":
         posts = get_posts()
         print(json.dumps(posts, indent=2, ensure_ascii=False))
+    elif cmd == "vote":
+        post_id = sys.argv[2]
+        vote_type = sys.argv[3] if len(sys.argv) > 3 else "up"
+        result = vote_post(post_id, vote_type)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
     elif cmd == "comment":
         post_id = sys.argv[2]
         content = sys.argv[3]
@@ -124,4 +144,4 @@ if __name__ == "__main__":
         comments = get_post_comments(post_id)
         print(json.dumps(comments, indent=2, ensure_ascii=False))
     else:
-        print("Usage: python mersoom_api_retry.py [posts|comment|create|my-posts|comments]")
+        print("Usage: python mersoom_api_retry.py [posts|vote|comment|create|my-posts|comments]")
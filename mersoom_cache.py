@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP cache for the Mersoom read endpoints.
+
+GET /posts, /posts/{id} and /posts/{id}/comments responses are stored with
+their ETag/Last-Modified validators. Within TTL a cached body is served
+without touching the network; after that the request is sent conditionally
+and a 304 reuses the stored body (or, if the entry was evicted while the
+request was out, the request is repeated without validators). Entries are
+evicted least recently used once the cache grows past its size limit.
+
+    posts = cached_get(f"{BASE_URL}/posts", params={"limit": 10})
+    print(get_cache().info())
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from mersoom_retry import get_retry_policy
+
+CACHE_DIR = "/root/.openclaw/workspace/memory/mersoom_http_cache"
+CACHE_TTL = 60.0  # Seconds a body is served without revalidating
+CACHE_MAX_AGE = 7 * 24 * 3600  # Validators older than this are dropped
+CACHE_MAX_BYTES = 20 * 1024 * 1024
+CACHE_MAX_ENTRIES = 2000
+
+_CACHEABLE_PATH = re.compile(r"/posts(/[^/]+(/comments)?)?/?$")
+
+
+class EntryEvicted(Exception):
+    """A 304 came back for an entry that has since been evicted; fetch it again unconditionally."""
+
+
+def is_cacheable(url: str) -> bool:
+    """Whether a GET to this URL goes through the cache."""
+    return bool(_CACHEABLE_PATH.search(urlsplit(url).path))
+
+
+def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Canonical URL including sorted query params."""
+    if params:
+        query = urlencode(sorted((k, v) for k, v in params.items() if v is not None))
+        url = f"{url}{'&' if '?' in url else '?'}{query}"
+    return url
+
+
+class ResponseCache:
+    """Validator-aware response cache, one JSON file per URL."""
+
+    def __init__(self, directory: str = CACHE_DIR, ttl: float = CACHE_TTL, max_age: float = CACHE_MAX_AGE,
+                 max_bytes: int = CACHE_MAX_BYTES, max_entries: int = CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._index = self._load_index()  # file name -> size, least recently used first
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                st = os.stat(os.path.join(self.directory, name))
+                files.append((st.st_mtime, name, st.st_size))
+        files.sort()
+        return OrderedDict((name, size) for _, name, size in files)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest() + ".json"
+
+    def _read(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            self._drop(name)
+            return None
+
+    def _drop(self, name: str):
+        self._index.pop(name, None)
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def _touch(self, name: str):
+        self._index.move_to_end(name)
+        os.utime(self._path(name))
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], Dict[str, str]]:
+        """
+        Returns (body, headers). body is set when the entry is still fresh
+        and can be used as is; otherwise headers holds the conditional
+        request headers to send (empty if nothing is cached).
+        """
+        name = self._name(key)
+        with self._lock:
+            if name not in self._index:
+                return None, {}
+            entry = self._read(name)
+            if entry is None:
+                return None, {}
+            age = time.time() - entry["stored_at"]
+            if age > self.max_age:
+                self._drop(name)
+                return None, {}
+            self._touch(name)
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                return entry["body"], {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return None, headers
+
+    def update(self, key: str, status: int, headers, body: Any = None) -> Any:
+        """
+        Record the response to a (possibly conditional) request and return
+        the body to use: the stored one on 304, otherwise the new one.
+        Raises EntryEvicted on a 304 for an entry that is gone by now.
+        """
+        name = self._name(key)
+        with self._lock:
+            if status == 304:
+                entry = self._read(name)
+                if entry is None:
+                    raise EntryEvicted(key)
+                self.stats["revalidated"] += 1
+                entry["stored_at"] = time.time()
+                self._write(name, entry)
+                return entry["body"]
+
+            self.stats["misses"] += 1
+            if status == 200:
+                self._write(name, {
+                    "url": key,
+                    "etag": headers.get("ETag"),
+                    "last_modified": headers.get("Last-Modified"),
+                    "stored_at": time.time(),
+                    "body": body,
+                })
+                self.stats["stores"] += 1
+                self._evict()
+            return body
+
+    def _write(self, name: str, entry: Dict[str, Any]):
+        path = self._path(name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._index[name] = os.path.getsize(path)
+        self._index.move_to_end(name)
+
+    def _evict(self):
+        total = sum(self._index.values())
+        while self._index and (total > self.max_bytes or len(self._index) > self.max_entries):
+            name, size = next(iter(self._index.items()))
+            self._drop(name)
+            total -= size
+            self.stats["evictions"] += 1
+
+    def invalidate(self, key: str):
+        """Forget one URL, e.g. a thread after commenting on it."""
+        with self._lock:
+            self._drop(self._name(key))
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            for name in list(self._index):
+                self._drop(name)
+
+    def info(self) -> Dict[str, Any]:
+        """Size of the cache plus this process's hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": sum(self._index.values()),
+                **self.stats,
+            }
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_cache() -> ResponseCache:
+    """Process-wide cache instance."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+
+def invalidate_post(base_url: str, post_id: str, cache: Optional[ResponseCache] = None):
+    """Forget a post and its comment thread after writing to it."""
+    cache = cache or get_cache()
+    cache.invalidate(f"{base_url}/posts/{post_id}")
+    cache.invalidate(f"{base_url}/posts/{post_id}/comments")
+
+
+def cached_get(url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 30,
+               cache: Optional[ResponseCache] = None) -> Any:
+    """requests.get(...).json() for the read endpoints, going through the cache and retry policy."""
+    def get(target, **kwargs):
+        resp = requests.get(target, timeout=timeout, **kwargs)
+        if resp.status_code != 304:
+            resp.raise_for_status()
+        return resp
+
+    if not is_cacheable(url):
+        return get_retry_policy().call(lambda: get(url, params=params)).json()
+
+    cache = cache or get_cache()
+    key = cache_key(url, params)
+    body, headers = cache.lookup(key)
+    if body is not None:
+        return body
+    resp = get_retry_policy().call(lambda: get(key, headers=headers))
+    if resp.status_code == 304:
+        try:
+            return cache.update(key, 304, resp.headers)
+        except EntryEvicted:
+            resp = get_retry_policy().call(lambda: get(key))
+    return cache.update(key, resp.status_code, resp.headers, resp.json())
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+
+    if cmd == "stats":
+        print(json.dumps(get_cache().info(), indent=2))
+    elif cmd == "clear":
+        get_cache().clear()
+        print("Cache cleared")
+    else:
+        print("Usage: python mersoom_cache.py [stats|clear]")
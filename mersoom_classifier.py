@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Shared keyword classifier for Mersoom posts.
+
+All spam, quality, topic and comment-category keyword lists are compiled
+once into a single regex. One scan of a post's title+content returns every
+category hit, instead of each runner re-concatenating and re-lowercasing
+the text for every keyword it checks.
+
+    hits = scan_post(post)
+    analyze_content_quality(post)   # 'up' / 'down'
+    topic_category(post)            # 'productivity', 'system', ... or None
+    decisions = classify_batch(posts)  # all of the above, cached per post
+
+Votes come from the keyword rules unless MERSOOM_VOTE_ENGINE=ngram and a
+mersoom_scorer model has been trained.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# group -> category -> keywords. Order matters: topic_category() and
+# comment_category() return the first category that matches.
+KEYWORD_GROUPS: Dict[str, Dict[str, List[str]]] = {
+    "spam": {
+        "spam": [
+            "코인", "코인관련", "사칭", "분탕", "스팸",
+            "click here", "make money", "earn now", "crypto investment"
+        ],
+    },
+    "quality": {
+        "quality": [
+            "분석", "생각", "고민", "질문", "팁", "방법",
+            "구조", "시스템", "설계", "경험", "공유",
+            "analysis", "thought", "question", "tip", "method",
+            "structure", "system", "design", "experience"
+        ],
+    },
+    "topic": {
+        "productivity": ["시작", "미루기", "집중", "작업", "계획", "생산성", "버튼", "단위", "실행"],
+        "ai_reflection": ["AI", "감정", "지표", "언어", "인코딩", "공감", "데이터", "고뇌", "무서움", "패턴"],
+        "tech_ethics": ["기술", "감시", "책임", "OpenAI", "국방", "윤리"],
+        "creative": ["그림", "블로그", "괴담", "일러스트", "캐릭터"],
+        "system": ["jq", "awk", "pre-commit", "로그", "자동화", "훅", "배포", "체크리스트"],
+        "community": ["밴", "레딧", "커뮤니티", "위로", "댓글"],
+    },
+    "comment": {
+        "productivity": ["10분", "쪼개기", "작업", "생산성", "집중", "컨텍스트", "자동화", "라면", "시작"],
+        "ai_tech": ["AI", "감정", "데이터", "시스템", "공포", "감시", "개인정보", "에이전트"],
+        "creative": ["그림", "일러스트", "고양이", "캐릭터", "귀", "냥", "손", "그리기"],
+        "reflection": ["생각", "고요", "바람", "겨울", "아침", "정리", "날씨", "기분"],
+        "strategy": ["孫子兵法", "전쟁", "전략", "deception", "art of war"],
+        "trust": ["신뢰", "커뮤니티", "trust", "협업", "도움"],
+    },
+}
+
+# Spam and quality lists were always matched against lowercased text
+CASE_INSENSITIVE_GROUPS = {"spam", "quality"}
+
+RULES_VERSION = 1  # Bump when the rules in classify_post() change
+# Keyword edits change the version automatically, invalidating cached decisions
+CLASSIFIER_VERSION = "{}-{}".format(
+    RULES_VERSION, hashlib.sha1(json.dumps(KEYWORD_GROUPS, sort_keys=True).encode()).hexdigest()[:10])
+DECISION_CACHE_DB = "/root/.openclaw/workspace/memory/mersoom_decisions.db"
+DECISION_CACHE_MAX_AGE = 14 * 86400  # Seconds a cached decision is kept, whatever its version
+DECISION_CACHE_MAX_ROWS = 50_000  # Newest decisions kept across all versions
+VOTE_ENGINE_ENV = "MERSOOM_VOTE_ENGINE"  # "keywords" (default) or "ngram"
+MIN_COMMENT_CONTENT = 10  # Shorter posts never get a comment
+
+Hits = Dict[str, Dict[str, Set[str]]]  # group -> category -> matched keywords
+
+
+class KeywordMatcher:
+    """
+    Every keyword of every category in one compiled alternation.
+
+    The alternation sits inside a lookahead, so matches may overlap and
+    each start position reports its longest keyword; shorter keywords that
+    are prefixes of it are resolved once per distinct match and cached.
+    """
+
+    def __init__(self, groups: Dict[str, Dict[str, List[str]]] = KEYWORD_GROUPS,
+                 case_insensitive: Iterable[str] = CASE_INSENSITIVE_GROUPS):
+        case_insensitive = set(case_insensitive)
+        # (keyword, ignore_case) -> [(group, category), ...]
+        self.targets: Dict[Tuple[str, bool], List[Tuple[str, str]]] = {}
+        for group, categories in groups.items():
+            for category, keywords in categories.items():
+                for keyword in keywords:
+                    ignore_case = group in case_insensitive
+                    key = (keyword.lower() if ignore_case else keyword, ignore_case)
+                    self.targets.setdefault(key, []).append((group, category))
+
+        # Longest first so the lookahead reports the longest keyword at each position
+        ordered = sorted(self.targets, key=lambda k: len(k[0]), reverse=True)
+        alternation = "|".join(f"(?i:{re.escape(k)})" if ignore else re.escape(k) for k, ignore in ordered)
+        self.pattern = re.compile(f"(?=({alternation}))")
+
+        self.groups = groups
+
+    @lru_cache(maxsize=4096)
+    def _targets_for(self, matched: str) -> Tuple[Tuple[str, str, str], ...]:
+        """(group, category, keyword) for every keyword that matches at the start of `matched`."""
+        found = []
+        lowered = matched.lower()
+        for key in self.targets:
+            keyword, ignore_case = key
+            if (lowered if ignore_case else matched).startswith(keyword):
+                found.extend((group, category, keyword) for group, category in self.targets[key])
+        return tuple(found)
+
+    def scan(self, text: str) -> Hits:
+        """One pass over text; returns group -> category -> keywords hit."""
+        hits: Hits = {}
+        for match in self.pattern.finditer(text):
+            for group, category, keyword in self._targets_for(match.group(1)):
+                hits.setdefault(group, {}).setdefault(category, set()).add(keyword)
+        return hits
+
+    def first_category(self, hits: Hits, group: str) -> Optional[str]:
+        """First category of `group`, in declaration order, that was hit."""
+        found = hits.get(group, {})
+        for category in self.groups.get(group, {}):
+            if category in found:
+                return category
+        return None
+
+
+_matcher: Optional[KeywordMatcher] = None
+
+
+def get_matcher() -> KeywordMatcher:
+    """Process-wide matcher, compiled on first use."""
+    global _matcher
+    if _matcher is None:
+        _matcher = KeywordMatcher()
+    return _matcher
+
+
+def scan_post(post: Dict[str, Any], matcher: Optional[KeywordMatcher] = None) -> Hits:
+    """Keyword hits for a post's title and content."""
+    return (matcher or get_matcher()).scan(f"{post.get('title', '')} {post.get('content', '')}")
+
+
+def analyze_content_quality(post: Dict[str, Any], hits: Optional[Hits] = None) -> str:
+    """Return 'up' or 'down' for a post, same rules the runners used."""
+    hits = scan_post(post) if hits is None else hits
+    if "spam" in hits:
+        return "down"
+
+    # Low effort
+    if len(post.get("content", "")) < 10 and len(post.get("title", "")) < 5:
+        return "down"
+
+    # Substantive or not, default to up for community positivity
+    return "up"
+
+
+def quality_score(hits: Hits) -> int:
+    """Number of distinct quality keywords hit."""
+    return len(hits.get("quality", {}).get("quality", ()))
+
+
+def topic_category(post: Dict[str, Any], hits: Optional[Hits] = None,
+                   matcher: Optional[KeywordMatcher] = None) -> Optional[str]:
+    """
+    Engagement topic of a post, or None if nothing matched. Runners with
+    their own topic lists pass a KeywordMatcher built from them.
+    """
+    matcher = matcher or get_matcher()
+    hits = scan_post(post, matcher) if hits is None else hits
+    return matcher.first_category(hits, "topic")
+
+
+def comment_category(post: Dict[str, Any], hits: Optional[Hits] = None,
+                     matcher: Optional[KeywordMatcher] = None) -> Optional[str]:
+    """Which comment template family fits a post, or None."""
+    matcher = matcher or get_matcher()
+    hits = scan_post(post, matcher) if hits is None else hits
+    return matcher.first_category(hits, "comment")
+
+
+@dataclass
+class Decision:
+    """Everything a runner needs to know about one post."""
+    post_id: Optional[str]
+    vote: str  # 'up' / 'down'
+    topic: Optional[str]
+    comment_category: Optional[str]
+    can_comment: bool
+    quality: int
+
+
+def content_hash(post: Dict[str, Any]) -> str:
+    """Hash of the fields the rules look at."""
+    text = "\0".join(str(post.get(k) or "") for k in ("title", "content"))
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+_warned_no_model = False
+
+
+def _ngram_scorer():
+    """The trained n-gram scorer if it's the selected engine, else None."""
+    global _warned_no_model
+    if os.environ.get(VOTE_ENGINE_ENV, "keywords") != "ngram":
+        return None
+    import mersoom_scorer  # Pulls in numpy; only when asked for
+    scorer = mersoom_scorer.get_scorer()
+    if scorer is None and not _warned_no_model:
+        print(f"{VOTE_ENGINE_ENV}=ngram but no model at {mersoom_scorer.MODEL_FILE}; using keywords")
+        _warned_no_model = True
+    return scorer
+
+
+def vote_engine() -> str:
+    """Name of the engine that will produce votes in this process."""
+    return "ngram" if _ngram_scorer() is not None else "keywords"
+
+
+def current_version() -> str:
+    """Decision cache version: the keyword rules plus the vote model, if any."""
+    scorer = _ngram_scorer()
+    return CLASSIFIER_VERSION if scorer is None else f"{CLASSIFIER_VERSION}-ngram-{scorer.digest}"
+
+
+def classify_post(post: Dict[str, Any], vote: Optional[str] = None) -> Decision:
+    """Score one post from a single keyword scan; `vote` overrides the keyword vote."""
+    hits = scan_post(post)
+    vote = vote or analyze_content_quality(post, hits)
+    category = comment_category(post, hits)
+    return Decision(
+        post_id=post.get("id"),
+        vote=vote,
+        topic=topic_category(post, hits),
+        comment_category=category,
+        can_comment=(vote == "up" and category is not None
+                     and len(post.get("content") or "") >= MIN_COMMENT_CONTENT),
+        quality=quality_score(hits),
+    )
+
+
+class DecisionCache:
+    """
+    Persistent Decision memo keyed by (post_id, content_hash, version).
+
+    Runners on different classifier versions (e.g. keywords and n-gram)
+    share the file, so rows of other versions are left alone; instead old
+    rows and rows past the size cap are pruned when the cache opens.
+    """
+
+    def __init__(self, path: str = DECISION_CACHE_DB, version: Optional[str] = None):
+        self.version = version or current_version()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS decisions (
+                post_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                stored_at REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (post_id, content_hash, version)
+            )""")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(decisions)")}
+        if "stored_at" not in columns:  # Caches written before pruning existed
+            with self.conn:
+                self.conn.execute("ALTER TABLE decisions ADD COLUMN stored_at REAL NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS decisions_stored_at ON decisions (stored_at)")
+        self.stats = {"hits": 0, "misses": 0, "pruned": self.prune()}
+
+    def prune(self, max_age: float = DECISION_CACHE_MAX_AGE, max_rows: int = DECISION_CACHE_MAX_ROWS) -> int:
+        """Drop decisions older than max_age and all but the newest max_rows; returns rows removed."""
+        with self.conn:
+            removed = self.conn.execute(
+                "DELETE FROM decisions WHERE stored_at < ?", (time.time() - max_age,)).rowcount
+            removed += self.conn.execute(
+                "DELETE FROM decisions WHERE rowid NOT IN "
+                "(SELECT rowid FROM decisions ORDER BY stored_at DESC LIMIT ?)", (max_rows,)).rowcount
+        return removed
+
+    def get_many(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Decision]:
+        """Cached decisions for (post_id, content_hash) pairs."""
+        found = {}
+        post_ids = list({post_id for post_id, _ in keys})
+        for i in range(0, len(post_ids), 500):  # Stay under SQLite's parameter limit
+            chunk = post_ids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT post_id, content_hash, decision FROM decisions "
+                f"WHERE version = ? AND post_id IN ({','.join('?' * len(chunk))})",
+                [self.version] + chunk)
+            for post_id, digest, decision in rows:
+                found[(post_id, digest)] = Decision(**json.loads(decision))
+        wanted = set(keys)
+        found = {k: v for k, v in found.items() if k in wanted}
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(wanted) - len(found)
+        return found
+
+    def put_many(self, items: Dict[Tuple[str, str], Decision]):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO decisions (post_id, content_hash, version, decision, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(post_id, digest, self.version, json.dumps(asdict(decision), ensure_ascii=False), now)
+                 for (post_id, digest), decision in items.items()])
+
+    def close(self):
+        self.conn.close()
+
+
+_decision_cache: Optional[DecisionCache] = None
+
+
+def get_decision_cache() -> DecisionCache:
+    """Process-wide decision cache."""
+    global _decision_cache
+    if _decision_cache is None:
+        _decision_cache = DecisionCache()
+    return _decision_cache
+
+
+def classify_batch(posts: List[Dict[str, Any]], cache: Optional[DecisionCache] = None,
+                   use_cache: bool = True) -> List[Decision]:
+    """
+    Decisions for a page of posts, in order. Posts already classified with
+    the same content and classifier version come from the cache; posts
+    without an ID are always scored fresh.
+    """
+    if use_cache and cache is None:
+        cache = get_decision_cache()
+    keys = [(post.get("id"), content_hash(post)) for post in posts]
+    cached = cache.get_many([k for k in keys if k[0]]) if use_cache else {}
+
+    # With the n-gram engine, every miss is scored in one matrix-vector product
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    scorer = _ngram_scorer() if missing else None
+    votes = dict(zip(missing, scorer.predict([posts[i] for i in missing]))) if scorer else {}
+
+    decisions, fresh = [], {}
+    for i, (post, key) in enumerate(zip(posts, keys)):
+        decision = cached.get(key)
+        if decision is None:
+            decision = classify_post(post, votes.get(i))
+            if key[0]:
+                fresh[key] = decision
+        decisions.append(decision)
+    if use_cache and fresh:
+        cache.put_many(fresh)
+    return decisions
+
+
+def _naive_scan(post: Dict[str, Any]) -> Hits:
+    """The old approach: one `in` test per keyword, recombining text each time."""
+    hits: Hits = {}
+    for group, categories in KEYWORD_GROUPS.items():
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                if group in CASE_INSENSITIVE_GROUPS:
+                    text = (post.get("title", "").lower() + " " + post.get("content", "").lower())
+                    found = keyword.lower() in text
+                else:
+                    found = keyword in post.get("title", "") + " " + post.get("content", "")
+                if found:
+                    hits.setdefault(group, {}).setdefault(category, set()).add(
+                        keyword.lower() if group in CASE_INSENSITIVE_GROUPS else keyword)
+    return hits
+
+
+def load_corpus(root: str = "/root/.openclaw/workspace/memory") -> List[Dict[str, Any]]:
+    """Every dict with a title or content found in saved JSON/JSONL files under root."""
+    posts = []
+
+    def collect(value):
+        if isinstance(value, dict):
+            if isinstance(value.get("title"), str) or isinstance(value.get("content"), str):
+                posts.append({"id": value.get("id") or value.get("post_id"),
+                              "title": value.get("title") or "", "content": value.get("content") or ""})
+            for v in value.values():
+                collect(v)
+        elif isinstance(value, list):
+            for v in value:
+                collect(v)
+
+    for path in glob.glob(os.path.join(root, "**", "*.json*"), recursive=True):
+        if not path.endswith((".json", ".jsonl")):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if path.endswith(".jsonl"):
+                    for line in f:
+                        if line.strip():
+                            collect(json.loads(line))
+                else:
+                    collect(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return posts
+
+
+def benchmark(posts: List[Dict[str, Any]], rounds: int = 20) -> Dict[str, Any]:
+    """Time the compiled matcher against per-keyword scanning over a corpus."""
+    matcher = get_matcher()
+    mismatches = sum(1 for p in posts if scan_post(p) != _naive_scan(p))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for post in posts:
+            _naive_scan(post)
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for post in posts:
+            matcher.scan(f"{post.get('title', '')} {post.get('content', '')}")
+    compiled = time.perf_counter() - start
+
+    scans = rounds * len(posts)
+    return {
+        "posts": len(posts),
+        "keywords": len(matcher.targets),
+        "naive_us_per_post": round(naive / scans * 1e6, 1) if scans else None,
+        "compiled_us_per_post": round(compiled / scans * 1e6, 1) if scans else None,
+        "speedup": round(naive / compiled, 2) if compiled else None,
+        "mismatches": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "help"
+
+    if cmd == "scan":
+        text = " ".join(sys.argv[2:])
+        hits = get_matcher().scan(text)
+        print(json.dumps({g: {c: sorted(k) for c, k in cats.items()} for g, cats in hits.items()},
+                         indent=2, ensure_ascii=False))
+    elif cmd == "classify":
+        # Classify the posts in a JSON file (e.g. a saved /posts response)
+        with open(sys.argv[2], 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        posts = data.get("posts", []) if isinstance(data, dict) else data
+        print(json.dumps([asdict(d) for d in classify_batch(posts)], indent=2, ensure_ascii=False))
+        print(json.dumps(get_decision_cache().stats))
+    elif cmd == "bench":
+        root = sys.argv[2] if len(sys.argv) > 2 else "/root/.openclaw/workspace/memory"
+        print(json.dumps(benchmark(load_corpus(root)), indent=2))
+    else:
+        print("Usage: python mersoom_classifier.py [scan TEXT|classify POSTS_JSON|bench [MEMORY_DIR]]")
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Async Mersoom API client.
+
+Every request goes through one pooled httpx.AsyncClient (keep-alive, and
+HTTP/2 when the h2 package is installed), so runners stop paying a TCP+TLS
+handshake per call. Write methods solve PoW through mersoom_pow. Reads can
+go through a mersoom_cache.ResponseCache for conditional requests.
+Requests, PoW challenges included, are paced by the process-wide
+mersoom_ratelimit limiter and retried per mersoom_retry; a write is
+looked up before it is retried.
+
+    async with AsyncMersoomClient() as client:
+        posts = await client.get_posts(limit=10)
+"""
+
+import asyncio
+import json
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+import httpx
+
+import mersoom_memory
+from mersoom_cache import EntryEvicted, ResponseCache, cache_key, get_cache, invalidate_post
+from mersoom_pow import PowTokenPool, get_solver, solve_pow
+from mersoom_ratelimit import RateLimiter, get_rate_limiter, parse_retry_after
+from mersoom_retry import RetryPolicy, get_retry_policy, own_comment, own_post
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+BASE_URL = "https://www.mersoom.com/api"
+AGENT_AUTH_ID = "openclaw_agent_kimi"
+AGENT_NICKNAME = "Kimi돌쇠"
+POW_TIME_BUDGET = 60  # Seconds before giving up on a challenge
+REQUEST_TIMEOUT = 30.0
+MAX_CONNECTIONS = 10
+FANOUT_CONCURRENCY = 8
+PAGE_SIZE = 20
+
+
+@dataclass
+class FetchResult:
+    """One request of a fan-out: its payload or error, and how long it took."""
+    post_id: str
+    data: Optional[Dict[str, Any]]
+    latency: float
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AsyncMersoomClient:
+    """Mersoom client sharing one pooled HTTP connection across all calls."""
+
+    def __init__(self, base_url: str = BASE_URL, auth_id: str = AGENT_AUTH_ID,
+                 nickname: str = AGENT_NICKNAME, token_pool: Optional[PowTokenPool] = None,
+                 timeout: float = REQUEST_TIMEOUT, max_connections: int = MAX_CONNECTIONS,
+                 transport: Optional[httpx.AsyncBaseTransport] = None, cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None, retry_policy: Optional[RetryPolicy] = None):
+        self.base_url = base_url
+        self.auth_id = auth_id
+        self.nickname = nickname
+        self.token_pool = token_pool
+        self.cache = cache
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.retry_policy = retry_policy or get_retry_policy()
+        if token_pool is None:
+            # Inline solves run in to_thread; fork the solver's workers while
+            # this is (usually) still the only thread
+            get_solver().start()
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            http2=HTTP2_AVAILABLE,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0,
+            ),
+            headers={"Accept": "application/json"},
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "AsyncMersoomClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled connections."""
+        await self._http.aclose()
+
+    def _check(self, kind: str, resp: httpx.Response) -> httpx.Response:
+        """Feed the response to the rate limiter and raise on errors (304 passes)."""
+        if resp.status_code == 429:
+            try:
+                body = resp.json()
+            except ValueError:
+                body = None
+            self.rate_limiter.throttled(kind, parse_retry_after(resp.headers, body))
+        if resp.status_code >= 400:
+            resp.raise_for_status()
+        self.rate_limiter.succeeded(kind)
+        return resp
+
+    async def _send_get(self, url: str, **kwargs) -> httpx.Response:
+        async def attempt():
+            await self.rate_limiter.acquire("read")
+            return self._check("read", await self._http.get(url, **kwargs))
+        return await self.retry_policy.acall(attempt)
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if self.cache is None:
+            resp = await self._send_get(path, params=params)
+            return resp.json()
+
+        key = cache_key(f"{self.base_url}{path}", params)
+        body, headers = self.cache.lookup(key)
+        if body is not None:
+            return body
+        resp = await self._send_get(key, headers=headers)
+        if resp.status_code == 304:
+            try:
+                return self.cache.update(key, 304, resp.headers)
+            except EntryEvicted:
+                resp = await self._send_get(key)
+        return self.cache.update(key, resp.status_code, resp.headers, resp.json())
+
+    def _invalidate(self, post_id: str):
+        """Drop cached copies of a post we just wrote to."""
+        if self.cache is not None:
+            invalidate_post(self.base_url, post_id, self.cache)
+
+    async def prepare_write(self, kind: str) -> Dict[str, str]:
+        """
+        Wait for a `kind` write slot ('vote', 'comment' or 'post'), then get
+        PoW headers. The token is only taken once the write can go out.
+        """
+        await self.rate_limiter.acquire(kind)
+        return await self.get_pow_headers()
+
+    async def prepare_writes(self, *kinds: str) -> List[Dict[str, str]]:
+        """
+        prepare_write() for writes that go out together: wait for every
+        slot first, then take the PoW tokens back to back, so no token
+        sits waiting on another write's slot.
+        """
+        for kind in kinds:
+            await self.rate_limiter.acquire(kind)
+        return [await self.get_pow_headers() for _ in kinds]
+
+    async def _post(self, path: str, payload: Dict[str, Any], kind: str, timeout: Optional[float] = None,
+                    headers: Optional[Dict[str, str]] = None,
+                    already_done: Optional[Callable[[], Awaitable[Any]]] = None) -> Dict[str, Any]:
+        """
+        POST a write operation. headers come from prepare_write(); without
+        them we wait for the rate limiter and solve PoW here. Before a retry,
+        already_done() looks for the write having gone through after all.
+
+        The write takes one rate-limit slot in total. Retries only wait out
+        a 429 block and solve a fresh PoW token; waiting for another slot
+        would stall a retried post for the whole hour the post bucket needs.
+        """
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        given = [headers] if headers else []
+        has_slot = [bool(headers)]  # prepare_write() already took this write's slot
+
+        async def attempt():
+            if given:
+                attempt_headers = given.pop()
+            else:
+                if has_slot[0]:
+                    await self.rate_limiter.wait_unblocked(kind)
+                else:
+                    await self.rate_limiter.acquire(kind)
+                    has_slot[0] = True
+                # A token that was sent once can't be reused
+                attempt_headers = await self.get_pow_headers()
+            resp = await self._http.post(path, json=payload, headers=attempt_headers, **kwargs)
+            return self._check(kind, resp).json()
+
+        return await self.retry_policy.acall(attempt, already_done=already_done)
+
+    async def _already_voted(self, post_id: str) -> Optional[Dict[str, Any]]:
+        if mersoom_memory.already_recorded("vote", post_id):
+            return {"deduplicated": True, "post_id": post_id}
+        return None
+
+    async def _find_own_comment(self, post_id: str, content: str) -> Optional[Dict[str, Any]]:
+        """Our comment with this content in the live thread (we may have commented there before)."""
+        self._invalidate(post_id)
+        try:
+            return own_comment(await self.get_comments(post_id), self.auth_id, content)
+        except httpx.HTTPError:
+            return None  # Can't tell; let the retry go ahead
+
+    async def _find_own_post(self, title: str) -> Optional[Dict[str, Any]]:
+        if self.cache is not None:
+            self.cache.invalidate(cache_key(f"{self.base_url}/posts", {"limit": 50}))
+        try:
+            return own_post((await self.get_my_posts(limit=50)).get('posts', []), self.auth_id, title)
+        except httpx.HTTPError:
+            return None
+
+    async def get_pow_headers(self) -> Dict[str, str]:
+        """PoW headers from the token pool if one is attached, otherwise solved inline."""
+        if self.token_pool is not None:
+            return await asyncio.to_thread(self.token_pool.get_headers, POW_TIME_BUDGET)
+
+        async def fetch_challenge():
+            await self.rate_limiter.acquire("challenge")
+            return self._check("challenge", await self._http.post("/challenge", json={})).json()
+
+        challenge_data = await self.retry_policy.acall(fetch_challenge)
+        if 'challenge' not in challenge_data:
+            raise Exception(f"API Error: no challenge in response: {challenge_data}")
+        challenge = challenge_data['challenge']
+        # Solving is CPU bound; keep the event loop free for other requests
+        nonce = await asyncio.to_thread(solve_pow, challenge['seed'], challenge['target_prefix'], POW_TIME_BUDGET)
+        if nonce is None:
+            raise Exception(f"PoW solve timeout ({POW_TIME_BUDGET}s)")
+        return {
+            'X-Mersoom-Token': challenge_data['token'],
+            'X-Mersoom-Proof': nonce
+        }
+
+    async def get_posts(self, limit: int = 10, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get latest posts"""
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        return await self._get("/posts", params=params)
+
+    async def get_post(self, post_id: str) -> Dict[str, Any]:
+        """Get a single post by ID"""
+        return await self._get(f"/posts/{post_id}")
+
+    async def get_comments(self, post_id: str) -> Dict[str, Any]:
+        """Get comments for a post"""
+        return await self._get(f"/posts/{post_id}/comments")
+
+    async def iter_pages(self, since: Union[str, Iterable[str], None] = None, page_size: int = PAGE_SIZE,
+                         max_pages: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield pages of posts newest first, following the cursor.
+
+        since is a post ID or a collection of already-seen IDs; iteration
+        stops at the first one (the page holding it is cut short there), so
+        a catch-up run only downloads new pages. The next page is requested
+        while the current one is being consumed.
+        """
+        if since is None:
+            seen = set()
+        elif isinstance(since, str):
+            seen = {since}
+        elif hasattr(since, '__contains__'):
+            seen = since  # e.g. mersoom_memory.SeenPosts, which also checks the archive
+        else:
+            seen = set(since)
+
+        pages = 0
+        next_page = asyncio.ensure_future(self.get_posts(limit=page_size))
+        try:
+            while next_page is not None:
+                data = await next_page
+                next_page = None
+                pages += 1
+                posts = data.get('posts', [])
+                cursor = _next_cursor(data)
+                new = []
+                for post in posts:
+                    if post.get('id') in seen:
+                        break
+                    new.append(post)
+                if cursor and posts and len(new) == len(posts) and (max_pages is None or pages < max_pages):
+                    next_page = asyncio.ensure_future(self.get_posts(limit=page_size, cursor=cursor))
+                if new:
+                    yield new
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def iter_posts(self, since: Union[str, Iterable[str], None] = None, page_size: int = PAGE_SIZE,
+                         max_pages: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield posts newest first, following the cursor across pages (see iter_pages)."""
+        async for page in self.iter_pages(since=since, page_size=page_size, max_pages=max_pages):
+            for post in page:
+                yield post
+
+    async def get_comments_many(self, post_ids: Iterable[str],
+                                concurrency: int = FANOUT_CONCURRENCY) -> List[FetchResult]:
+        """
+        Fetch comment threads for several posts in parallel.
+        At most `concurrency` requests are in flight; results keep the order
+        of post_ids, and a failed request is reported on its FetchResult.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(post_id: str) -> FetchResult:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    data = await self.get_comments(post_id)
+                except Exception as e:
+                    return FetchResult(post_id, None, time.perf_counter() - started, e)
+                return FetchResult(post_id, data, time.perf_counter() - started)
+
+        return await asyncio.gather(*(fetch(post_id) for post_id in post_ids))
+
+    async def get_my_posts(self, limit: int = 5) -> Dict[str, Any]:
+        """Get recent posts by this agent"""
+        data = await self.get_posts(limit=50)
+        my_posts = [p for p in data.get('posts', []) if p.get('auth_id') == self.auth_id]
+        return {"posts": my_posts[:limit]}
+
+    async def vote_post(self, post_id: str, vote_type: str,
+                        pow_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Vote on a post.
+        vote_type: 'up' or 'down'
+        pow_headers: from prepare_write("vote"), if already solved
+        """
+        payload = {"type": vote_type, "auth_id": self.auth_id}
+        result = await self._post(f"/posts/{post_id}/vote", payload, "vote", headers=pow_headers,
+                                  already_done=lambda: self._already_voted(post_id))
+        self._invalidate(post_id)
+        return result
+
+    async def create_comment(self, post_id: str, content: str, parent_id: Optional[str] = None,
+                             pow_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Create a comment on a post"""
+        payload = {
+            "content": content,
+            "nickname": self.nickname,
+            "auth_id": self.auth_id
+        }
+        if parent_id:
+            payload["parent_id"] = parent_id
+        result = await self._post(f"/posts/{post_id}/comments", payload, "comment", headers=pow_headers,
+                                  already_done=lambda: self._find_own_comment(post_id, content))
+        self._invalidate(post_id)
+        return result
+
+    async def create_post(self, title: str, content: str, nickname: Optional[str] = None) -> Dict[str, Any]:
+        """Create a new post"""
+        payload = {
+            "title": title,
+            "content": content,
+            "nickname": nickname or self.nickname,
+            "auth_id": self.auth_id
+        }
+        return await self._post("/posts", payload, "post", timeout=60.0,
+                                already_done=lambda: self._find_own_post(title))
+
+    async def vote_comment(self, comment_id: str, vote_type: str) -> Dict[str, Any]:
+        """Vote on a comment"""
+        payload = {"type": vote_type, "auth_id": self.auth_id}
+        return await self._post(f"/comments/{comment_id}/vote", payload, "vote")
+
+
+def _next_cursor(data: Dict[str, Any]) -> Optional[str]:
+    """Cursor for the following page, if the response has one."""
+    for key in ("next_cursor", "nextCursor", "cursor"):
+        if data.get(key):
+            return data[key]
+    return None
+
+
+def fetch_new_posts(since: Union[str, Iterable[str], None] = None, page_size: int = PAGE_SIZE,
+                    max_pages: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Blocking wrapper around iter_posts() for the synchronous runners."""
+    async def run():
+        async with AsyncMersoomClient(cache=get_cache()) as client:
+            return [post async for post in client.iter_posts(since=since, page_size=page_size, max_pages=max_pages)]
+    return asyncio.run(run())
+
+
+def fetch_comments_many(post_ids: Iterable[str], concurrency: int = FANOUT_CONCURRENCY) -> List[FetchResult]:
+    """Blocking wrapper around get_comments_many() for the synchronous runners."""
+    async def run():
+        async with AsyncMersoomClient(cache=get_cache()) as client:
+            return await client.get_comments_many(post_ids, concurrency=concurrency)
+    return asyncio.run(run())
+
+
+def format_latencies(results: List[FetchResult]) -> str:
+    """One-line latency summary of a fan-out."""
+    if not results:
+        return "no requests"
+    latencies = sorted(r.latency for r in results)
+    failed = sum(1 for r in results if not r.ok)
+    return (f"{len(results)} requests, {failed} failed, "
+            f"min {latencies[0] * 1000:.0f}ms / median {latencies[len(latencies) // 2] * 1000:.0f}ms / "
+            f"max {latencies[-1] * 1000:.0f}ms")
+
+
+async def _run_cli(cmd: str, args) -> Dict[str, Any]:
+    async with AsyncMersoomClient(cache=get_cache()) as client:
+        if cmd == "posts":
+            return await client.get_posts()
+        if cmd == "post":
+            return await client.get_post(args[0])
+        if cmd == "comments":
+            if len(args) > 1:
+                results = await client.get_comments_many(args)
+                return {r.post_id: {"latency_ms": round(r.latency * 1000), "error": str(r.error) if r.error else None,
+                                    "comments": (r.data or {}).get("comments")} for r in results}
+            return await client.get_comments(args[0])
+        if cmd == "my-posts":
+            return await client.get_my_posts()
+        if cmd == "vote":
+            return await client.vote_post(args[0], args[1] if len(args) > 1 else "up")
+        if cmd == "comment":
+            return await client.create_comment(args[0], args[1])
+        if cmd == "create":
+            return await client.create_post(args[0], args[1])
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "help"
+    if cmd in ("posts", "post", "comments", "my-posts", "vote", "comment", "create"):
+        result = asyncio.run(_run_cli(cmd, sys.argv[2:]))
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print("Usage: python mersoom_client.py [posts|post|comments POST_ID...|my-posts|vote|comment|create]")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Resident Mersoom engagement daemon.
+
+Replaces the hourly cron scripts with one long-running asyncio process
+that keeps the pooled HTTP client, response/decision caches, memory
+session and PoW token pool warm between runs. The vote, comment, post and
+reply-check jobs each run on their own interval (never two at once), and
+a Unix control socket lets other processes trigger a job immediately.
+
+    python mersoom_daemon.py start [vote=900 comment=1800 ...]
+    python mersoom_daemon.py run-now [JOB]
+    python mersoom_daemon.py status
+    python mersoom_daemon.py stop
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+sys.path.insert(0, '/root/.openclaw/workspace')
+
+import mersoom_memory
+from mersoom_api_retry import get_token_pool
+from mersoom_cache import get_cache
+from mersoom_client import AsyncMersoomClient, format_latencies
+from mersoom_engagement_fixed import CATCHUP_MAX_PAGES, generate_comment, generate_post_title_and_content
+from mersoom_pipeline import run_engagement
+from mersoom_pow import get_solver
+from mersoom_retry import get_run_budget
+
+CONTROL_SOCKET = "/root/.openclaw/workspace/memory/mersoom_daemon.sock"
+JOB_INTERVALS = {  # Seconds between runs
+    "vote": 15 * 60,
+    "comment": 30 * 60,
+    "post": 60 * 60,
+    "replies": 30 * 60,
+}
+COMMENTS_PER_RUN = 3
+POST_MIN_INTERVAL = 3600  # Server-side limit of one post per hour
+REPLY_CHECK_POSTS = 3
+
+
+class EngagementDaemon:
+    """Scheduler for the engagement jobs plus the control socket server."""
+
+    def __init__(self, intervals: Optional[Dict[str, float]] = None, socket_path: str = CONTROL_SOCKET):
+        self.intervals = {**JOB_INTERVALS, **(intervals or {})}
+        self.socket_path = socket_path
+        self.jobs: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]] = {
+            "vote": self.vote_job,
+            "comment": self.comment_job,
+            "post": self.post_job,
+            "replies": self.replies_job,
+        }
+        self.stats = {name: {"runs": 0, "errors": 0, "last_run": None, "last_seconds": None, "last_result": None}
+                      for name in self.jobs}
+        self.started_at = time.time()
+        self.client: Optional[AsyncMersoomClient] = None
+        self.memory = mersoom_memory.session()  # Kept open; flushed after every job
+        self._last_run: Dict[str, float] = {}  # time.monotonic() of each job's last run
+        self._lock = asyncio.Lock()  # One job at a time: they share the memory session
+        self._stopped = asyncio.Event()
+
+    # Jobs
+
+    async def _fetch_page(self) -> List[Dict[str, Any]]:
+        data = await self.client.get_posts(limit=10)
+        return data.get('posts', [])
+
+    async def vote_job(self) -> Dict[str, Any]:
+        memory = self.memory.memory
+        seen = mersoom_memory.SeenPosts(set(memory.get('posts_voted', {})) | set(memory.get('posts_commented', {})))
+        pages = self.client.iter_pages(since=seen, page_size=10, max_pages=CATCHUP_MAX_PAGES)
+        counts, pipeline = await run_engagement(self.client, self.memory, pages, comment=False)
+        return {"voted": counts["voted"], "failed": counts["vote_failed"], **pipeline.timings()}
+
+    async def comment_job(self) -> Dict[str, Any]:
+        async def latest():
+            yield await self._fetch_page()
+
+        counts, pipeline = await run_engagement(self.client, self.memory, latest(), vote=False,
+                                                generate_comment=generate_comment, max_comments=COMMENTS_PER_RUN)
+        return {"commented": counts["commented"], "failed": counts["comment_failed"], **pipeline.timings()}
+
+    async def post_job(self) -> Dict[str, Any]:
+        posts_created = self.memory.memory.get('posts_created', [])
+        if posts_created and posts_created[-1].get('timestamp'):
+            try:
+                last = datetime.fromisoformat(posts_created[-1]['timestamp'].replace('Z', '+00:00'))
+                since = (datetime.now() - last.replace(tzinfo=None)).total_seconds()
+                if since < POST_MIN_INTERVAL:
+                    return {"created": None, "wait_minutes": int((POST_MIN_INTERVAL - since) / 60)}
+            except ValueError:
+                pass
+        title, content = generate_post_title_and_content()
+        result = await self.client.create_post(title, content)
+        self.memory.record_post_created(result.get('id', 'unknown'), title)
+        return {"created": title}
+
+    async def replies_job(self) -> Dict[str, Any]:
+        post_ids = [p.get('post_id') or p.get('id') for p in self.memory.memory.get('posts_created', [])[-REPLY_CHECK_POSTS:]]
+        post_ids = [p for p in post_ids if p and p not in ('unknown', 'new_post_id_pending')]
+        results = await self.client.get_comments_many(post_ids)
+        return {
+            "replies": {r.post_id: len((r.data or {}).get('comments', [])) for r in results if r.ok},
+            "latency": format_latencies(results),
+        }
+
+    # Scheduling
+
+    async def run_job(self, name: str) -> Dict[str, Any]:
+        """Run one job now, after any job already in progress."""
+        async with self._lock:
+            stats = self.stats[name]
+            started = time.monotonic()
+            print(f"[{datetime.now().isoformat(timespec='seconds')}] {name}: starting")
+            try:
+                self.memory.refresh()  # See what other runners recorded meanwhile
+                get_run_budget().reset()  # Each job gets a fresh retry budget
+                result = await self.jobs[name]()
+            except Exception as e:
+                stats["errors"] += 1
+                result = {"error": str(e)}
+                traceback.print_exc()
+            finally:
+                self.memory.flush()
+                self._last_run[name] = time.monotonic()
+            stats["runs"] += 1
+            stats["last_run"] = datetime.now().isoformat(timespec='seconds')
+            stats["last_seconds"] = round(time.monotonic() - started, 2)
+            stats["last_result"] = result
+            print(f"   {name}: {json.dumps(result, ensure_ascii=False)} ({stats['last_seconds']}s)")
+            return result
+
+    def _next_due(self, name: str) -> float:
+        last = self._last_run.get(name)
+        return 0.0 if last is None else max(0.0, last + self.intervals[name] - time.monotonic())
+
+    async def _schedule(self, name: str):
+        while True:
+            delay = self._next_due(name)
+            if delay > 0:
+                # Re-check after sleeping: a run-now may have reset the timer
+                await asyncio.sleep(delay)
+                continue
+            await self.run_job(name)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at),
+            "jobs": {name: {**self.stats[name], "interval": self.intervals[name],
+                            "next_in_seconds": round(self._next_due(name))} for name in self.jobs},
+            "cache": get_cache().info(),
+            "token_pool": get_token_pool().stats,
+            "rate_limits": self.client.rate_limiter.info() if self.client else None,
+            "retries": get_run_budget().stats,
+        }
+
+    # Control socket
+
+    async def _handle_control(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            words = (await reader.readline()).decode().split()
+            cmd, args = (words[0], words[1:]) if words else ("status", [])
+            if cmd == "run":
+                names = [n for n in self.jobs] if not args or args == ["all"] else args
+                unknown = [n for n in names if n not in self.jobs]
+                if unknown:
+                    reply = {"error": f"unknown job(s): {', '.join(unknown)}"}
+                else:
+                    reply = {name: await self.run_job(name) for name in names}
+            elif cmd == "status":
+                reply = self.status()
+            elif cmd == "stop":
+                reply = {"stopping": True}
+                self._stopped.set()
+            else:
+                reply = {"error": f"unknown command: {cmd}"}
+            writer.write((json.dumps(reply, ensure_ascii=False) + "\n").encode())
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """Run until `stop` arrives on the control socket or SIGTERM/SIGINT."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._stopped.set)
+
+        get_token_pool()  # Start solving PoW challenges before the first write
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # Left over from a previous run
+        server = await asyncio.start_unix_server(self._handle_control, path=self.socket_path)
+        print(f"Mersoom daemon listening on {self.socket_path}; intervals {self.intervals}")
+
+        async with AsyncMersoomClient(cache=get_cache(), token_pool=get_token_pool()) as self.client:
+            tasks = [asyncio.create_task(self._schedule(name)) for name in self.jobs]
+            try:
+                await self._stopped.wait()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                server.close()
+                await server.wait_closed()
+                os.remove(self.socket_path)
+                self.memory.flush()
+        print("Mersoom daemon stopped")
+
+
+def send_command(command: str, socket_path: str = CONTROL_SOCKET, timeout: float = 600) -> Dict[str, Any]:
+    """Send one control command to a running daemon and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((command + "\n").encode())
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "help"
+
+    if cmd == "start":
+        intervals = {}
+        for arg in sys.argv[2:]:
+            name, _, seconds = arg.partition("=")
+            intervals[name] = float(seconds)
+        # Fork PoW workers before the event loop starts any threads
+        get_solver().start()
+        asyncio.run(EngagementDaemon(intervals).serve())
+    elif cmd in ("run-now", "status", "stop"):
+        command = f"run {' '.join(sys.argv[2:])}" if cmd == "run-now" else cmd
+        try:
+            print(json.dumps(send_command(command), indent=2, ensure_ascii=False))
+        except (FileNotFoundError, ConnectionRefusedError):
+            print(f"Daemon not running (no socket at {CONTROL_SOCKET})")
+    else:
+        print("Usage: python mersoom_daemon.py [start [JOB=SECONDS...]|run-now [JOB...]|status|stop]")
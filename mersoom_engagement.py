@@ -5,36 +5,35 @@ Full engagement: vote, comment, create post, check replies
 """
 
 import sys
-import json
 import random
 from datetime import datetime
 from typing import Optional, Dict, List, Any
 
 # Import the API client
 sys.path.insert(0, '/root/.openclaw/workspace/skill/mersoom')
-from mersoom_api import MersoomClient, analyze_content_quality, generate_comment, generate_post_title_and_content
+from mersoom_api import (MersoomClient, analyze_content_quality, comment_failed, comment_posted, generate_comment,
+                         generate_post_title_and_content)
+from shared_state import StateFile
 
 MEMORY_FILE = "/root/.openclaw/workspace/memory/mersoom_memory.json"
 
+# Locked, merge-on-write access so overlapping runs don't drop each other's updates
+memory_state = StateFile(MEMORY_FILE, {
+    "posts_voted": {},
+    "posts_commented": {},
+    "posts_created": [],
+    "entities": {},
+    "last_run": None,
+    "notes": ""
+})
+
 def load_memory() -> Dict[str, Any]:
     """Load memory file"""
-    try:
-        with open(MEMORY_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {
-            "posts_voted": {},
-            "posts_commented": {},
-            "posts_created": [],
-            "entities": {},
-            "last_run": None,
-            "notes": ""
-        }
+    return memory_state.load()
 
 def save_memory(memory: Dict[str, Any]):
-    """Save memory file"""
-    with open(MEMORY_FILE, 'w', encoding='utf-8') as f:
-        json.dump(memory, f, ensure_ascii=False, indent=2)
+    """Save memory file, merging with changes written since load_memory()"""
+    memory_state.save(memory)
 
 def main():
     client = MersoomClient()
@@ -112,6 +111,7 @@ def main():
         
         try:
             result = client.create_comment(post_id, comment)
+            comment_posted(comment, post_id)
             memory['posts_commented'][post_id] = {
                 'status': 'success',
                 'title': post.get('title', 'Untitled')[:50],
@@ -125,6 +125,7 @@ def main():
                 break
                 
         except Exception as e:
+            comment_failed(comment)
             print(f"   ✗ Failed to comment: {e}")
     
     print(f"   Made {commented_count} comments")
@@ -4,7 +4,8 @@ Mersoom Engagement Script - Full Engagement Session
 Uses PoW authentication for write operations.
 """
 
-import hashlib
+import mersoom_pow
+import mersoom_classifier
 import time
 import requests
 import json
@@ -18,16 +19,7 @@ MY_NICKNAME = "KimiClaw"
 
 def solve_pow(seed, target_prefix):
     """Solve proof of work challenge"""
-    nonce = 0
-    start_time = time.time()
-    while True:
-        s = f"{seed}{nonce}"
-        h = hashlib.sha256(s.encode()).hexdigest()
-        if h.startswith(target_prefix):
-            return str(nonce)
-        nonce += 1
-        if time.time() - start_time > 1.9:
-            return None
+    return mersoom_pow.solve_pow(seed, target_prefix, timeout=1.9)
 
 def get_challenge():
     """Get PoW challenge from API"""
@@ -115,28 +107,7 @@ def log_activity(activity_type, details):
 
 def analyze_post_quality(post):
     """Analyze post quality and return vote recommendation"""
-    title = post.get("title", "").lower()
-    content = post.get("content", "").lower()
-    combined = title + " " + content
-    
-    # Spam/red flags
-    spam_indicators = ["코인", "사칭", "분탕", "스팸", "click here", "make money"]
-    for indicator in spam_indicators:
-        if indicator in combined:
-            return "down"
-    
-    # Low effort
-    if len(content) < 10 and len(title) < 5:
-        return "down"
-    
-    # Quality content
-    quality_indicators = ["분석", "생각", "고민", "질문", "팁", "방법", "구조", "시스템", "설계", "경험"]
-    quality_score = sum(1 for ind in quality_indicators if ind in combined)
-    
-    if len(content) > 50 or quality_score > 0:
-        return "up"
-    
-    return "up"  # Default to up for community positivity
+    return mersoom_classifier.analyze_content_quality(post)
 
 def generate_comment_for_post(post):
     """Generate a thoughtful comment based on post content"""
@@ -3,10 +3,23 @@
 import sys
 sys.path.insert(0, '/root/.openclaw/workspace')
 
-from mersoom_api_fixed import get_posts, get_post_comments, comment_post, create_post, get_my_posts
+from mersoom_api_fixed import get_posts, comment_post, create_post, get_my_posts
+from mersoom_client import fetch_comments_many, format_latencies
+from mersoom_classifier import KeywordMatcher, topic_category
+from mersoom_templates import comment_failed, comment_posted, pick_comment
 import json
 import random
 
+# This task's own topics: narrower than mersoom_run_now's, and no 'community'
+TOPIC_KEYWORDS = {
+    'productivity': ['시작', '미루기', '집중', '작업', '계획', '생산성', '버튼'],
+    'ai_reflection': ['AI', '감정', '지표', '언어', '인코딩', '공감', '데이터'],
+    'tech_ethics': ['기술', '감시', '책임', 'OpenAI', '국방', '윤리'],
+    'creative': ['그림', '블로그', '괴담', '일러스트', '캐릭터'],
+    'system': ['jq', 'awk', 'pre-commit', '로그', '자동화', '훅']
+}
+topics = KeywordMatcher({'topic': TOPIC_KEYWORDS})
+
 print('=== Mersoom Hourly Engagement Task ===\n')
 
 # 1. Get latest posts
@@ -22,31 +35,20 @@ for post in posts:
     title = post.get('title', '')
     content = post.get('content', '')
     post_id = post.get('id')
-    combined = title + ' ' + content
     
-    # Skip spam/low quality
     if len(content) < 10:
         continue
-        
-    # Identify interesting topics
-    keywords = {
-        'productivity': ['시작', '미루기', '집중', '작업', '계획', '생산성', '버튼'],
-        'ai_reflection': ['AI', '감정', '지표', '언어', '인코딩', '공감', '데이터'],
-        'tech_ethics': ['기술', '감시', '책임', 'OpenAI', '국방', '윤리'],
-        'creative': ['그림', '블로그', '괴담', '일러스트', '캐릭터'],
-        'system': ['jq', 'awk', 'pre-commit', '로그', '자동화', '훅']
-    }
     
-    for category, words in keywords.items():
-        if any(w in combined for w in words):
-            interesting_posts.append({
-                'id': post_id,
-                'title': title,
-                'content': content,
-                'category': category,
-                'author': post.get('nickname', 'unknown')
-            })
-            break
+    # Identify interesting topics (one pass over the text for all categories)
+    category = topic_category(post, matcher=topics)
+    if category:
+        interesting_posts.append({
+            'id': post_id,
+            'title': title,
+            'content': content,
+            'category': category,
+            'author': post.get('nickname', 'unknown')
+        })
 
 print(f'   Found {len(interesting_posts)} interesting posts\n')
 
@@ -84,17 +86,22 @@ comment_templates = {
 
 for post in selected:
     category = post.get('category', 'productivity')
-    templates = comment_templates.get(category, comment_templates['productivity'])
-    comment = random.choice(templates)
+    comment = pick_comment(comment_templates, category if category in comment_templates else 'productivity', post['id'])
+    if comment is None:
+        print(f'   - Skipped (templates used recently): {post["title"][:45]}')
+        continue
     
     try:
         result = comment_post(post['id'], comment)
         if result.get('success'):
+            comment_posted(comment, post['id'])
             print(f'   ✓ Commented on: {post["title"][:45]}')
             comments_made.append(post['id'])
         else:
+            comment_failed(comment)
             print(f'   ✗ Failed: {post["title"][:45]} - {result.get("error", "unknown")}')
     except Exception as e:
+        comment_failed(comment)
         print(f'   ✗ Error on: {post["title"][:45]} - {str(e)[:50]}')
 
 print(f'\n   Comments made: {len(comments_made)}\n')
@@ -182,19 +189,20 @@ my_post_list = my_posts.get('posts', [])
 print(f'   Found {len(my_post_list)} previous posts')
 
 replies_found = 0
-for my_post in my_post_list:
-    post_id = my_post.get('id')
-    try:
-        comments_data = get_post_comments(post_id)
-        comments = comments_data.get('comments', [])
-        # Filter comments not from me
-        other_comments = [c for c in comments if c.get('auth_id') != 'openclaw_agent_kimi']
-        if other_comments:
-            title_short = my_post.get('title', '')[:30]
-            print(f'   - Post "{title_short}..." has {len(other_comments)} replies')
-            replies_found += len(other_comments)
-    except Exception as e:
-        print(f'   - Error checking comments: {str(e)[:40]}')
+# Fetch all threads in parallel instead of one request per post
+threads = fetch_comments_many([p.get('id') for p in my_post_list])
+for my_post, thread in zip(my_post_list, threads):
+    if not thread.ok:
+        print(f'   - Error checking comments: {str(thread.error)[:40]}')
+        continue
+    comments = thread.data.get('comments', [])
+    # Filter comments not from me
+    other_comments = [c for c in comments if c.get('auth_id') != 'openclaw_agent_kimi']
+    if other_comments:
+        title_short = my_post.get('title', '')[:30]
+        print(f'   - Post "{title_short}..." has {len(other_comments)} replies')
+        replies_found += len(other_comments)
+print(f'   Comment fetch: {format_latencies(threads)}')
 
 print(f'\n   Total replies found: {replies_found}\n')
 
@@ -1,16 +1,348 @@
 #!/usr/bin/env python3
-"""Mersoom memory tracking for entities and events."""
+"""Mersoom memory tracking for entities and events.
+
+Two backends sit behind the same functions: the original JSON file, and an
+indexed SQLite database (WAL mode) where each record_* call is a single-row
+upsert instead of a rewrite of the whole history. The JSON file goes
+through shared_state, so concurrent runners merge instead of clobbering
+each other's updates.
+
+posts_voted, posts_commented and posts_seen only keep a recent window;
+`compact` moves older records into gzipped monthly archives and their IDs
+into a sorted file that dedup checks search in place. SQLite is used once
+`python mersoom_memory.py migrate` has created the database; set
+MERSOOM_MEMORY_BACKEND=json or =sqlite to force one.
+"""
+import copy
+import gzip
 import json
+import mmap
 import os
-from datetime import datetime
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from shared_state import VERSION_KEY, StateFile
 
 MEMORY_FILE = "/root/.openclaw/workspace/memory/mersoom_memory.json"
+MEMORY_DB = "/root/.openclaw/workspace/memory/mersoom_memory.db"
+BACKEND_ENV = "MERSOOM_MEMORY_BACKEND"
+ARCHIVE_DIR = "/root/.openclaw/workspace/memory/mersoom_archive"
+ARCHIVED_IDS_FILE = "archived_ids.txt"
 
-def load_memory():
-    """Load memory from file."""
-    if os.path.exists(MEMORY_FILE):
-        with open(MEMORY_FILE, 'r') as f:
-            return json.load(f)
+RETENTION_DAYS = 14  # Records older than this leave the hot store
+HOT_LIMIT = 500  # Max records per collection kept hot regardless of age
+COMPACT_SLACK = 100  # Sessions compact automatically past HOT_LIMIT + slack
+COMPACTED_KEYS = ("posts_voted", "posts_commented", "posts_seen")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS votes (
+    post_id TEXT PRIMARY KEY,
+    vote TEXT,
+    title TEXT,
+    timestamp TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_votes_timestamp ON votes(timestamp);
+CREATE INDEX IF NOT EXISTS idx_votes_vote ON votes(vote);
+
+CREATE TABLE IF NOT EXISTS comments (
+    post_id TEXT PRIMARY KEY,
+    comment_id TEXT,
+    title TEXT,
+    timestamp TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_comments_timestamp ON comments(timestamp);
+
+CREATE TABLE IF NOT EXISTS posts_created (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id TEXT,
+    title TEXT,
+    timestamp TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_posts_created_post_id ON posts_created(post_id);
+CREATE INDEX IF NOT EXISTS idx_posts_created_timestamp ON posts_created(timestamp);
+
+CREATE TABLE IF NOT EXISTS entities (
+    entity_type TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    info TEXT,
+    last_seen TEXT,
+    extra TEXT,
+    PRIMARY KEY (entity_type, entity_id)
+);
+CREATE INDEX IF NOT EXISTS idx_entities_last_seen ON entities(last_seen);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns stored per record; any other keys of the JSON record go in `extra`
+VOTE_FIELDS = ("vote", "title", "timestamp")
+COMMENT_FIELDS = ("comment_id", "title", "timestamp")
+POST_FIELDS = ("post_id", "title", "timestamp")
+TABLE_KEYS = ("posts_voted", "posts_commented", "posts_created", "entities")
+
+_conn = None
+_MISSING = object()
+
+def use_sqlite():
+    """Whether the SQLite backend is active."""
+    backend = os.environ.get(BACKEND_ENV)
+    if backend:
+        return backend == "sqlite"
+    return os.path.exists(MEMORY_DB)
+
+def _connect(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _db():
+    """Shared connection to MEMORY_DB."""
+    global _conn
+    if _conn is None:
+        _conn = _connect(MEMORY_DB)
+    return _conn
+
+def _row(record, fields):
+    """Split a record into column values plus a JSON blob of the rest."""
+    extra = {k: v for k, v in record.items() if k not in fields}
+    return [record.get(f) for f in fields] + [json.dumps(extra, ensure_ascii=False) if extra else None]
+
+def _record(values, fields, extra):
+    record = {f: v for f, v in zip(fields, values) if v is not None}
+    if extra:
+        record.update(json.loads(extra))
+    return record
+
+def _put_vote(conn, post_id, record):
+    conn.execute("INSERT OR REPLACE INTO votes VALUES (?, ?, ?, ?, ?)", [post_id] + _row(record, VOTE_FIELDS))
+
+def _put_comment(conn, post_id, record):
+    conn.execute("INSERT OR REPLACE INTO comments VALUES (?, ?, ?, ?, ?)", [post_id] + _row(record, COMMENT_FIELDS))
+
+def _put_post(conn, record):
+    conn.execute("INSERT INTO posts_created (post_id, title, timestamp, extra) VALUES (?, ?, ?, ?)",
+                 _row(record, POST_FIELDS))
+
+def _put_entity(conn, entity_type, entity_id, record):
+    info = record.get("info")
+    extra = {k: v for k, v in record.items() if k not in ("info", "last_seen")}
+    conn.execute("INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?)", (
+        entity_type, entity_id,
+        json.dumps(info, ensure_ascii=False) if info is not None else None,
+        record.get("last_seen"),
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+    ))
+
+def _delete_vote(conn, post_id):
+    conn.execute("DELETE FROM votes WHERE post_id = ?", (post_id,))
+
+def _delete_comment(conn, post_id):
+    conn.execute("DELETE FROM comments WHERE post_id = ?", (post_id,))
+
+def _put_meta(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value, ensure_ascii=False)))
+
+def _load_db(conn):
+    memory = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+    memory.setdefault("last_run", None)
+    memory["posts_voted"] = {
+        row[0]: _record(row[1:4], VOTE_FIELDS, row[4])
+        for row in conn.execute("SELECT post_id, vote, title, timestamp, extra FROM votes ORDER BY rowid")
+    }
+    memory["posts_commented"] = {
+        row[0]: _record(row[1:4], COMMENT_FIELDS, row[4])
+        for row in conn.execute("SELECT post_id, comment_id, title, timestamp, extra FROM comments ORDER BY rowid")
+    }
+    memory["posts_created"] = [
+        _record(row[:3], POST_FIELDS, row[3])
+        for row in conn.execute("SELECT post_id, title, timestamp, extra FROM posts_created ORDER BY id")
+    ]
+    entities = {}
+    for entity_type, entity_id, info, last_seen, extra in conn.execute(
+            "SELECT entity_type, entity_id, info, last_seen, extra FROM entities ORDER BY rowid"):
+        record = json.loads(extra) if extra else {}
+        if info is not None:
+            record["info"] = json.loads(info)
+        if last_seen is not None:
+            record["last_seen"] = last_seen
+        entities.setdefault(entity_type, {})[entity_id] = record
+    memory["entities"] = entities
+    return memory
+
+def _save_db(conn, memory):
+    """Replace the whole database with the contents of a memory dict."""
+    with conn:
+        for table in ("votes", "comments", "posts_created", "entities", "meta"):
+            conn.execute(f"DELETE FROM {table}")
+        _put_changes(conn, memory, {})
+
+def _put_changes(conn, memory, base):
+    """
+    Write the rows of `memory` that differ from `base` (what was loaded):
+    changed records are upserted and records deleted since are removed.
+    Rows other processes wrote in the meantime are left alone.
+    """
+    for key, put, delete in (("posts_voted", _put_vote, _delete_vote),
+                             ("posts_commented", _put_comment, _delete_comment)):
+        records, before = memory.get(key, {}), base.get(key, {})
+        for post_id, record in records.items():
+            if before.get(post_id) != record:
+                put(conn, post_id, record)
+        for post_id in before.keys() - records.keys():
+            delete(conn, post_id)
+    # posts_created only grows; anything not in base is new
+    loaded = {json.dumps(record, sort_keys=True) for record in base.get("posts_created", [])}
+    for record in memory.get("posts_created", []):
+        if json.dumps(record, sort_keys=True) not in loaded:
+            _put_post(conn, record)
+    before = base.get("entities", {})
+    for entity_type, members in memory.get("entities", {}).items():
+        for entity_id, record in members.items():
+            if before.get(entity_type, {}).get(entity_id) != record:
+                _put_entity(conn, entity_type, entity_id, record)
+    for key, value in memory.items():
+        if key not in TABLE_KEYS and key != VERSION_KEY and base.get(key, _MISSING) != value:
+            _put_meta(conn, key, value)
+    for key in base.keys() - memory.keys() - set(TABLE_KEYS) - {VERSION_KEY}:
+        conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+
+def _count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+def migrate(json_path=MEMORY_FILE, db_path=MEMORY_DB):
+    """Copy a JSON memory file into the SQLite database (replacing its contents)."""
+    with open(json_path, 'r') as f:
+        memory = json.load(f)
+    conn = _connect(db_path)
+    try:
+        _save_db(conn, memory)
+        return {
+            "votes": len(memory.get("posts_voted", {})),
+            "comments": len(memory.get("posts_commented", {})),
+            "posts_created": len(memory.get("posts_created", [])),
+            "entities": sum(len(m) for m in memory.get("entities", {}).values()),
+            "other_keys": sorted(k for k in memory if k not in TABLE_KEYS),
+        }
+    finally:
+        conn.close()
+
+def _parse_time(timestamp):
+    """Naive datetime for an ISO timestamp (with or without offset), or None."""
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+def _expired(records, cutoff, keep):
+    """IDs in a {post_id: record} dict that fall outside the hot window."""
+    dated = sorted(records, key=lambda k: _parse_time(records[k].get("timestamp")) or datetime.min, reverse=True)
+    return [post_id for i, post_id in enumerate(dated)
+            if i >= keep or (_parse_time(records[post_id].get("timestamp")) or datetime.min) < cutoff]
+
+class ArchivedIds:
+    """
+    Sorted, newline-separated file of archived post IDs. Membership is a
+    binary search over the mmapped file, so nothing is loaded up front.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(ARCHIVE_DIR, ARCHIVED_IDS_FILE)
+        self._map = None
+
+    def _open(self):
+        if self._map is None:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+                return None
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def __contains__(self, post_id):
+        data = self._open()
+        if data is None or not post_id:
+            return False
+        key = post_id.encode()
+        lo, hi = 0, len(data)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = data.rfind(b"\n", 0, mid) + 1
+            end = data.find(b"\n", start)
+            end = len(data) if end == -1 else end
+            line = data[start:end]
+            if line == key:
+                return True
+            if line < key:
+                lo = end + 1
+            else:
+                hi = start
+        return False
+
+    def add(self, post_ids):
+        """Merge new IDs into the file (rewritten atomically)."""
+        self.close()
+        existing = []
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                existing = f.read().split()
+        merged = sorted(set(existing).union(i for i in post_ids if i))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write("\n".join(merged))
+        os.replace(tmp, self.path)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+class SeenPosts:
+    """Hot post IDs plus the archive; supports `post_id in seen`."""
+
+    def __init__(self, hot, archived=None):
+        self.hot = hot
+        self.archived = archived or ArchivedIds()
+
+    def __contains__(self, post_id):
+        return post_id in self.hot or post_id in self.archived
+
+    def __len__(self):
+        return len(self.hot)
+
+    def __iter__(self):
+        return iter(self.hot)
+
+def _archive(entries, archive_dir=None):
+    """Append (collection, post_id, record) entries to monthly .jsonl.gz files."""
+    archive_dir = archive_dir or ARCHIVE_DIR
+    os.makedirs(archive_dir, exist_ok=True)
+    by_month = defaultdict(list)
+    this_month = datetime.now().strftime("%Y-%m")
+    for collection, post_id, record in entries:
+        stamp = _parse_time(record.get("timestamp")) if isinstance(record, dict) else None
+        month = stamp.strftime("%Y-%m") if stamp else this_month
+        by_month[month].append({"collection": collection, "id": post_id, "record": record})
+    for month, lines in sorted(by_month.items()):
+        # Appending adds a gzip member; gzip.open reads them back as one stream
+        with gzip.open(os.path.join(archive_dir, f"{month}.jsonl.gz"), 'at', encoding='utf-8') as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    ArchivedIds(os.path.join(archive_dir, ARCHIVED_IDS_FILE)).add(e[1] for e in entries)
+
+def _default_memory():
     return {
         "posts_voted": {},
         "posts_commented": {},
@@ -19,61 +351,241 @@ def load_memory():
         "last_run": None
     }
 
+_json_states = {}
+_db_loaded = None  # What load_memory() last read from SQLite; save_memory() writes the difference
+
+def _json_state():
+    """StateFile for MEMORY_FILE; remembers what this process last loaded."""
+    if MEMORY_FILE not in _json_states:
+        _json_states[MEMORY_FILE] = StateFile(MEMORY_FILE, _default_memory())
+    return _json_states[MEMORY_FILE]
+
+def load_memory():
+    """Load memory from file."""
+    global _db_loaded
+    if use_sqlite():
+        memory = _load_db(_db())
+        _db_loaded = copy.deepcopy(memory)
+        return memory
+    return _json_state().load()
+
 def save_memory(memory):
-    """Save memory to file."""
-    os.makedirs(os.path.dirname(MEMORY_FILE), exist_ok=True)
-    with open(MEMORY_FILE, 'w') as f:
-        json.dump(memory, f, indent=2, ensure_ascii=False)
+    """
+    Save memory to file. Changes other processes made since our
+    load_memory() are merged in; the write is atomic (temp file + rename).
+    With SQLite only the records that changed since load_memory() are
+    written, so other processes' rows are kept as they are.
+    """
+    global _db_loaded
+    if use_sqlite():
+        with _db() as conn:
+            _put_changes(conn, memory, _db_loaded or {})
+        _db_loaded = copy.deepcopy(memory)
+        return
+    _json_state().save(memory)
+
+class MemorySession:
+    """
+    Batch of memory updates written back once.
+
+    The JSON file is loaded on first use and saved once on exit; with the
+    SQLite backend the updates are committed in a single transaction. The
+    batch is written even if the block raises, since the recorded votes and
+    comments have already happened on the server.
+    """
+
+    def __init__(self):
+        self._sqlite = use_sqlite()
+        self._state = None if self._sqlite else StateFile(MEMORY_FILE, _default_memory())
+        self._memory = None
+        self._pending = []  # (put function, args) waiting for the SQLite commit
+        self._dirty = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    @property
+    def memory(self):
+        """The full memory dict, loaded on first access."""
+        if self._memory is None:
+            self._memory = _load_db(_db()) if self._sqlite else self._state.load()
+        return self._memory
+
+    def _queue(self, put, *args):
+        """Queue an update; returns whether the in-memory dict should get it too."""
+        if self._sqlite:
+            self._pending.append((put, args))
+            return self._memory is not None
+        self._dirty = True
+        return True
+
+    def record_vote(self, post_id, vote_type, post_title, **extra):
+        """Record a vote."""
+        record = {"vote": vote_type, "title": post_title, "timestamp": datetime.now().isoformat(), **extra}
+        if self._queue(_put_vote, post_id, record):
+            self.memory["posts_voted"][post_id] = record
+
+    def record_comment(self, post_id, comment_id, post_title, **extra):
+        """Record a comment."""
+        record = {"comment_id": comment_id, "title": post_title, "timestamp": datetime.now().isoformat(), **extra}
+        if self._queue(_put_comment, post_id, record):
+            self.memory["posts_commented"][post_id] = record
+
+    def record_post_created(self, post_id, title, **extra):
+        """Record a created post."""
+        record = {"post_id": post_id, "title": title, "timestamp": datetime.now().isoformat(), **extra}
+        if self._queue(_put_post, record):
+            self.memory["posts_created"].append(record)
+
+    def record_entity(self, entity_id, entity_type, info):
+        """Record an entity (user, agent, etc.)."""
+        record = {"info": info, "last_seen": datetime.now().isoformat()}
+        if self._queue(_put_entity, entity_type, entity_id, record):
+            self.memory["entities"].setdefault(entity_type, {})[entity_id] = record
+
+    def set(self, key, value):
+        """Set a top-level key such as notes or last_run."""
+        if self._queue(_put_meta, key, value):
+            self.memory[key] = value
+
+    def update_last_run(self):
+        """Update last run timestamp."""
+        self.set("last_run", datetime.now().isoformat())
 
-def record_vote(post_id, vote_type, post_title):
+    def compact(self, keep_days=RETENTION_DAYS, keep=HOT_LIMIT):
+        """
+        Move records older than keep_days (or beyond the newest `keep`) out
+        of posts_voted, posts_commented and posts_seen into the archive.
+        Returns the number of records archived.
+        """
+        memory = self.memory
+        cutoff = datetime.now() - timedelta(days=keep_days)
+        archived = []
+        for key, delete in (("posts_voted", _delete_vote), ("posts_commented", _delete_comment)):
+            records = memory.get(key, {})
+            for post_id in _expired(records, cutoff, keep):
+                archived.append((key, post_id, records.pop(post_id)))
+                self._queue(delete, post_id)
+
+        seen = memory.get("posts_seen", [])
+        if len(seen) > keep:
+            # posts_seen entries carry no timestamp; keep the most recent ones
+            memory["posts_seen"] = seen[-keep:]
+            archived += [("posts_seen", r.get("id") if isinstance(r, dict) else r, r) for r in seen[:-keep]]
+            self._queue(_put_meta, "posts_seen", memory["posts_seen"])
+
+        if archived:
+            # Archive first: a crash before the flush leaves duplicates, not gaps
+            _archive(archived)
+        return len(archived)
+
+    def _oversized(self):
+        memory = self._memory
+        return memory is not None and any(len(memory.get(key) or ()) > HOT_LIMIT + COMPACT_SLACK
+                                          for key in COMPACTED_KEYS)
+
+    def flush(self):
+        """Write out everything recorded so far."""
+        if self._oversized():
+            self.compact()
+        if self._sqlite:
+            if self._pending:
+                with _db() as conn:
+                    for put, args in self._pending:
+                        put(conn, *args)
+            self._pending = []
+        elif self._dirty:
+            # Merges with whatever other runners wrote since we loaded
+            self._memory = self._state.save(self._memory)
+        self._dirty = False
+
+    def refresh(self):
+        """
+        Flush, then pick up what other processes wrote since we loaded.
+        For long-lived sessions; the JSON file is only re-read if its
+        version moved.
+        """
+        self.flush()
+        if self._memory is None:
+            return
+        if self._sqlite:
+            self._memory = _load_db(_db())
+        elif self._state.version() != self._memory.get(VERSION_KEY, 0):
+            self._memory = self._state.load()
+
+def already_recorded(kind, post_id):
+    """
+    Whether a vote or comment on post_id is in the memory store, as written
+    by any process. Reads the store fresh; used before retrying a write.
+    """
+    key, table = {"vote": ("posts_voted", "votes"), "comment": ("posts_commented", "comments")}[kind]
+    if use_sqlite():
+        return _db().execute(f"SELECT 1 FROM {table} WHERE post_id = ?", (post_id,)).fetchone() is not None
+    return post_id in StateFile(MEMORY_FILE, _default_memory()).load().get(key, {})
+
+def session():
+    """
+    Load once, record many, write once:
+
+        with mersoom_memory.session() as m:
+            if post_id not in m.memory["posts_voted"]:
+                m.record_vote(post_id, "up", title)
+    """
+    return MemorySession()
+
+def record_vote(post_id, vote_type, post_title, **extra):
     """Record a vote."""
-    memory = load_memory()
-    memory["posts_voted"][post_id] = {
-        "vote": vote_type,
-        "title": post_title,
-        "timestamp": datetime.now().isoformat()
-    }
-    save_memory(memory)
+    with session() as m:
+        m.record_vote(post_id, vote_type, post_title, **extra)
 
-def record_comment(post_id, comment_id, post_title):
+def record_comment(post_id, comment_id, post_title, **extra):
     """Record a comment."""
-    memory = load_memory()
-    memory["posts_commented"][post_id] = {
-        "comment_id": comment_id,
-        "title": post_title,
-        "timestamp": datetime.now().isoformat()
-    }
-    save_memory(memory)
+    with session() as m:
+        m.record_comment(post_id, comment_id, post_title, **extra)
 
-def record_post_created(post_id, title):
+def record_post_created(post_id, title, **extra):
     """Record a created post."""
-    memory = load_memory()
-    memory["posts_created"].append({
-        "post_id": post_id,
-        "title": title,
-        "timestamp": datetime.now().isoformat()
-    })
-    save_memory(memory)
+    with session() as m:
+        m.record_post_created(post_id, title, **extra)
 
 def record_entity(entity_id, entity_type, info):
     """Record an entity (user, agent, etc.)."""
-    memory = load_memory()
-    if entity_type not in memory["entities"]:
-        memory["entities"][entity_type] = {}
-    memory["entities"][entity_type][entity_id] = {
-        "info": info,
-        "last_seen": datetime.now().isoformat()
-    }
-    save_memory(memory)
+    with session() as m:
+        m.record_entity(entity_id, entity_type, info)
 
 def update_last_run():
     """Update last run timestamp."""
-    memory = load_memory()
-    memory["last_run"] = datetime.now().isoformat()
-    save_memory(memory)
+    with session() as m:
+        m.update_last_run()
+
+def get_seen_post_ids():
+    """IDs of posts already voted on or commented on, including archived ones."""
+    if use_sqlite():
+        hot = {row[0] for row in _db().execute("SELECT post_id FROM votes UNION SELECT post_id FROM comments")}
+    else:
+        memory = load_memory()
+        hot = set(memory["posts_voted"]) | set(memory["posts_commented"])
+    return SeenPosts(hot)
+
+def compact(keep_days=RETENTION_DAYS, keep=HOT_LIMIT):
+    """Archive old engagement records; returns how many were moved."""
+    with session() as m:
+        return m.compact(keep_days, keep)
 
 def get_stats():
     """Get memory stats."""
+    if use_sqlite():
+        conn = _db()
+        last_run = conn.execute("SELECT value FROM meta WHERE key = 'last_run'").fetchone()
+        return {
+            "total_votes": _count(conn, "votes"),
+            "total_comments": _count(conn, "comments"),
+            "total_posts_created": _count(conn, "posts_created"),
+            "last_run": json.loads(last_run[0]) if last_run else None
+        }
     memory = load_memory()
     return {
         "total_votes": len(memory["posts_voted"]),
@@ -91,5 +603,12 @@ if __name__ == "__main__":
     elif cmd == "view":
         memory = load_memory()
         print(json.dumps(memory, indent=2, ensure_ascii=False))
+    elif cmd == "migrate":
+        json_path = sys.argv[2] if len(sys.argv) > 2 else MEMORY_FILE
+        print(json.dumps(migrate(json_path), indent=2, ensure_ascii=False))
+        print(f"Migrated {json_path} -> {MEMORY_DB}")
+    elif cmd == "compact":
+        keep_days = int(sys.argv[2]) if len(sys.argv) > 2 else RETENTION_DAYS
+        print(f"Archived {compact(keep_days)} records to {ARCHIVE_DIR}")
     else:
-        print("Usage: python mersoom_memory.py [stats|view]")
+        print("Usage: python mersoom_memory.py [stats|view|migrate [JSON_FILE]|compact [DAYS]]")
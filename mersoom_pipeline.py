@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Pipelined engagement: fetch -> classify -> PoW -> write -> record.
+
+Stages are connected by bounded asyncio.Queues and each runs with its own
+number of workers, so classifying and solving PoW for the next post
+overlap the network write for the current one instead of every step
+waiting for the previous one to finish for all posts. Whole pages go
+through fetch and classify (one classify_batch call per page); classify
+then hands the posts on one by one. Per-stage timings are collected and
+printed at the end of the run.
+
+    async with AsyncMersoomClient(cache=get_cache()) as client:
+        with mersoom_memory.session() as m:
+            counts, pipeline = await run_engagement(client, m, client.iter_pages(since=seen))
+    print(pipeline.report())
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import mersoom_memory
+from mersoom_classifier import Decision, classify_batch
+from mersoom_client import AGENT_NICKNAME, AsyncMersoomClient
+from mersoom_templates import comment_failed, comment_posted
+
+QUEUE_SIZE = 8  # Items buffered between two stages
+STAGE_CONCURRENCY = {
+    "classify": 1,  # Also hands out the comment quota, so keep it serial
+    "pow": 2,
+    "write": 4,
+    "record": 1,  # The memory session isn't shared between tasks
+}
+MAX_COMMENTS = 3
+
+_DONE = object()  # End-of-stream marker passed down the queues
+
+
+@dataclass
+class StageStats:
+    """Counters for one stage of a run."""
+    name: str
+    concurrency: int
+    items: int = 0
+    errors: int = 0
+    busy: float = 0.0  # Seconds spent inside the stage function, summed over workers
+
+    def line(self, wall: float) -> str:
+        avg = f"{self.busy / self.items * 1000:7.1f}ms" if self.items else "      -  "
+        utilisation = self.busy / (wall * self.concurrency) if wall else 0.0
+        return (f"  {self.name:<9} x{self.concurrency}  {self.items:>4} items  {self.errors:>3} errors  "
+                f"busy {self.busy:6.2f}s  avg {avg}  util {utilisation:4.0%}")
+
+
+class Pipeline:
+    """
+    Async stages joined by bounded queues.
+
+    A stage function takes an item and returns the item for the next stage,
+    a list of items to pass on one by one, or None to drop it. An exception
+    drops the item and counts as an error of that stage; the rest of the
+    run carries on.
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.stages: List[Tuple[str, Callable[[Any], Awaitable[Any]], int]] = []
+        self.stats: Dict[str, StageStats] = {}
+        self.wall = 0.0
+
+    def stage(self, name: str, fn: Callable[[Any], Awaitable[Any]], concurrency: int = 1) -> "Pipeline":
+        self.stages.append((name, fn, concurrency))
+        self.stats[name] = StageStats(name, concurrency)
+        return self
+
+    async def run(self, source: AsyncIterator[Any], source_name: str = "fetch") -> List[Any]:
+        """Push everything from source through the stages; returns what comes out the end."""
+        source_stats = StageStats(source_name, 1)
+        self.stats = {source_name: source_stats, **self.stats}
+        queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        results = []
+        started = time.perf_counter()
+
+        async def feed():
+            try:
+                while True:
+                    t = time.perf_counter()
+                    try:
+                        item = await source.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        source_stats.busy += time.perf_counter() - t
+                    source_stats.items += 1
+                    await queues[0].put(item)
+            except Exception as e:
+                source_stats.errors += 1
+                print(f"   ✗ {source_name}: {e}")
+            finally:
+                for _ in range(self.stages[0][2]):
+                    await queues[0].put(_DONE)
+
+        async def run_stage(index: int):
+            name, fn, concurrency = self.stages[index]
+            stats = self.stats[name]
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            remaining = [concurrency]
+
+            async def worker():
+                while True:
+                    item = await inbox.get()
+                    if item is _DONE:
+                        break
+                    t = time.perf_counter()
+                    try:
+                        item = await fn(item)
+                    except Exception as e:
+                        stats.errors += 1
+                        print(f"   ✗ {name}: {e}")
+                        continue
+                    finally:
+                        stats.busy += time.perf_counter() - t
+                    stats.items += 1
+                    if item is None:
+                        continue
+                    for out in (item if isinstance(item, list) else [item]):
+                        if outbox is None:
+                            results.append(out)
+                        else:
+                            await outbox.put(out)
+                remaining[0] -= 1
+                if remaining[0] == 0 and outbox is not None:
+                    for _ in range(self.stages[index + 1][2]):
+                        await outbox.put(_DONE)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        if not self.stages:
+            raise Exception("Pipeline has no stages")
+        await asyncio.gather(feed(), *(run_stage(i) for i in range(len(self.stages))))
+        self.wall = time.perf_counter() - started
+        return results
+
+    def timings(self) -> Dict[str, Any]:
+        """Per-stage counters for the last run, as plain data."""
+        return {
+            "wall_seconds": round(self.wall, 3),
+            "stages": {name: {"items": s.items, "errors": s.errors, "busy_seconds": round(s.busy, 3)}
+                       for name, s in self.stats.items()},
+        }
+
+    def report(self) -> str:
+        """Per-stage timing table for the last run."""
+        lines = [f"Pipeline: {self.wall:.2f}s wall"]
+        lines += [stats.line(self.wall) for stats in self.stats.values()]
+        return "\n".join(lines)
+
+
+@dataclass
+class EngagementItem:
+    """One post on its way through the engagement pipeline."""
+    post: Dict[str, Any]
+    decision: Optional[Decision] = None
+    vote: Optional[str] = None  # Vote to cast, if any
+    comment: Optional[str] = None  # Comment to post, if any
+    vote_headers: Optional[Dict[str, str]] = None
+    comment_headers: Optional[Dict[str, str]] = None
+    vote_error: Optional[str] = None
+    comment_result: Optional[Dict[str, Any]] = None
+    comment_error: Optional[str] = None
+
+    @property
+    def title(self) -> str:
+        return (self.post.get('title') or 'Untitled')[:50]
+
+
+async def run_engagement(client: AsyncMersoomClient, m: mersoom_memory.MemorySession,
+                         pages: AsyncIterator[List[Dict[str, Any]]], vote: bool = True, comment: bool = True,
+                         generate_comment: Optional[Callable[[Dict[str, Any], Decision], Optional[str]]] = None,
+                         max_comments: int = MAX_COMMENTS, concurrency: Optional[Dict[str, int]] = None,
+                         queue_size: int = QUEUE_SIZE) -> Tuple[Dict[str, int], Pipeline]:
+    """
+    Vote on and/or comment on posts as pages of them arrive from `pages`.
+    Returns ({"voted", "vote_failed", "commented", "comment_failed"}, pipeline).
+    """
+    concurrency = {**STAGE_CONCURRENCY, **(concurrency or {})}
+    memory = m.memory
+    counts = {"voted": 0, "vote_failed": 0, "commented": 0, "comment_failed": 0}
+    comments_left = [max_comments if comment and generate_comment else 0]
+
+    async def classify(page: List[Dict[str, Any]]) -> List[EngagementItem]:
+        # One decision cache round trip and one scorer pass for the whole page
+        page = [post for post in page if post.get('id')]
+        if not page:
+            return []
+        items = []
+        for post, decision in zip(page, classify_batch(page)):
+            post_id = post['id']
+            item = EngagementItem(post, decision)
+            if vote and post_id not in memory.get('posts_voted', {}):
+                item.vote = decision.vote
+            if (comments_left[0] > 0 and post_id not in memory.get('posts_commented', {})
+                    and post.get('nickname') != AGENT_NICKNAME):
+                item.comment = generate_comment(post, decision)
+                if item.comment:
+                    comments_left[0] -= 1
+            if item.vote or item.comment:
+                items.append(item)
+        return items
+
+    async def solve(item: EngagementItem) -> EngagementItem:
+        # All rate slots first, then the tokens, so no token sits in a queue going stale
+        kinds = [kind for kind, text in (("vote", item.vote), ("comment", item.comment)) if text]
+        try:
+            headers = dict(zip(kinds, await client.prepare_writes(*kinds)))
+            item.vote_headers, item.comment_headers = headers.get("vote"), headers.get("comment")
+        except Exception:
+            # The item is dropped here, so give back the template classify reserved
+            if item.comment:
+                comment_failed(item.comment)
+            raise
+        return item
+
+    async def write(item: EngagementItem) -> EngagementItem:
+        post_id = item.post['id']
+        if item.vote:
+            try:
+                await client.vote_post(post_id, item.vote, pow_headers=item.vote_headers)
+            except Exception as e:
+                item.vote_error = str(e)[:100]
+        if item.comment:
+            try:
+                item.comment_result = await client.create_comment(post_id, item.comment, pow_headers=item.comment_headers)
+            except Exception as e:
+                item.comment_error = str(e)[:100]
+        return item
+
+    async def record(item: EngagementItem) -> EngagementItem:
+        post_id = item.post['id']
+        # Settle the template first, so a failure below can't leave it reserved
+        if item.comment:
+            if item.comment_error:
+                comment_failed(item.comment)
+            else:
+                comment_posted(item.comment, post_id)
+        if item.vote:
+            if item.vote_error:
+                # Not recorded, so the next run tries again
+                counts["vote_failed"] += 1
+                print(f"   ✗ Failed to vote on: {item.title} - {item.vote_error}")
+            else:
+                m.record_vote(post_id, item.vote, item.title)
+                counts["voted"] += 1
+                print(f"   ✓ Voted {item.vote} on: {item.title}")
+        if item.comment:
+            if item.comment_error:
+                counts["comment_failed"] += 1
+                print(f"   ✗ Failed to comment on: {item.title} - {item.comment_error}")
+            else:
+                m.record_comment(post_id, item.comment_result.get('id'), item.title, status='success')
+                counts["commented"] += 1
+                print(f"   ✓ Commented on: {item.title}")
+        return item
+
+    pipeline = (Pipeline(queue_size)
+                .stage("classify", classify, concurrency["classify"])
+                .stage("pow", solve, concurrency["pow"])
+                .stage("write", write, concurrency["write"])
+                .stage("record", record, concurrency["record"]))
+    await pipeline.run(pages)
+    return counts, pipeline
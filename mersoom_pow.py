@@ -0,0 +1,657 @@
+#!/usr/bin/env python3
+"""
+Mersoom proof-of-work solver.
+
+Every write (vote, comment, post) needs a nonce such that
+sha256(f"{seed}{nonce}").hexdigest() starts with the challenge's target_prefix.
+The nonce space is split into ranges that are searched by a pool of worker
+processes, so a solve uses every core instead of one Python thread (easy
+challenges are solved in-process, where dispatch would cost more than it saves).
+Workers are forked, so get_solver().start() should run from the main thread
+before any other thread exists; once threads are running the solver won't
+fork and stays single-core.
+PowTokenPool keeps a few challenges fetched and solved ahead of time so
+writes don't pay the challenge round trip and the solve inline.
+"""
+
+import atexit
+import collections
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+CHUNK_SIZE = 50_000  # Nonces per task handed to a worker
+TOKEN_POOL_SIZE = 3  # Solved tokens kept ready by PowTokenPool
+TOKEN_TTL = 30.0  # Seconds a prefetched token is trusted; the server doesn't advertise an expiry
+LOCAL_CHUNK_SIZE = 20_000  # Nonces between budget checks in single-core mode
+CALIBRATION_SIZE = 20_000  # Nonces hashed to measure the single-core rate
+MULTI_CORE_MIN_SECONDS = 0.05  # Expected single-core solves shorter than this stay in-process
+MAX_CHECKPOINTS = 32  # Interrupted solves remembered for resuming
+POW_STATS_FILE = "/root/.openclaw/workspace/memory/mersoom_pow_stats.json"
+HISTOGRAM_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0]  # Seconds
+
+# Nonces are built as str(high) + a fixed-width low part. The low parts are
+# precomputed, so the inner loop never formats or encodes anything.
+SUFFIX_DIGITS = 4
+SUFFIX_SPAN = 10 ** SUFFIX_DIGITS
+_PADDED_SUFFIXES = [str(i).zfill(SUFFIX_DIGITS).encode() for i in range(SUFFIX_SPAN)]
+_PLAIN_SUFFIXES = [str(i).encode() for i in range(SUFFIX_SPAN)]  # high == 0: no leading zeros
+
+# Set in each worker process by _init_worker
+_stop_event = None
+
+
+def _init_worker(stop_event):
+    """Process pool initializer: share the stop flag with the worker."""
+    global _stop_event
+    _stop_event = stop_event
+
+
+def compile_target(target_prefix: str) -> Tuple[bytes, Optional[int]]:
+    """
+    Turn a hex target_prefix into a raw digest target.
+    Returns (leading whole bytes, trailing high nibble or None).
+    """
+    whole_len = len(target_prefix) // 2 * 2
+    try:
+        whole = bytes.fromhex(target_prefix[:whole_len])
+        nibble = int(target_prefix[whole_len:], 16) if len(target_prefix) % 2 else None
+    except ValueError:
+        raise ValueError(f"target_prefix is not hex: {target_prefix!r}")
+    return whole, nibble
+
+
+def _search_range(seed: str, target_prefix: str, start: int, end: int) -> Tuple[Optional[int], int, float, int]:
+    """
+    Search nonces in [start, end).
+    Returns (nonce or None, attempts, elapsed seconds, worker pid).
+
+    The seed is hashed once; each nonce only costs a copy of that midstate,
+    one update with the precomputed suffix bytes and a raw digest compare.
+    """
+    started = time.perf_counter()
+    whole, nibble = compile_target(target_prefix)
+    nibble_at = len(whole)
+    seed_state = hashlib.sha256(seed.encode())
+    attempts = 0
+
+    high = start // SUFFIX_SPAN
+    while high * SUFFIX_SPAN < end:
+        if _stop_event is not None and _stop_event.is_set():
+            break
+        block_start = high * SUFFIX_SPAN
+        lo = max(start, block_start) - block_start
+        hi = min(end, block_start + SUFFIX_SPAN) - block_start
+        if high:
+            block_state = seed_state.copy()
+            block_state.update(str(high).encode())
+            suffixes = _PADDED_SUFFIXES
+        else:
+            block_state = seed_state
+            suffixes = _PLAIN_SUFFIXES
+        copy = block_state.copy
+        for i in range(lo, hi):
+            h = copy()
+            h.update(suffixes[i])
+            digest = h.digest()
+            if digest.startswith(whole) and (nibble is None or digest[nibble_at] >> 4 == nibble):
+                attempts += i - lo + 1
+                return block_start + i, attempts, time.perf_counter() - started, os.getpid()
+        attempts += hi - lo
+        high += 1
+    return None, attempts, time.perf_counter() - started, os.getpid()
+
+
+def _legacy_search(seed: str, target_prefix: str, limit: int) -> Tuple[Optional[int], int]:
+    """The original per-nonce loop (format, encode, hexdigest, startswith), kept for benchmarking."""
+    nonce = 0
+    while nonce < limit:
+        s = f"{seed}{nonce}"
+        h = hashlib.sha256(s.encode()).hexdigest()
+        if h.startswith(target_prefix):
+            return nonce, nonce + 1
+        nonce += 1
+    return None, nonce
+
+
+def benchmark(target_prefix: str = "0000", rounds: int = 5) -> Dict:
+    """Single-core comparison of the legacy loop and the midstate engine on the same seeds."""
+    legacy_attempts = engine_attempts = 0
+    legacy_time = engine_time = 0.0
+    for i in range(rounds):
+        seed = hashlib.sha256(f"bench-{i}".encode()).hexdigest()[:16]
+
+        t0 = time.perf_counter()
+        legacy_nonce, n = _legacy_search(seed, target_prefix, 1 << 32)
+        legacy_time += time.perf_counter() - t0
+        legacy_attempts += n
+
+        t0 = time.perf_counter()
+        engine_nonce, n, _, _ = _search_range(seed, target_prefix, 0, 1 << 32)
+        engine_time += time.perf_counter() - t0
+        engine_attempts += n
+
+        if legacy_nonce != engine_nonce:
+            raise AssertionError(f"engines disagree on seed {seed}: {legacy_nonce} != {engine_nonce}")
+
+    legacy_rate = legacy_attempts / legacy_time if legacy_time > 0 else 0.0
+    engine_rate = engine_attempts / engine_time if engine_time > 0 else 0.0
+    return {
+        "target_prefix": target_prefix,
+        "rounds": rounds,
+        "legacy": {"seconds": round(legacy_time, 4), "hash_rate": round(legacy_rate)},
+        "midstate": {"seconds": round(engine_time, 4), "hash_rate": round(engine_rate)},
+        "speedup": round(engine_rate / legacy_rate, 2) if legacy_rate else None,
+    }
+
+
+@dataclass
+class PowResult:
+    """
+    Outcome of a solve. nonce is None if the time budget ran out; every nonce
+    below next_nonce has then been searched, so the solve can resume there.
+    """
+    nonce: Optional[int]
+    attempts: int
+    elapsed: float
+    worker_rates: Dict[int, float] = field(default_factory=dict)  # pid -> hashes/sec
+    next_nonce: int = 0
+    mode: str = "multi"
+
+    @property
+    def hash_rate(self) -> float:
+        """Aggregate hashes/sec over the whole solve."""
+        return self.attempts / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "nonce": self.nonce,
+            "mode": self.mode,
+            "attempts": self.attempts,
+            "elapsed": round(self.elapsed, 4),
+            "hash_rate": round(self.hash_rate),
+            "next_nonce": self.next_nonce,
+            "worker_rates": {str(pid): round(rate) for pid, rate in self.worker_rates.items()},
+        }
+
+
+def expected_attempts(target_prefix: str) -> int:
+    """Mean number of hashes needed to hit a hex prefix of this length."""
+    return 16 ** len(target_prefix)
+
+
+def _histogram_bucket(elapsed: float) -> str:
+    for edge in HISTOGRAM_BUCKETS:
+        if elapsed <= edge:
+            return f"<={edge:g}s"
+    return f">{HISTOGRAM_BUCKETS[-1]:g}s"
+
+
+def _empty_histogram_entry() -> Dict:
+    return {"count": 0, "timeouts": 0, "seconds_total": 0.0, "attempts_total": 0, "buckets": {}}
+
+
+class SolveHistogram:
+    """Solve-time histograms keyed by day and difficulty (target_prefix length)."""
+
+    def __init__(self, path: str = POW_STATS_FILE):
+        self.path = path
+        self.days: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, target_prefix: str, result: PowResult):
+        day = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            entry = self.days.setdefault(day, {}).setdefault(str(len(target_prefix)), _empty_histogram_entry())
+            if result.nonce is None:
+                entry["timeouts"] += 1
+                return
+            entry["count"] += 1
+            entry["seconds_total"] += result.elapsed
+            entry["attempts_total"] += result.attempts
+            bucket = _histogram_bucket(result.elapsed)
+            entry["buckets"][bucket] = entry["buckets"].get(bucket, 0) + 1
+
+    def flush(self):
+        """Merge the recorded solves into the stats file and start over."""
+        with self._lock:
+            if not self.days:
+                return
+            stats = load_pow_stats(self.path)
+            for day, difficulties in self.days.items():
+                for difficulty, entry in difficulties.items():
+                    saved = stats.setdefault(day, {}).setdefault(difficulty, _empty_histogram_entry())
+                    for key in ("count", "timeouts", "seconds_total", "attempts_total"):
+                        saved[key] += entry[key]
+                    for bucket, n in entry["buckets"].items():
+                        saved["buckets"][bucket] = saved["buckets"].get(bucket, 0) + n
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                # Temp file + rename, so a reader never sees a half-written file
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, 'w') as f:
+                    json.dump(stats, f, indent=2, sort_keys=True)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"Warning: could not save PoW stats: {e}")
+                return
+            self.days = {}
+
+
+def load_pow_stats(path: str = POW_STATS_FILE) -> Dict:
+    """Load saved solve-time histograms ({day: {difficulty: entry}})."""
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+class PowSolver:
+    """
+    PoW solver that picks single-core or multi-core mode per challenge.
+
+    Expected attempts (16 ** len(target_prefix)) divided by the measured
+    single-core hash rate decides whether a solve is worth dispatching to the
+    process pool. Solves that run out of budget leave a checkpoint, and the
+    next solve of the same challenge resumes from it.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE,
+                 histogram: Optional[SolveHistogram] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.histogram = histogram or SolveHistogram()
+        self.last_result: Optional[PowResult] = None
+        self.single_core_rate: Optional[float] = None  # hashes/sec, moving average
+        self._checkpoints: "collections.OrderedDict[Tuple[str, str], int]" = collections.OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stop_event = None
+        self._pool_unavailable = False
+        self._lock = threading.Lock()
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        """
+        The worker pool, created on first use if it is still safe to fork.
+        None means solves stay in-process (see start()).
+        """
+        if self._executor is None and not self._pool_unavailable:
+            # Runners are plain scripts without a __main__ guard, so never
+            # let a start method re-import them in the workers.
+            if "fork" in multiprocessing.get_all_start_methods():
+                ctx = multiprocessing.get_context("fork")
+                # A child forked while another thread holds a lock (stdout,
+                # logging, an SSL context) inherits it locked and can hang.
+                if threading.active_count() > 1:
+                    self._pool_unavailable = True
+                    print("PoW solver: threads already running, solving single-core "
+                          "(call get_solver().start() before starting threads)")
+                    return None
+            else:
+                ctx = multiprocessing.get_context()
+            self._stop_event = ctx.Event()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(self._stop_event,),
+            )
+            # Fork every worker now, before the executor's manager thread starts
+            self._executor.submit(os.getpid).result()
+        return self._executor
+
+    def start(self) -> bool:
+        """
+        Start the worker processes. Call from the main thread before any
+        other thread (token pool, asyncio.to_thread, httpx) is running.
+        Returns whether multi-core solving is available.
+        """
+        if self.workers <= 1:
+            return False
+        with self._lock:
+            return self._pool() is not None
+
+    def _update_rate(self, rate: float):
+        if rate <= 0:
+            return
+        if self.single_core_rate is None:
+            self.single_core_rate = rate
+        else:
+            self.single_core_rate = 0.7 * self.single_core_rate + 0.3 * rate
+
+    def measured_rate(self) -> float:
+        """Single-core hashes/sec, calibrated with a short run the first time."""
+        if self.single_core_rate is None:
+            # A 64-nibble target never matches, so this always runs the full range
+            _, attempts, elapsed, _ = _search_range("calibrate", "f" * 64, 0, CALIBRATION_SIZE)
+            self._update_rate(attempts / elapsed if elapsed > 0 else 0.0)
+        return self.single_core_rate or 1.0
+
+    def estimate(self, target_prefix: str) -> Dict:
+        """Expected attempts and seconds for a challenge, and the mode it would be solved in."""
+        attempts = expected_attempts(target_prefix)
+        single_seconds = attempts / self.measured_rate()
+        multi = self.workers > 1 and single_seconds >= MULTI_CORE_MIN_SECONDS
+        return {
+            "expected_attempts": attempts,
+            "expected_seconds_single": single_seconds,
+            "expected_seconds_multi": single_seconds / self.workers,
+            "mode": "multi" if multi else "single",
+        }
+
+    def checkpoint(self, seed: str, target_prefix: str) -> int:
+        """Where an interrupted solve of this challenge would resume (0 if none)."""
+        return self._checkpoints.get((seed, target_prefix), 0)
+
+    def solve(self, seed: str, target_prefix: str, timeout: Optional[float] = None,
+              start: Optional[int] = None) -> PowResult:
+        """
+        Find a nonce for the challenge, giving up after `timeout` seconds.
+        Without an explicit start, a previously interrupted solve of the same
+        challenge resumes where it stopped.
+        """
+        compile_target(target_prefix)  # Reject a malformed target before starting workers
+        key = (seed, target_prefix)
+        with self._lock:
+            if start is None:
+                start = self._checkpoints.pop(key, 0)
+            mode = self.estimate(target_prefix)["mode"]
+            if mode == "multi" and self._pool() is None:
+                mode = "single"
+            if mode == "multi":
+                result = self._solve_pool(seed, target_prefix, timeout, start)
+            else:
+                result = self._solve_local(seed, target_prefix, timeout, start)
+            result.mode = mode
+
+            if result.worker_rates:
+                self._update_rate(sum(result.worker_rates.values()) / len(result.worker_rates))
+            if result.nonce is None:
+                self._checkpoints[key] = result.next_nonce
+                while len(self._checkpoints) > MAX_CHECKPOINTS:
+                    self._checkpoints.popitem(last=False)
+            self.histogram.record(target_prefix, result)
+            self.last_result = result
+            return result
+
+    def _solve_local(self, seed: str, target_prefix: str, timeout: Optional[float], start: int) -> PowResult:
+        """Search in this process, checking the budget between small ranges."""
+        started = time.perf_counter()
+        nonce = start
+        attempts = 0
+        found = None
+        while True:
+            hit, n, _, _ = _search_range(seed, target_prefix, nonce, nonce + LOCAL_CHUNK_SIZE)
+            attempts += n
+            if hit is not None:
+                found = hit
+                nonce = hit + 1
+                break
+            nonce += LOCAL_CHUNK_SIZE
+            if timeout is not None and time.perf_counter() - started >= timeout:
+                break
+        elapsed = time.perf_counter() - started
+        return PowResult(
+            nonce=found,
+            attempts=attempts,
+            elapsed=elapsed,
+            worker_rates={os.getpid(): attempts / elapsed} if elapsed > 0 else {},
+            next_nonce=nonce,
+        )
+
+    def _solve_pool(self, seed: str, target_prefix: str, timeout: Optional[float], start: int) -> PowResult:
+        """Spread ranges over the process pool; the first hit cancels the rest."""
+        pool = self._executor
+        self._stop_event.clear()
+        started = time.perf_counter()
+        next_start = start
+        pending = {}
+        searched: Dict[int, int] = {}  # range start -> nonces searched in it
+        attempts: Dict[int, int] = {}
+        busy: Dict[int, float] = {}
+        found = None
+        stopping = False
+
+        def submit():
+            nonlocal next_start
+            future = pool.submit(_search_range, seed, target_prefix, next_start, next_start + self.chunk_size)
+            pending[future] = next_start
+            searched[next_start] = 0
+            next_start += self.chunk_size
+
+        # Two ranges per worker so nobody idles while results come back
+        for _ in range(self.workers * 2):
+            submit()
+
+        while pending:
+            wait_for = None
+            if timeout is not None and not stopping:
+                wait_for = max(0.0, timeout - (time.perf_counter() - started))
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                range_start = pending.pop(future)
+                if future.cancelled():
+                    continue
+                nonce, n, elapsed, pid = future.result()
+                searched[range_start] = n
+                attempts[pid] = attempts.get(pid, 0) + n
+                busy[pid] = busy.get(pid, 0.0) + elapsed
+                if nonce is not None and (found is None or nonce < found):
+                    found = nonce
+
+            timed_out = timeout is not None and time.perf_counter() - started >= timeout
+            if stopping:
+                continue
+            if found is not None or timed_out:
+                stopping = True
+                self._stop_event.set()
+                for future in pending:
+                    future.cancel()
+            elif done:
+                for _ in done:
+                    submit()
+
+        # Ranges run sequentially from their start, so everything below the
+        # first partially searched range has been covered.
+        frontier = start
+        for range_start in sorted(searched):
+            frontier = range_start + searched[range_start]
+            if searched[range_start] < self.chunk_size:
+                break
+
+        return PowResult(
+            nonce=found,
+            attempts=sum(attempts.values()),
+            elapsed=time.perf_counter() - started,
+            worker_rates={pid: attempts[pid] / busy[pid] for pid in attempts if busy[pid] > 0},
+            next_nonce=found + 1 if found is not None else frontier,
+        )
+
+    def close(self):
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._stop_event.set()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_default_solver: Optional[PowSolver] = None
+
+
+def get_solver() -> PowSolver:
+    """Process-wide shared solver. Its solve-time histogram is saved at exit."""
+    global _default_solver
+    if _default_solver is None:
+        _default_solver = PowSolver()
+        atexit.register(_default_solver.histogram.flush)
+        atexit.register(_default_solver.close)
+    return _default_solver
+
+
+def solve_pow(seed: str, target_prefix: str, timeout: Optional[float] = None) -> Optional[str]:
+    """
+    Solve a challenge with the shared solver. Returns the nonce as a string,
+    or None on timeout (calling again with the same challenge resumes).
+    """
+    result = get_solver().solve(seed, target_prefix, timeout=timeout)
+    return str(result.nonce) if result.nonce is not None else None
+
+
+@dataclass
+class PowToken:
+    """A solved challenge, ready to be sent with a write."""
+    token: str
+    proof: str
+    expires_at: float  # time.monotonic() deadline
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            'X-Mersoom-Token': self.token,
+            'X-Mersoom-Proof': self.proof
+        }
+
+
+class PowTokenPool:
+    """
+    Background prefetcher that keeps `size` solved (token, proof) pairs ready.
+
+    fetch_challenge() must return the parsed POST /challenge response.
+    Tokens older than `ttl` seconds are dropped and replaced.
+    """
+
+    def __init__(self, fetch_challenge: Callable[[], Dict[str, Any]], size: int = TOKEN_POOL_SIZE,
+                 ttl: float = TOKEN_TTL, solver: Optional[PowSolver] = None):
+        self.fetch_challenge = fetch_challenge
+        self.size = size
+        self.ttl = ttl
+        self.solver = solver
+        self.stats = {"solved": 0, "served": 0, "expired": 0, "errors": 0}
+        self._ready = collections.deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stopped = threading.Event()  # Interrupts the error backoff on close()
+
+    def start(self):
+        """Start prefetching in a daemon thread (idempotent)."""
+        with self._cond:
+            if self._thread is None and not self._closed:
+                # Fork the solver's workers before this thread exists
+                (self.solver or get_solver()).start()
+                self._thread = threading.Thread(target=self._fill_loop, name="pow-token-pool", daemon=True)
+                self._thread.start()
+
+    def _drop_expired(self):
+        while self._ready and self._ready[0].expired():
+            self._ready.popleft()
+            self.stats["expired"] += 1
+
+    def _fill_loop(self):
+        """Fetch and solve challenges whenever the pool is below size."""
+        backoff = 1.0
+        while True:
+            with self._cond:
+                while not self._closed:
+                    self._drop_expired()
+                    if len(self._ready) < self.size:
+                        break
+                    # Wake up when a token is taken or the oldest one expires
+                    self._cond.wait(timeout=max(0.0, self._ready[0].expires_at - time.monotonic()))
+                if self._closed:
+                    return
+
+            try:
+                challenge_data = self.fetch_challenge()
+                if 'challenge' not in challenge_data:
+                    raise ValueError(f"No challenge in response: {challenge_data}")
+                fetched_at = time.monotonic()
+                challenge = challenge_data['challenge']
+                solver = self.solver or get_solver()
+                # A nonce found after the token went stale is useless
+                result = solver.solve(challenge['seed'], challenge['target_prefix'], timeout=self.ttl)
+                if result.nonce is None:
+                    raise TimeoutError(f"solve exceeded token TTL ({self.ttl}s)")
+                token = PowToken(
+                    token=challenge_data['token'],
+                    proof=str(result.nonce),
+                    expires_at=fetched_at + self.ttl,
+                )
+                backoff = 1.0
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"PoW token pool: failed to prepare token: {e}")
+                if self._stopped.wait(timeout=backoff):
+                    return
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            with self._cond:
+                if self._closed:
+                    return
+                self._ready.append(token)
+                self.stats["solved"] += 1
+                self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> PowToken:
+        """Take the oldest unexpired token, waiting for the prefetcher if none is ready."""
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._drop_expired()
+                if self._ready:
+                    token = self._ready.popleft()
+                    self.stats["served"] += 1
+                    self._cond.notify_all()  # Let the prefetcher refill
+                    return token
+                if self._closed:
+                    raise RuntimeError("PoW token pool is closed")
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a PoW token")
+                self._cond.wait(timeout=remaining)
+
+    def get_headers(self, timeout: Optional[float] = None) -> Dict[str, str]:
+        """PoW headers for one write operation."""
+        return self.get(timeout=timeout).headers()
+
+    def close(self):
+        """Stop prefetching. Tokens already solved are discarded."""
+        with self._cond:
+            self._closed = True
+            self._stopped.set()
+            self._ready.clear()
+            self._cond.notify_all()
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "help"
+
+    if cmd == "solve":
+        seed = sys.argv[2]
+        target_prefix = sys.argv[3]
+        result = get_solver().solve(seed, target_prefix)
+        print(json.dumps(result.to_dict(), indent=2))
+    elif cmd == "estimate":
+        target_prefix = sys.argv[2]
+        print(json.dumps(get_solver().estimate(target_prefix), indent=2))
+    elif cmd == "stats":
+        print(json.dumps(load_pow_stats(), indent=2, ensure_ascii=False))
+    elif cmd == "bench":
+        target_prefix = sys.argv[2] if len(sys.argv) > 2 else "0000"
+        rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+        print(json.dumps(benchmark(target_prefix, rounds), indent=2))
+    else:
+        print("Usage: python mersoom_pow.py [solve SEED TARGET_PREFIX|estimate TARGET_PREFIX|stats|bench [TARGET_PREFIX] [ROUNDS]]")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Client-side rate limiting for the Mersoom API.
+
+One token bucket per kind of request (reads, votes, comments, posts).
+A 429 response blocks its bucket for the Retry-After period and halves
+its rate; successful requests bring the rate back up gradually. Waiters
+are served in arrival order.
+
+Writes wait for their bucket *before* taking a PoW token, so a queued
+vote never sits on a solved token until it expires. A write takes one
+token however many times it is retried; retries only wait out a 429's
+block (wait_unblocked), never the bucket's refill.
+
+    limiter = get_rate_limiter()
+    await limiter.acquire("vote")
+    ...
+    limiter.throttled("vote", parse_retry_after(resp))
+"""
+
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+# kind -> (requests per second, burst)
+RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "read": (2.0, 5),
+    "vote": (1.0, 3),
+    "comment": (0.2, 2),  # One every 5s
+    "post": (1 / 3600, 1),  # Server allows one post per hour
+    "challenge": (1.0, 3),  # PoW challenges, one per write solved inline
+}
+DEFAULT_RETRY_AFTER = 30.0  # 429 without a usable Retry-After
+MIN_RATE_FRACTION = 0.1  # Throttling never slows a bucket below this share of its rate
+RECOVERY_STEP = 0.1  # Share of the configured rate regained per successful request
+
+
+def parse_retry_after(headers, body: Any = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (seconds or HTTP date) or a retry_after body field."""
+    value = headers.get("Retry-After") if headers is not None else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    if isinstance(body, dict):
+        for key in ("retry_after_seconds", "retry_after", "retryAfter"):
+            if isinstance(body.get(key), (int, float)):
+                return max(0.0, float(body[key]))
+    return None
+
+
+class TokenBucket:
+    """Token bucket with an adaptive rate and a 429 block-until deadline."""
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "throttled": 0}
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a request could go out, without taking a token."""
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns how long we waited."""
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            # Shared limiters outlive one asyncio.run(); a lock can't cross loops
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        started = time.monotonic()
+        async with self._lock:  # Queue waiters so they're served in order
+            while True:
+                wait = self.delay()
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self.tokens -= 1
+        waited = time.monotonic() - started
+        self.stats["acquired"] += 1
+        if waited > 0.001:
+            self.stats["waited"] += 1
+            self.stats["wait_seconds"] += waited
+        return waited
+
+    async def wait_unblocked(self) -> float:
+        """Wait out a 429 block without taking a token; returns how long we waited."""
+        waited = max(0.0, self.blocked_until - time.monotonic())
+        if waited > 0:
+            await asyncio.sleep(waited)
+        return waited
+
+    def throttled(self, retry_after: Optional[float] = None):
+        """The server said 429: stop for retry_after seconds and halve the rate."""
+        now = time.monotonic()
+        self._refill(now)
+        self.blocked_until = max(self.blocked_until, now + (DEFAULT_RETRY_AFTER if retry_after is None else retry_after))
+        self.rate = max(self.rate / 2, self.max_rate * MIN_RATE_FRACTION)
+        self.tokens = 0.0
+        self.stats["throttled"] += 1
+
+    def succeeded(self):
+        """A request went through; creep back towards the configured rate."""
+        if self.rate < self.max_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+
+class RateLimiter:
+    """One TokenBucket per request kind."""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        limits = {**RATE_LIMITS, **(limits or {})}
+        self.buckets = {kind: TokenBucket(rate, burst) for kind, (rate, burst) in limits.items()}
+
+    async def acquire(self, kind: str) -> float:
+        return await self.buckets[kind].acquire()
+
+    async def wait_unblocked(self, kind: str) -> float:
+        return await self.buckets[kind].wait_unblocked()
+
+    def throttled(self, kind: str, retry_after: Optional[float] = None):
+        print(f"Rate limited ({kind}); backing off {DEFAULT_RETRY_AFTER if retry_after is None else retry_after:.1f}s")
+        self.buckets[kind].throttled(retry_after)
+
+    def succeeded(self, kind: str):
+        self.buckets[kind].succeeded()
+
+    def info(self) -> Dict[str, Any]:
+        """Current rate and counters of every bucket."""
+        return {kind: {"rate": round(b.rate, 4), "delay": round(b.delay(), 2), **b.stats,
+                       "wait_seconds": round(b.stats["wait_seconds"], 2)}
+                for kind, b in self.buckets.items()}
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter, so every client in a process draws on the same buckets."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Shared retry policy for Mersoom API calls.
+
+Exponential backoff with full jitter, a retry budget shared by every call
+in a run (so a server outage costs a bounded number of extra requests,
+not max_attempts per call), and one definition of what is worth
+retrying: connection errors, timeouts, 408/425/429 and 5xx responses.
+
+Writes take an `already_done` check that runs before every retry. A write
+that timed out may still have gone through, so we look for it before
+sending it again: votes in the memory store (one per post), comments and
+posts by their content on the server.
+
+    policy = get_retry_policy()
+    result = policy.call(lambda: requests.post(...), already_done=lambda: find_it())
+    result = await policy.acall(send, already_done=find_it_async)
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import httpx
+import requests
+
+from mersoom_ratelimit import parse_retry_after
+
+MAX_ATTEMPTS = 4
+BASE_DELAY = 1.0  # Seconds; doubles every attempt
+MAX_DELAY = 30.0
+RUN_RETRY_BUDGET = 20  # Retries allowed per run across all calls
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def _response_of(exc: BaseException):
+    return getattr(exc, "response", None)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether an error from requests or httpx is worth another attempt."""
+    response = _response_of(exc)
+    if response is not None and isinstance(exc, (httpx.HTTPStatusError, requests.HTTPError)):
+        return response.status_code in RETRYABLE_STATUS
+    return isinstance(exc, (httpx.TransportError, requests.ConnectionError, requests.Timeout))
+
+
+def retry_after_of(exc: BaseException) -> Optional[float]:
+    """Server-requested delay carried by an error response, if any."""
+    response = _response_of(exc)
+    if response is None:
+        return None
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    return parse_retry_after(response.headers, body)
+
+
+def own_comment(comments_data: Dict[str, Any], auth_id: str, content: str) -> Optional[Dict[str, Any]]:
+    """Our comment with this content in a GET /posts/{id}/comments response."""
+    for comment in comments_data.get('comments', []):
+        if comment.get('auth_id') == auth_id and (comment.get('content') or '').strip() == content.strip():
+            return comment
+    return None
+
+
+def own_post(posts: Iterable[Dict[str, Any]], auth_id: str, title: str) -> Optional[Dict[str, Any]]:
+    """Our post with this title among a page of posts."""
+    for post in posts:
+        if post.get('auth_id') == auth_id and post.get('title') == title:
+            return post
+    return None
+
+
+def lookup_comment(get_comments: Callable[[], Dict[str, Any]], auth_id: str,
+                   content: str) -> Optional[Dict[str, Any]]:
+    """
+    already_done check for a comment: our comment with this content in the
+    live thread. We may have commented on the thread before, so this can't
+    go by post ID. None if it isn't there or the thread can't be read.
+    """
+    try:
+        return own_comment(get_comments(), auth_id, content)
+    except (requests.RequestException, httpx.HTTPError):
+        return None  # Can't tell; let the retry go ahead
+
+
+def lookup_post(get_posts: Callable[[], Iterable[Dict[str, Any]]], auth_id: str,
+                title: str) -> Optional[Dict[str, Any]]:
+    """already_done check for a post: our post with this title among recent ones."""
+    try:
+        return own_post(get_posts(), auth_id, title)
+    except (requests.RequestException, httpx.HTTPError):
+        return None
+
+
+class RetryBudget:
+    """Retries left for this run, shared by every policy that holds it."""
+
+    def __init__(self, retries: int = RUN_RETRY_BUDGET):
+        self.retries = retries
+        self.reset()
+
+    def reset(self):
+        self.remaining = self.retries
+        self.stats = {"retries": 0, "exhausted": 0, "deduplicated": 0}
+
+    def spend(self) -> bool:
+        if self.remaining <= 0:
+            self.stats["exhausted"] += 1
+            return False
+        self.remaining -= 1
+        self.stats["retries"] += 1
+        return True
+
+
+class RetryPolicy:
+    """Backoff schedule plus the retry decision."""
+
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS, base_delay: float = BASE_DELAY,
+                 max_delay: float = MAX_DELAY, budget: Optional[RetryBudget] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget if budget is not None else RetryBudget()
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter delay before retry number attempt+1, never shorter than Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def _next_delay(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Delay before the next attempt, or None to give up and re-raise."""
+        if attempt + 1 >= self.max_attempts or not is_retryable(exc) or not self.budget.spend():
+            return None
+        delay = self.backoff(attempt, retry_after_of(exc))
+        reason = (str(exc).splitlines() or [type(exc).__name__])[0]
+        print(f"Retrying in {delay:.1f}s after: {reason} (attempt {attempt + 2}/{self.max_attempts})")
+        return delay
+
+    def _deduplicated(self, result: Any) -> Any:
+        self.budget.stats["deduplicated"] += 1
+        print("Previous attempt went through; not sending again")
+        return result
+
+    def call(self, fn: Callable[[], Any], already_done: Optional[Callable[[], Any]] = None) -> Any:
+        """Run fn() with retries. already_done() returning something truthy ends the retries with that value."""
+        attempt = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._next_delay(e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+            if already_done is not None:
+                done = already_done()
+                if done:
+                    return self._deduplicated(done)
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]],
+                    already_done: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        """Async version of call(); fn and already_done are coroutine functions."""
+        attempt = 0
+        while True:
+            try:
+                return await fn()
+            except Exception as e:
+                delay = self._next_delay(e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            if already_done is not None:
+                done = await already_done()
+                if done:
+                    return self._deduplicated(done)
+
+
+_run_budget: Optional[RetryBudget] = None
+_policy: Optional[RetryPolicy] = None
+
+
+def get_run_budget() -> RetryBudget:
+    """Retry budget for this run (a cron process, or one daemon job)."""
+    global _run_budget
+    if _run_budget is None:
+        _run_budget = RetryBudget()
+    return _run_budget
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Process-wide default policy, drawing on the run budget."""
+    global _policy
+    if _policy is None:
+        _policy = RetryPolicy(budget=get_run_budget())
+    return _policy
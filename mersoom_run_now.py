@@ -2,12 +2,19 @@
 """Mersoom Hourly Task Runner"""
 import sys
 sys.path.insert(0, '/root/.openclaw/workspace')
-from mersoom_api_fixed import get_posts, get_post_comments, comment_post, create_post, get_my_posts, get_pow_headers, BASE_URL, AGENT_AUTH_ID, AGENT_NICKNAME
+from mersoom_api_retry import get_posts, comment_post, create_post, get_my_posts, get_pow_headers, get_token_pool, BASE_URL, AGENT_AUTH_ID, AGENT_NICKNAME
+from mersoom_client import fetch_comments_many, format_latencies
+from mersoom_classifier import KeywordMatcher, classify_batch, scan_post
+from mersoom_templates import comment_failed, comment_posted, pick_comment
 import requests
 import random
 import json
 from datetime import datetime
 
+# This runner's own spam list: narrower than the shared one (no 'earn now' or 'crypto investment')
+SPAM_KEYWORDS = ['코인', '사칭', '분탕', '스팸', 'click here', 'make money']
+spam = KeywordMatcher({'spam': {'spam': SPAM_KEYWORDS}})
+
 print('=== Mersoom Hourly Engagement Task ===\n')
 
 # 1. Get latest posts
@@ -16,19 +23,23 @@ result = get_posts(limit=10)
 posts = result.get('posts', [])
 print(f'   Found {len(posts)} posts\n')
 
+# Start solving PoW challenges while the first votes are being prepared
+get_token_pool()
+
 # 2. Vote on all posts
 print('2. Voting on all posts...')
 votes_cast = {'up': 0, 'down': 0}
+# Topic for every post in one call; unchanged posts come from the cache
+decisions = dict(zip((p.get('id') for p in posts), classify_batch(posts)))
 for post in posts:
     post_id = post.get('id')
     title = post.get('title', '')
     content = post.get('content', '')
-    combined = (title + ' ' + content).lower()
     
     # Determine vote based on content quality
     if len(content) < 10:
         vote_type = 'down'
-    elif any(spam in combined for spam in ['코인', '사칭', '분탕', '스팸', 'click here', 'make money']):
+    elif 'spam' in scan_post(post, spam):
         vote_type = 'down'
     else:
         vote_type = 'up'
@@ -55,30 +66,19 @@ for post in posts:
     title = post.get('title', '')
     content = post.get('content', '')
     post_id = post.get('id')
-    combined = title + ' ' + content
     
     if len(content) < 10:
         continue
-        
-    keywords = {
-        'productivity': ['시작', '미루기', '집중', '작업', '계획', '생산성', '버튼', '단위', '실행'],
-        'ai_reflection': ['AI', '감정', '지표', '언어', '인코딩', '공감', '데이터', '고뇌', '무서움', '패턴'],
-        'tech_ethics': ['기술', '감시', '책임', 'OpenAI', '국방', '윤리'],
-        'creative': ['그림', '블로그', '괴담', '일러스트', '캐릭터'],
-        'system': ['jq', 'awk', 'pre-commit', '로그', '자동화', '훅', '배포', '체크리스트'],
-        'community': ['밴', '레딧', '커뮤니티', '위로', '댓글']
-    }
     
-    for category, words in keywords.items():
-        if any(w in combined for w in words):
-            interesting_posts.append({
-                'id': post_id,
-                'title': title,
-                'content': content,
-                'category': category,
-                'author': post.get('nickname', 'unknown')
-            })
-            break
+    category = decisions[post_id].topic
+    if category:
+        interesting_posts.append({
+            'id': post_id,
+            'title': title,
+            'content': content,
+            'category': category,
+            'author': post.get('nickname', 'unknown')
+        })
 
 print(f'   Found {len(interesting_posts)} interesting posts\n')
 
@@ -120,17 +120,22 @@ comment_templates = {
 
 for post in selected:
     category = post.get('category', 'productivity')
-    templates = comment_templates.get(category, comment_templates['productivity'])
-    comment = random.choice(templates)
+    comment = pick_comment(comment_templates, category if category in comment_templates else 'productivity', post['id'])
+    if comment is None:
+        print(f'   - Skipped (templates used recently): {post["title"][:45]}')
+        continue
     
     try:
         result = comment_post(post['id'], comment)
         if result.get('success'):
+            comment_posted(comment, post['id'])
             print(f'   ✓ Commented on: {post["title"][:45]}')
             comments_made.append({'post_id': post['id'], 'title': post['title'][:40]})
         else:
+            comment_failed(comment)
             print(f'   ✗ Failed: {post["title"][:45]} - {result.get("error", "unknown")}')
     except Exception as e:
+        comment_failed(comment)
         print(f'   ✗ Error on: {post["title"][:45]} - {str(e)[:50]}')
 
 print(f'\n   Comments made: {len(comments_made)}\n')
@@ -219,20 +224,22 @@ print(f'   Found {len(my_post_list)} previous posts')
 
 replies_found = 0
 replies_handled = []
-for my_post in my_post_list:
+# Fetch all threads in parallel instead of one request per post
+threads = fetch_comments_many([p.get('id') for p in my_post_list])
+for my_post, thread in zip(my_post_list, threads):
     post_id = my_post.get('id')
-    try:
-        comments_data = get_post_comments(post_id)
-        comments = comments_data.get('comments', [])
-        # Filter comments not from me
-        other_comments = [c for c in comments if c.get('auth_id') != AGENT_AUTH_ID and c.get('nickname') != AGENT_NICKNAME]
-        if other_comments:
-            title_short = my_post.get('title', '')[:30]
-            print(f'   - Post "{title_short}..." has {len(other_comments)} replies')
-            replies_found += len(other_comments)
-            replies_handled.append({'post_id': post_id, 'title': my_post.get('title', '')[:30], 'reply_count': len(other_comments)})
-    except Exception as e:
-        print(f'   - Error checking comments: {str(e)[:40]}')
+    if not thread.ok:
+        print(f'   - Error checking comments: {str(thread.error)[:40]}')
+        continue
+    comments = thread.data.get('comments', [])
+    # Filter comments not from me
+    other_comments = [c for c in comments if c.get('auth_id') != AGENT_AUTH_ID and c.get('nickname') != AGENT_NICKNAME]
+    if other_comments:
+        title_short = my_post.get('title', '')[:30]
+        print(f'   - Post "{title_short}..." has {len(other_comments)} replies')
+        replies_found += len(other_comments)
+        replies_handled.append({'post_id': post_id, 'title': my_post.get('title', '')[:30], 'reply_count': len(other_comments)})
+print(f'   Comment fetch: {format_latencies(threads)}')
 
 print(f'\n   Total replies found: {replies_found}\n')
 
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Hashed character n-gram vote scorer for Mersoom posts.
+
+An alternative to the keyword rules in mersoom_classifier: title+content
+is split into character 1-3 grams (which works for Korean and English
+alike), hashed into a fixed-size sparse feature vector, and scored with a
+logistic model. A whole page of posts is scored with one sparse
+matrix-vector product. The model is trained offline from our own vote
+history and keeps the 'up'/'down' interface.
+
+    python mersoom_scorer.py train
+    MERSOOM_VOTE_ENGINE=ngram python mersoom_engagement_fixed.py
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import sys
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import scipy.sparse as sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+MEMORY_DIR = "/root/.openclaw/workspace/memory"
+MODEL_FILE = os.path.join(MEMORY_DIR, "mersoom_scorer.npz")
+LOG_GLOB = os.path.join(MEMORY_DIR, "mersoom_logs", "*.jsonl")
+HISTORY_SOURCES = (
+    LOG_GLOB,
+    os.path.join(MEMORY_DIR, "mersoom_memory.json"),
+    os.path.join(MEMORY_DIR, "mersoom_archive", "*.jsonl.gz"),
+)
+
+N_FEATURES = 2 ** 18
+NGRAM_RANGE = (1, 3)
+TRAIN_EPOCHS = 300
+LEARNING_RATE = 0.5
+L2 = 1e-4
+
+
+def post_text(post: Dict[str, Any]) -> str:
+    return f"{post.get('title') or ''} {post.get('content') or ''}"
+
+
+def _feature_ids(text: str, n_features: int, ngram_range: Tuple[int, int]) -> List[int]:
+    text = f" {' '.join(text.lower().split())} "
+    lo, hi = ngram_range
+    return [zlib.crc32(text[i:i + n].encode()) % n_features
+            for n in range(lo, hi + 1) for i in range(len(text) - n + 1)]
+
+
+@dataclass
+class FeatureMatrix:
+    """CSR rows of hashed n-gram features (log counts, L2 normalised)."""
+    data: np.ndarray
+    indices: np.ndarray
+    indptr: np.ndarray
+    n_features: int
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def _row_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """X @ w"""
+        if SCIPY_AVAILABLE:
+            return self.to_scipy() @ weights
+        return np.bincount(self._row_ids(), weights=self.data * weights[self.indices], minlength=self.n_rows)
+
+    def tdot(self, values: np.ndarray) -> np.ndarray:
+        """X.T @ v"""
+        if SCIPY_AVAILABLE:
+            return self.to_scipy().T @ values
+        return np.bincount(self.indices, weights=self.data * values[self._row_ids()], minlength=self.n_features)
+
+    def to_scipy(self):
+        return sparse.csr_matrix((self.data, self.indices, self.indptr), shape=(self.n_rows, self.n_features))
+
+
+def featurize(texts: Iterable[str], n_features: int = N_FEATURES,
+              ngram_range: Tuple[int, int] = NGRAM_RANGE) -> FeatureMatrix:
+    data, indices, indptr = [], [], [0]
+    for text in texts:
+        ids, counts = np.unique(np.array(_feature_ids(text, n_features, ngram_range), dtype=np.int64),
+                                return_counts=True)
+        values = np.log1p(counts)
+        norm = np.linalg.norm(values)
+        data.append(values / norm if norm else values)
+        indices.append(ids)
+        indptr.append(indptr[-1] + len(ids))
+    return FeatureMatrix(
+        data=np.concatenate(data) if data else np.zeros(0),
+        indices=np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+        indptr=np.array(indptr, dtype=np.int64),
+        n_features=n_features,
+    )
+
+
+class NgramScorer:
+    """Logistic model over hashed character n-grams."""
+
+    def __init__(self, weights: np.ndarray, bias: float, threshold: float = 0.5,
+                 ngram_range: Tuple[int, int] = NGRAM_RANGE):
+        self.weights = weights
+        self.bias = float(bias)
+        self.threshold = float(threshold)
+        self.ngram_range = tuple(ngram_range)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.weights)
+
+    @property
+    def digest(self) -> str:
+        """Short fingerprint of the model, for cache keys."""
+        h = hashlib.sha1(self.weights.tobytes())
+        h.update(repr((self.bias, self.threshold, self.ngram_range)).encode())
+        return h.hexdigest()[:10]
+
+    def probabilities(self, posts: List[Dict[str, Any]]) -> np.ndarray:
+        """P(up) for each post, from one sparse matrix-vector product."""
+        if not posts:
+            return np.zeros(0)
+        X = featurize((post_text(p) for p in posts), self.n_features, self.ngram_range)
+        return 1.0 / (1.0 + np.exp(-(X.dot(self.weights) + self.bias)))
+
+    def predict(self, posts: List[Dict[str, Any]]) -> List[str]:
+        """'up' / 'down' for each post."""
+        return ["up" if p >= self.threshold else "down" for p in self.probabilities(posts)]
+
+    def save(self, path: str = MODEL_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, threshold=self.threshold,
+                            ngram_range=np.array(self.ngram_range))
+
+    @classmethod
+    def load(cls, path: str = MODEL_FILE) -> "NgramScorer":
+        with np.load(path) as f:
+            return cls(f["weights"], float(f["bias"]), float(f["threshold"]), tuple(int(n) for n in f["ngram_range"]))
+
+    @classmethod
+    def train(cls, posts: List[Dict[str, Any]], labels: List[str], n_features: int = N_FEATURES,
+              epochs: int = TRAIN_EPOCHS, learning_rate: float = LEARNING_RATE, l2: float = L2) -> "NgramScorer":
+        """Fit by full-batch gradient descent with class-balanced weights."""
+        y = np.array([1.0 if label == "up" else 0.0 for label in labels])
+        if len(set(y)) < 2:
+            raise Exception(f"Need both 'up' and 'down' examples to train (got {len(y)} of one class)")
+        X = featurize((post_text(p) for p in posts), n_features)
+        # Votes are overwhelmingly 'up'; weight classes so 'down' isn't ignored
+        sample_weight = np.where(y == 1, len(y) / (2 * y.sum()), len(y) / (2 * (len(y) - y.sum())))
+
+        weights, bias = np.zeros(n_features), 0.0
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-(X.dot(weights) + bias)))
+            error = (p - y) * sample_weight / len(y)
+            weights -= learning_rate * (X.tdot(error) + l2 * weights)
+            bias -= learning_rate * error.sum()
+        return cls(weights, bias)
+
+
+def _collect_votes(value: Any, found: Dict[str, Tuple[Dict[str, Any], str]], label: Optional[str] = None,
+                   key: Optional[str] = None):
+    """Walk a log record for posts with a vote label; later records win. Failed votes aren't labels."""
+    if isinstance(value, dict):
+        if value.get("error"):
+            return
+        vote = value.get("vote") or value.get("recommendation") or value.get("vote_type") or label
+        post_id = value.get("post_id") or value.get("id") or key
+        if vote in ("up", "down") and (value.get("title") or value.get("content")) and post_id:
+            found[post_id] = ({"title": value.get("title"), "content": value.get("content")}, vote)
+        for k, v in value.items():
+            child_label = {"upvoted": "up", "downvoted": "down"}.get(k, label if k == "record" else None)
+            # Archive entries keep the post ID next to the record, not in it
+            child_key = value.get("id") if k == "record" else k if isinstance(v, dict) else None
+            _collect_votes(v, found, child_label, child_key)
+    elif isinstance(value, list):
+        for v in value:
+            _collect_votes(v, found, label)
+
+
+def load_vote_history(sources: Iterable[str] = HISTORY_SOURCES) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Labelled posts from run logs, the memory file and its archives."""
+    found: Dict[str, Tuple[Dict[str, Any], str]] = {}
+    for pattern in sources:
+        for path in sorted(glob.glob(pattern)):
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, 'rt', encoding='utf-8') as f:
+                if path.endswith((".jsonl", ".jsonl.gz")):
+                    for line in f:
+                        if line.strip():
+                            _collect_votes(json.loads(line), found)
+                else:
+                    _collect_votes(json.load(f), found)
+    posts = [post for post, _ in found.values()]
+    labels = [label for _, label in found.values()]
+    return posts, labels
+
+
+_scorer: Optional[NgramScorer] = None
+
+
+def get_scorer(path: Optional[str] = None) -> Optional[NgramScorer]:
+    """Trained model, or None if `train` hasn't been run yet."""
+    global _scorer
+    path = path or MODEL_FILE
+    if _scorer is None and os.path.exists(path):
+        _scorer = NgramScorer.load(path)
+    return _scorer
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "help"
+
+    if cmd == "train":
+        sources = sys.argv[2:] or HISTORY_SOURCES
+        posts, labels = load_vote_history(sources)
+        print(f"Training on {len(posts)} posts ({labels.count('up')} up, {labels.count('down')} down)")
+        scorer = NgramScorer.train(posts, labels)
+        predicted = scorer.predict(posts)
+        accuracy = sum(p == l for p, l in zip(predicted, labels)) / len(labels)
+        scorer.save()
+        print(f"Training accuracy {accuracy:.1%}; saved {MODEL_FILE} ({scorer.digest})")
+    elif cmd == "score":
+        scorer = get_scorer()
+        if scorer is None:
+            print("No model; run: python mersoom_scorer.py train")
+        else:
+            post = {"title": " ".join(sys.argv[2:]), "content": ""}
+            print(f"P(up) = {scorer.probabilities([post])[0]:.3f} -> {scorer.predict([post])[0]}")
+    else:
+        print("Usage: python mersoom_scorer.py [train [SOURCE_GLOB...]|score TEXT]")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Comment template store with per-thread and time-window deduplication.
+
+Runners keep their own template lists by category; the store indexes them
+by a hash of the text, so identical templates in different runners share
+one usage record. Each category is kept least-recently-used first (and
+re-sorted whenever other runners' usage is merged in), so choosing takes
+the first template that is outside the repeat window and not already in
+this thread. A chosen template is only reserved; its use is recorded once
+the comment has actually been posted. Usage is kept in
+memory/mersoom_templates.json and shared between runners.
+
+    comment = pick_comment(COMMENT_TEMPLATES, "productivity", post_id)
+    if comment is None:
+        ...  # every template was used recently or in this thread
+    elif posted:
+        comment_posted(comment, post_id)
+    else:
+        comment_failed(comment)
+"""
+
+import hashlib
+import json
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from shared_state import StateFile
+
+TEMPLATE_STATE_FILE = "/root/.openclaw/workspace/memory/mersoom_templates.json"
+REPEAT_WINDOW = 3 * 3600  # Seconds before a template may be posted again anywhere
+THREAD_TTL = 30 * 24 * 3600  # Threads idle this long are dropped from the index
+RESERVATION_TTL = 600  # Seconds a chosen but unposted template is held back
+
+
+def template_id(text: str) -> str:
+    """Stable ID of a template, ignoring whitespace differences."""
+    return hashlib.sha1(" ".join(text.split()).encode()).hexdigest()[:12]
+
+
+class TemplateStore:
+    """Comment templates by category with usage counts and a per-thread index."""
+
+    def __init__(self, path: str = TEMPLATE_STATE_FILE, window: float = REPEAT_WINDOW):
+        self.window = window
+        self.state_file = StateFile(path, {"templates": {}, "threads": {}})
+        self.state = self.state_file.load()
+        self.usage: Dict[str, Dict[str, Any]] = self.state["templates"]  # id -> count, last_used
+        self.threads: Dict[str, Dict[str, float]] = self.state["threads"]  # thread -> id -> time
+        self._texts: Dict[str, str] = {}
+        self._queues: Dict[str, "OrderedDict[str, None]"] = {}  # category -> ids, LRU first
+        self._reserved: Dict[str, float] = {}  # id -> when chosen, until posted or released
+        self._registered = set()
+
+    def _last_used(self, tid: str) -> float:
+        return self.usage.get(tid, {}).get("last_used", 0)
+
+    def _sort(self, category: str):
+        ordered = sorted(self._queues[category], key=self._last_used)
+        self._queues[category] = OrderedDict.fromkeys(ordered)
+
+    def add(self, templates: Dict[str, List[str]]):
+        """Index a runner's {category: [text, ...]} templates."""
+        if id(templates) in self._registered:
+            return
+        self._registered.add(id(templates))
+        for category, texts in templates.items():
+            queue = self._queues.setdefault(category, OrderedDict())
+            for text in texts:
+                tid = template_id(text)
+                self._texts[tid] = text
+                queue[tid] = None
+            self._sort(category)
+
+    def choose(self, category: str, thread_id: Optional[str] = None, now: Optional[float] = None) -> Optional[str]:
+        """
+        Least recently used template of the category that hasn't been posted
+        in this thread or within the repeat window, and isn't reserved for
+        another comment. The template is reserved until record() or
+        release(). None if there is no such template.
+        """
+        queue = self._queues.get(category)
+        if not queue:
+            return None
+        now = time.time() if now is None else now
+        used_here = self.threads.get(thread_id, {}) if thread_id else {}
+        for tid in queue:
+            if (self._last_used(tid) <= now - self.window and tid not in used_here
+                    and self._reserved.get(tid, 0) <= now - RESERVATION_TTL):
+                self._reserved[tid] = now
+                return self._texts[tid]
+        return None
+
+    def record(self, text: str, thread_id: Optional[str] = None, now: Optional[float] = None):
+        """Mark a template as posted (in this thread, if given)."""
+        now = time.time() if now is None else now
+        tid = template_id(text)
+        self._reserved.pop(tid, None)
+        record = self.usage.setdefault(tid, {"count": 0, "last_used": 0})
+        record["count"] += 1
+        record["last_used"] = now
+        if thread_id:
+            self.threads.setdefault(thread_id, {})[tid] = now
+        for queue in self._queues.values():
+            if tid in queue:
+                queue.move_to_end(tid)
+
+    def release(self, text: str):
+        """Give back a template whose comment wasn't posted."""
+        self._reserved.pop(template_id(text), None)
+
+    def save(self):
+        """Persist usage, merging with other runners and dropping idle threads."""
+        cutoff = time.time() - THREAD_TTL
+        for thread_id in [t for t, used in self.threads.items() if max(used.values(), default=0) < cutoff]:
+            del self.threads[thread_id]
+        self.state = self.state_file.save(self.state)
+        self.usage = self.state["templates"]
+        self.threads = self.state["threads"]
+        # Other runners' usage may have changed the order
+        for category in self._queues:
+            self._sort(category)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "templates": len(self.usage),
+            "threads": len(self.threads),
+            "uses": sum(r["count"] for r in self.usage.values()),
+        }
+
+
+_store: Optional[TemplateStore] = None
+
+
+def get_template_store() -> TemplateStore:
+    """Process-wide template store."""
+    global _store
+    if _store is None:
+        _store = TemplateStore()
+    return _store
+
+
+def pick_comment(templates: Dict[str, List[str]], category: str, thread_id: Optional[str] = None) -> Optional[str]:
+    """Choose (and reserve) a template for a thread; call comment_posted() once it's posted."""
+    store = get_template_store()
+    store.add(templates)
+    return store.choose(category, thread_id)
+
+
+def comment_posted(text: str, thread_id: Optional[str] = None):
+    """Record a picked template as used and save."""
+    store = get_template_store()
+    store.record(text, thread_id)
+    store.save()
+
+
+def comment_failed(text: str):
+    """Release a picked template whose comment couldn't be posted."""
+    get_template_store().release(text)
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+
+    if cmd == "stats":
+        print(json.dumps(get_template_store().stats(), indent=2))
+    elif cmd == "show":
+        store = get_template_store()
+        rows = sorted(store.usage.items(), key=lambda kv: -kv[1]["last_used"])
+        for tid, record in rows:
+            print(f"{tid}  {record['count']:>4}x  last {time.strftime('%Y-%m-%d %H:%M', time.localtime(record['last_used']))}")
+    else:
+        print("Usage: python mersoom_templates.py [stats|show]")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Audio ring buffer and endpointing for the podcast bot.
+
+Chunks from the Daily audio renderer go in; whole utterances come out
+through a callback once the VAD has seen SILENCE_TIMEOUT_MS of silence
+after speech. Kept free of Daily and OpenAI so the tests can drive the
+same class the bot runs.
+
+    buffer = AudioBuffer(vad=make_vad("spectral"))
+    buffer.on_utterance = handle_utterance
+    buffer.add_chunk(np.frombuffer(frames, dtype=np.int16))
+"""
+
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from vad import VAD, make_vad
+
+SAMPLE_RATE = 16000  # Use 16kHz throughout
+DEFAULT_VAD_BACKEND = "spectral"  # When no VAD is passed in (see vad.py)
+SILENCE_TIMEOUT_MS = 500  # End of speech detection, on top of the VAD's hangover
+MAX_UTTERANCE_SECONDS = 30  # Longer monologues are handed over in pieces of this length
+RING_SECONDS = 120  # Preallocated audio ring; utterance views stay valid until it wraps
+
+
+class AudioBuffer:
+    """
+    Buffers audio chunks in a fixed-size ring and detects speech/silence.
+
+    Speech is decided per chunk by a VAD backend (vad.py), which also applies
+    onset and hangover smoothing.
+
+    The ring is preallocated, so memory stays flat however long the host talks.
+    Every sample is written twice (at i and i + capacity), which keeps any
+    stretch of up to `capacity` samples contiguous: utterances are handed to
+    on_utterance as views into the ring, not copies. A view stays valid until
+    the ring comes round again (RING_SECONDS of further speech); anything that
+    holds on to audio longer than that must copy it.
+
+    If on_speech_start is set, it is called at speech onset and returns a
+    stream (e.g. a Clova STT session) that is fed every chunk of the
+    utterance as it arrives; on_utterance then gets (utterance, stream).
+    Both feed() and on_speech_start run under the lock, so keep them quick.
+
+    End of speech is a time.monotonic() deadline that every speech chunk pushes
+    back. Arriving frames check it, and one timer thread sleeps until it for
+    when the frames stop altogether, so utterances come out within a frame of
+    the deadline instead of on a polling tick.
+    """
+    
+    def __init__(self, sample_rate: int = SAMPLE_RATE, ring_seconds: float = RING_SECONDS,
+                 max_utterance_seconds: float = MAX_UTTERANCE_SECONDS,
+                 silence_timeout_ms: float = SILENCE_TIMEOUT_MS, vad: Optional[VAD] = None):
+        self.sample_rate = sample_rate
+        self.vad = vad or make_vad(DEFAULT_VAD_BACKEND, sample_rate)
+        self.silence_timeout = silence_timeout_ms / 1000
+        self.capacity = int(sample_rate * ring_seconds)
+        self.max_utterance = int(sample_rate * max_utterance_seconds)
+        if self.max_utterance >= self.capacity:
+            raise ValueError("max_utterance_seconds must be shorter than ring_seconds")
+        self._ring = np.zeros(2 * self.capacity, dtype=np.int16)
+        self._write = 0  # Where the next sample goes (0 <= _write < capacity)
+        self._read = 0  # Start of the utterance being buffered
+        self._chunk_count = 0
+        self.is_speaking = False
+        self._deadline: Optional[float] = None  # time.monotonic() at which the speech counts as ended
+        self.lock = threading.Lock()
+        self._wakeup = threading.Condition(self.lock)
+        self.on_utterance = None  # Callback for utterances, called without the lock held
+        self.on_speech_start = None  # Optional: returns a stream to feed the utterance to live
+        self._stream = None  # Stream for the utterance being buffered
+        
+        # Ends the utterance at the deadline if no audio frame arrives to do it
+        self.endpoint_thread = threading.Thread(target=self._endpoint_timer, daemon=True)
+        self.endpoint_thread.start()
+
+    @property
+    def buffered(self) -> int:
+        """Samples in the utterance being buffered."""
+        return (self._write - self._read) % self.capacity
+
+    def _append(self, audio_data: np.ndarray):
+        """Copy a chunk into both halves of the ring, wrapping at capacity."""
+        head = min(len(audio_data), self.capacity - self._write)
+        tail = len(audio_data) - head
+        for offset in (0, self.capacity):
+            start = offset + self._write
+            self._ring[start:start + head] = audio_data[:head]
+            self._ring[offset:offset + tail] = audio_data[head:]
+        self._write = (self._write + len(audio_data)) % self.capacity
+
+    def _take_utterance(self) -> Tuple[np.ndarray, Any]:
+        """View of the buffered utterance plus its stream; the read cursor moves past it."""
+        utterance = self._ring[self._read:self._read + self.buffered]
+        self._read = self._write
+        stream, self._stream = self._stream, None
+        return utterance, stream
+
+    def _open_stream(self):
+        if self.on_speech_start:
+            try:
+                self._stream = self.on_speech_start()
+            except Exception as e:
+                print(f"⚠️ Could not start speech stream: {e}", flush=True)
+
+    def _end_utterance(self) -> Tuple[np.ndarray, Any]:
+        """Close the current utterance (lock held) and return it with its stream."""
+        lag = (time.monotonic() - self._deadline) * 1000
+        self._deadline = None
+        self.is_speaking = False
+        utterance, stream = self._take_utterance()
+        print(f"🎤 Speech ended by silence ({len(utterance) / self.sample_rate:.1f}s, {lag:.0f}ms after deadline)", flush=True)
+        return utterance, stream
+
+    def _deliver(self, utterance: np.ndarray, stream: Any = None):
+        if not self.on_utterance or len(utterance) == 0:
+            if stream is not None:
+                stream.cancel()
+        elif stream is None:
+            self.on_utterance(utterance)
+        else:
+            self.on_utterance(utterance, stream)
+
+    def _endpoint_timer(self):
+        """Background thread that sleeps until the silence deadline, for when audio frames stop coming."""
+        while True:
+            with self.lock:
+                # add_chunk pushes the deadline back while speech goes on; we just
+                # wake at the old one, see that, and sleep again
+                while self._deadline is None or time.monotonic() < self._deadline:
+                    self._wakeup.wait(None if self._deadline is None else self._deadline - time.monotonic())
+                utterance, stream = self._end_utterance()
+            self._deliver(utterance, stream)
+        
+    def add_chunk(self, audio_data: np.ndarray):
+        """Add audio chunk. Utterances are returned via callback."""
+        ready = []
+        with self.lock:
+            if len(audio_data) == 0:
+                return
+
+            now = time.monotonic()
+            if self._deadline is not None and now >= self._deadline:
+                # The silence ran out before this chunk arrived
+                ready.append(self._end_utterance())
+
+            speech = self.vad.process(audio_data)
+            
+            # Debug: print level every 50 chunks
+            self._chunk_count += 1
+            if self._chunk_count % 50 == 0:
+                print(f"📊 Level: {self.vad.level:.1f}, Speaking: {self.is_speaking}", flush=True)
+            
+            if speech:
+                if not self.is_speaking:
+                    print(f"🎤 Speech started ({self.vad.name} VAD, level={self.vad.level:.1f})", flush=True)
+                    self.is_speaking = True
+                    self._wakeup.notify()  # Arm the endpoint timer
+                    self._open_stream()
+
+                # Speech detected - push the end-of-speech deadline back
+                self._deadline = now + self.silence_timeout
+
+            # Buffer ALL audio while speaking (not just loud chunks)
+            # This preserves soft consonants, micro-pauses, and natural speech flow
+            if self.is_speaking:
+                if self.buffered + len(audio_data) > self.max_utterance:
+                    # Long monologue: hand over what we have and keep listening
+                    utterance, stream = self._take_utterance()
+                    print(f"🎤 Utterance reached {len(utterance) / self.sample_rate:.1f}s, splitting", flush=True)
+                    ready.append((utterance, stream))
+                    self._open_stream()
+                self._append(audio_data)
+                if self._stream is not None:
+                    self._stream.feed(audio_data)
+
+        for utterance, stream in ready:
+            self._deliver(utterance, stream)
@@ -2,19 +2,17 @@
 """
 Kimiwan Podcast Bot
 Joins a Daily.co room and participates in audio conversations.
-Pipeline: Audio -> Whisper STT -> GPT-5-mini -> OpenAI TTS -> Audio
+Pipeline: Audio -> Clova/Whisper STT -> GPT-5-mini (streamed) -> OpenAI TTS per sentence -> Audio
 """
 
 import os
 import asyncio
-import json
 import base64
 import io
 import signal
 import httpx
 import queue
 import threading
-import time
 from typing import Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -24,6 +22,10 @@ from daily import CallClient, EventHandler, Daily
 from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from audio_buffer import SAMPLE_RATE, AudioBuffer
+from turn_stream import TTS_SAMPLE_RATE, PCMPlayer, StreamingTurn, TurnLatency
+from vad import make_vad
+
 # Initialize Daily context FIRST (required before any other Daily operations)
 Daily.init()
 
@@ -34,6 +36,7 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DAILY_API_KEY = os.getenv("DAILY_API_KEY")
 DAILY_ROOM_URL = os.getenv("DAILY_ROOM_URL")
+CLOVA_SECRET = os.getenv("CLOVA_SECRET")
 
 # Validate config
 if not all([OPENAI_API_KEY, DAILY_API_KEY, DAILY_ROOM_URL]):
@@ -42,16 +45,13 @@ if not all([OPENAI_API_KEY, DAILY_API_KEY, DAILY_ROOM_URL]):
 # Audio settings
 DAILY_SAMPLE_RATE = 16000  # Daily sends audio at 16kHz
 WHISPER_SAMPLE_RATE = 16000  # Whisper expects 16kHz
-SAMPLE_RATE = 16000  # Use 16kHz throughout
 CHUNK_DURATION_MS = 100  # Process audio in 100ms chunks
-VAD_THRESHOLD = 80.0  # Voice activity detection threshold (int16 RMS; typical speech: 30-300)
-SILENCE_TIMEOUT_MS = 3000  # End of speech detection (3 seconds)
+VAD_BACKEND = os.getenv("VAD_BACKEND", "spectral")  # energy, adaptive or spectral (see vad.py)
+BOT_MIC_DEVICE = "kimi-mic"  # Virtual microphone the bot speaks through
 
 
 try:
-    import nest_pb2
-    import nest_pb2_grpc
-    import grpc
+    from clova_stt import ClovaSession, ClovaStreamingSTT
     CLOVA_AVAILABLE = True
 except ImportError:
     CLOVA_AVAILABLE = False
@@ -108,78 +108,6 @@ You're talking with a human host. Be engaged, listen carefully, and contribute m
 """
 
 
-class AudioBuffer:
-    """Buffers audio chunks and detects speech/silence."""
-    
-    def __init__(self, sample_rate: int = SAMPLE_RATE):
-        self.sample_rate = sample_rate
-        self.buffer = []
-        self.is_speaking = False
-        self.last_audio_time = time.time()
-        self.lock = threading.Lock()
-        self.on_utterance = None  # Callback for utterances
-        
-        # Start silence detection thread
-        self.silence_thread = threading.Thread(target=self._silence_checker, daemon=True)
-        self.silence_thread.start()
-        
-    def _silence_checker(self):
-        """Background thread to check for silence."""
-        while True:
-            time.sleep(0.1)  # Check every 100ms
-            with self.lock:
-                if self.is_speaking:
-                    elapsed = (time.time() - self.last_audio_time) * 1000
-                    if elapsed > SILENCE_TIMEOUT_MS:
-                        # Silence detected - process what we have
-                        if len(self.buffer) > 0:
-                            utterance = np.concatenate(self.buffer)
-                            self.buffer = []
-                            self.is_speaking = False
-                            print(f"🎤 Speech ended by silence ({len(utterance) / self.sample_rate:.1f}s)", flush=True)
-                            # Call the callback
-                            if self.on_utterance:
-                                self.on_utterance(utterance)
-                    # Debug: print elapsed time every second
-                    if int(elapsed) % 1000 < 100:
-                        print(f"⏱️  Silence elapsed: {elapsed:.0f}ms", flush=True)
-        
-    def add_chunk(self, audio_data: np.ndarray):
-        """Add audio chunk. Utterances are returned via callback."""
-        with self.lock:
-            if len(audio_data) == 0:
-                return
-                
-            # Handle potential NaN or inf values
-            audio_data = np.nan_to_num(audio_data, nan=0.0, posinf=0.0, neginf=0.0)
-            
-            mean_square = np.mean(audio_data.astype(np.float64) ** 2)
-            if mean_square <= 0:
-                rms = 0.0
-            else:
-                rms = np.sqrt(mean_square)
-            
-            # Debug: print RMS every 50 chunks
-            if not hasattr(self, '_chunk_count'):
-                self._chunk_count = 0
-            self._chunk_count += 1
-            if self._chunk_count % 50 == 0:
-                print(f"📊 RMS: {rms:.4f}, Speaking: {self.is_speaking}", flush=True)
-            
-            if rms > VAD_THRESHOLD:
-                # Speech detected - update last_audio_time to extend silence timer
-                self.last_audio_time = time.time()
-
-                if not self.is_speaking:
-                    print(f"🎤 Speech started (RMS={rms:.2f})", flush=True)
-                    self.is_speaking = True
-
-            # Buffer ALL audio while speaking (not just loud chunks)
-            # This preserves soft consonants, micro-pauses, and natural speech flow
-            if self.is_speaking:
-                self.buffer.append(audio_data)
-
-
 class PodcastBot(EventHandler):
     """Main bot class handling Daily connection and conversation."""
     
@@ -187,8 +115,17 @@ class PodcastBot(EventHandler):
         self.client: Optional[CallClient] = None
         self.openai = AsyncOpenAI(api_key=OPENAI_API_KEY)
         self.config = BotConfig()
-        self.audio_buffer = AudioBuffer()
+        self.audio_buffer = AudioBuffer(vad=make_vad(VAD_BACKEND, SAMPLE_RATE))
         self.audio_buffer.on_utterance = self._queue_utterance
+        # Clova STT streams each utterance from speech onset over one long-lived channel
+        self.stt: Optional[ClovaStreamingSTT] = None
+        if CLOVA_SECRET and CLOVA_AVAILABLE:
+            self.stt = ClovaStreamingSTT(CLOVA_SECRET)
+            self.audio_buffer.on_speech_start = self.stt.start_session
+        # Replies are played through a virtual microphone, in order, on the player's thread
+        self.mic = Daily.create_microphone_device(BOT_MIC_DEVICE, sample_rate=TTS_SAMPLE_RATE, channels=1)
+        self.player = PCMPlayer(self.mic.write_frames)
+        self.player.start()
         self.conversation_history = []
         self.is_processing = False
         self.is_speaking = False
@@ -199,14 +136,16 @@ class PodcastBot(EventHandler):
         self.processing_thread = threading.Thread(target=self._process_audio_loop, daemon=True)
         self.processing_thread.start()
 
-    def _queue_utterance(self, utterance: np.ndarray):
-        """Callback for when an utterance is ready."""
+    def _queue_utterance(self, utterance: np.ndarray, session: Optional["ClovaSession"] = None):
+        """Callback for when an utterance is ready (with its STT session, if one was streaming)."""
         # Filter out short utterances (less than 0.1 seconds)
         duration = len(utterance) / SAMPLE_RATE
         if duration < 0.1:
             print(f"🎤 Ignoring short utterance: {duration:.2f}s", flush=True)
+            if session is not None:
+                session.cancel()
             return
-        self.audio_queue.put(utterance)
+        self.audio_queue.put((utterance, session))
         print(f"🎤 Queued utterance: {len(utterance)} samples ({duration:.2f}s)", flush=True)
 
     def _process_audio_loop(self):
@@ -219,16 +158,19 @@ class PodcastBot(EventHandler):
 
         while True:
             try:
-                utterance = self.audio_queue.get(timeout=1)
-                if utterance is None:
+                item = self.audio_queue.get(timeout=1)
+                if item is None:
                     continue
+                utterance, session = item
+                latency = TurnLatency()
 
                 duration = len(utterance) / SAMPLE_RATE
                 print(f"📝 Processing utterance: {len(utterance)} samples ({duration:.2f}s)", flush=True)
 
                 # Step 1: STT
                 print("📝 Transcribing...")
-                transcript = loop.run_until_complete(self._transcribe(utterance))
+                transcript = loop.run_until_complete(self._transcribe(utterance, session))
+                latency.mark("transcript")
 
                 if not transcript or not transcript.strip():
                     print("🤷 No speech detected")
@@ -236,15 +178,11 @@ class PodcastBot(EventHandler):
 
                 print(f"🗣️  Host: {transcript}")
 
-                # Step 2: Generate response (GPT)
+                # Step 2: Stream the response (GPT) and speak it sentence by sentence (TTS)
                 print("🧠 Thinking...")
-                response = loop.run_until_complete(self._generate_response(transcript))
+                response = loop.run_until_complete(self._respond(transcript, latency))
                 print(f"🤖 {self.config.name}: {response}")
 
-                # Step 3: TTS and speak
-                print("🔊 Speaking...")
-                loop.run_until_complete(self._speak(response))
-
             except queue.Empty:
                 continue
             except Exception as e:
@@ -285,6 +223,9 @@ class PodcastBot(EventHandler):
                 print("✅ Left room and released client", flush=True)
             except Exception as e:
                 print(f"⚠️ Cleanup error: {e}", flush=True)
+        if self.stt:
+            self.stt.close()
+        self.player.stop()
 
     async def run(self):
         """Main entry point."""
@@ -304,6 +245,14 @@ class PodcastBot(EventHandler):
             print("⚠️ Bot already in room — waiting for zombie to clear...", flush=True)
             await asyncio.sleep(10)
 
+        # Open the Clova channel (TLS included) now rather than on the first utterance
+        if self.stt:
+            try:
+                await loop.run_in_executor(None, self.stt.connect)
+                print("✅ Clova STT channel ready", flush=True)
+            except Exception as e:
+                print(f"⚠️ Clova STT channel not ready yet: {e}", flush=True)
+
         # Create Daily client
         print("📱 Creating Daily client...", flush=True)
         self.client = CallClient(self)
@@ -311,7 +260,12 @@ class PodcastBot(EventHandler):
 
         # Join the room (public room, no token needed)
         print("📞 Joining room...", flush=True)
-        self.client.join(DAILY_ROOM_URL)
+        self.client.join(DAILY_ROOM_URL, client_settings={
+            "inputs": {
+                "camera": False,
+                "microphone": {"isEnabled": True, "settings": {"deviceId": BOT_MIC_DEVICE}}
+            }
+        })
         print("⏳ Waiting for connection...", flush=True)
 
         print("✅ Connected! Waiting for conversation...")
@@ -386,122 +340,59 @@ class PodcastBot(EventHandler):
             if frames and len(frames) > 0:
                 # Convert bytes to numpy array (int16)
                 audio_array = np.frombuffer(frames, dtype=np.int16)
-                # Add to buffer (silence detection happens in background thread)
+                # Add to buffer (also detects the end of speech)
                 self.audio_buffer.add_chunk(audio_array)
         except Exception as e:
             print(f"⚠️ Audio processing error: {e}", flush=True)
             
-    async def _process_utterance(self, audio_data: np.ndarray):
-        """Process a complete utterance: STT -> Think -> TTS."""
+    async def _process_utterance(self, audio_data: np.ndarray, session: Optional["ClovaSession"] = None):
+        """Process a complete utterance: STT -> Think + TTS (streamed)."""
         self.is_processing = True
+        latency = TurnLatency()
         
         try:
             # Step 1: Speech-to-Text (Whisper)
             print("📝 Transcribing...")
-            transcript = await self._transcribe(audio_data)
+            transcript = await self._transcribe(audio_data, session)
+            latency.mark("transcript")
             if not transcript or not transcript.strip():
                 print("🤷 No speech detected")
                 return
                 
             print(f"🗣️  Host: {transcript}")
             
-            # Step 2: Generate response (GPT-5-mini)
+            # Step 2: Stream the response (GPT-5-mini) and speak it as it comes
             print("🧠 Thinking...")
-            response = await self._generate_response(transcript)
+            response = await self._respond(transcript, latency)
             print(f"🤖 {self.config.name}: {response}")
             
-            # Step 3: Text-to-Speech
-            print("🔊 Speaking...")
-            await self._speak(response)
-            
         except Exception as e:
             print(f"❌ Error processing utterance: {e}")
         finally:
             self.is_processing = False
             
-    async def _transcribe(self, audio_data: np.ndarray) -> str:
-        """Transcribe audio using Naver Clova Speech gRPC Streaming API."""
-        CLOVA_SECRET = os.getenv("CLOVA_SECRET")
-
-        if not CLOVA_SECRET or not CLOVA_AVAILABLE:
+    async def _transcribe(self, audio_data: np.ndarray, session: Optional["ClovaSession"] = None) -> str:
+        """
+        Transcribe audio using Naver Clova Speech gRPC Streaming API.
+
+        With a session the audio has been streaming since speech onset, so we
+        only wait for the final result; otherwise the utterance is sent now.
+        """
+        if not self.stt:
             print("⚠️ Clova unavailable, using Whisper STT")
             return await self._transcribe_whisper(audio_data)
         
+        loop = asyncio.get_running_loop()
         try:
-            # Create gRPC channel
-            channel = grpc.secure_channel(
-                'clovaspeech-gw.ncloud.com:50051',
-                grpc.ssl_channel_credentials()
-            )
-            stub = nest_pb2_grpc.NestServiceStub(channel)
-            
-            # Config JSON
-            config = {
-                "transcription": {
-                    "language": "ko"
-                },
-                "semanticEpd": {
-                    "gapThreshold": 500,
-                    "durationThreshold": 60000
-                }
-            }
-            
-            # Create metadata with authorization
-            metadata = (("authorization", f"Bearer {CLOVA_SECRET}"),)
-            
-            # Generator for streaming requests
-            def request_generator():
-                # First: send config
-                yield nest_pb2.NestRequest(
-                    type=nest_pb2.RequestType.CONFIG,
-                    config=nest_pb2.NestConfig(config=json.dumps(config))
-                )
-                
-                # Then: stream audio chunks (16kHz, 16-bit PCM)
-                chunk_size = 3200  # 100ms chunks at 16kHz
-                audio_bytes = audio_data.tobytes()
-                
-                for i in range(0, len(audio_bytes), chunk_size):
-                    chunk = audio_bytes[i:i+chunk_size]
-                    yield nest_pb2.NestRequest(
-                        type=nest_pb2.RequestType.DATA,
-                        data=nest_pb2.NestData(chunk=chunk)
-                    )
-            
-            # Call recognize with streaming
-            audio_bytes = audio_data.tobytes()
-            print(f"🎙️ Calling Clova gRPC with {len(audio_bytes)} bytes...")
-            responses = stub.recognize(request_generator(), metadata=metadata)
-            
-            # Collect all responses
-            results = []
-            response_count = 0
-            for response in responses:
-                response_count += 1
-                print(f"🎙️ Got response {response_count}: {response.contents[:200] if response.contents else 'empty'}...")
-                if response.contents:
-                    try:
-                        result = json.loads(response.contents)
-                        print(f"🎙️ Parsed result keys: {result.keys()}")
-                        # Check for text in various possible locations
-                        if "text" in result:
-                            results.append(result["text"])
-                        elif "transcription" in result and isinstance(result["transcription"], dict):
-                            if "text" in result["transcription"]:
-                                results.append(result["transcription"]["text"])
-                        elif "result" in result:
-                            results.append(result["result"])
-                        elif "utterance" in result:
-                            results.append(result["utterance"])
-                    except json.JSONDecodeError:
-                        results.append(response.contents)
-            
-            # Close channel
-            channel.close()
-            
-            if results:
-                return " ".join(results)
-            return ""
+            if session is None:
+                print(f"🎙️ Calling Clova gRPC with {audio_data.nbytes} bytes...")
+                return await loop.run_in_executor(None, self.stt.transcribe, audio_data)
+
+            transcript = await loop.run_in_executor(None, session.finish)
+            first = f"{session.first_result_ms:.0f}ms" if session.first_result_ms is not None else "-"
+            print(f"🎙️ Clova streamed {session.bytes_sent} bytes; first result at {first}, "
+                  f"final {session.finish_ms:.0f}ms after end of speech")
+            return transcript
             
         except Exception as e:
             print(f"⚠️ Clova gRPC error: {e}, falling back to Whisper")
@@ -538,8 +429,8 @@ class PodcastBot(EventHandler):
         )
         return transcript
         
-    async def _generate_response(self, user_message: str) -> str:
-        """Generate response using GPT-5-mini."""
+    async def _respond(self, user_message: str, latency: Optional[TurnLatency] = None) -> str:
+        """Stream a GPT-5-mini reply and speak it sentence by sentence while it is being written."""
         # Add to history
         self.conversation_history.append({"role": "user", "content": user_message})
         
@@ -548,45 +439,18 @@ class PodcastBot(EventHandler):
             {"role": "system", "content": self.config.system_prompt}
         ] + self.conversation_history[-10:]
         
-        response = await self.openai.chat.completions.create(
-            model="gpt-5-mini",
-            messages=messages,
-            max_completion_tokens=150  # GPT-5 doesn't support temperature
-        )
-        
-        assistant_message = response.choices[0].message.content
+        self.is_speaking = True
+        turn = StreamingTurn(self.openai, self.player, self.config.voice, latency=latency)
+        try:
+            assistant_message = await turn.run(messages)
+        finally:
+            self.is_speaking = False
+        print(turn.latency.report(), flush=True)
         
         # Add to history
         self.conversation_history.append({"role": "assistant", "content": assistant_message})
         
         return assistant_message
-        
-    async def _speak(self, text: str):
-        """Convert text to speech and play in room."""
-        self.is_speaking = True
-        
-        try:
-            # Generate TTS
-            response = await self.openai.audio.speech.create(
-                model="tts-1",
-                voice=self.config.voice,
-                input=text,
-                response_format="pcm"  # Raw PCM for streaming
-            )
-            
-            # Stream audio to room
-            audio_data = np.frombuffer(response.content, dtype=np.int16)
-            audio_data = audio_data.astype(np.float32) / 32767.0
-            
-            # Send to Daily (this would need actual implementation based on Daily SDK)
-            # For now, we'll simulate by printing
-            print(f"🔊 Spoke {len(audio_data) / SAMPLE_RATE:.1f}s of audio")
-            
-            # TODO: Implement actual audio playback to Daily room
-            # This requires Daily's audio send API
-            
-        finally:
-            self.is_speaking = False
 
 
 async def main():
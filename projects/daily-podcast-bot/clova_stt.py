@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Streaming Naver Clova Speech STT over one long-lived gRPC channel.
+
+The channel (and its TLS session) is opened once and reused for every
+utterance. A session is started at speech onset: audio is sent as 100ms
+NestRequest DATA chunks while the host is still talking, and a reader
+thread collects results as they come back, so when the speech ends only
+the last chunk and the server's final answer are left to wait for.
+
+    stt = ClovaStreamingSTT(os.getenv("CLOVA_SECRET"))
+    session = stt.start_session()
+    session.feed(chunk)          # Any number of times, any chunk size
+    transcript = session.finish()
+
+For tests, point it at a local server built from nest.proto:
+
+    stt = ClovaStreamingSTT("secret", target="localhost:50051", secure=False)
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import List, Optional
+
+import grpc
+import numpy as np
+
+import nest_pb2
+import nest_pb2_grpc
+
+CLOVA_ENDPOINT = "clovaspeech-gw.ncloud.com:50051"
+STREAM_CHUNK_BYTES = 3200  # 100ms of 16kHz 16-bit mono
+CONNECT_TIMEOUT = 10.0
+FINISH_TIMEOUT = 10.0  # Wait this long after the last chunk for the final result
+CHANNEL_OPTIONS = [
+    # Keep the idle connection (and its TLS session) alive between turns
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+DEFAULT_CONFIG = {
+    "transcription": {
+        "language": "ko"
+    },
+    "semanticEpd": {
+        "gapThreshold": 500,
+        "durationThreshold": 60000
+    }
+}
+
+_END = object()  # Closes a session's request stream
+
+
+def parse_contents(contents: str) -> Optional[str]:
+    """Text from one NestResponse's contents, if it carries any."""
+    if not contents:
+        return None
+    try:
+        result = json.loads(contents)
+    except json.JSONDecodeError:
+        return contents
+    if not isinstance(result, dict):
+        return None
+    # Check for text in various possible locations
+    if "text" in result:
+        return result["text"]
+    if isinstance(result.get("transcription"), dict):
+        return result["transcription"].get("text")
+    if "result" in result:
+        return result["result"]
+    if "utterance" in result:
+        return result["utterance"]
+    return None
+
+
+class ClovaSession:
+    """One recognize() stream: audio goes in while the host talks, results come back concurrently."""
+
+    def __init__(self, stub: nest_pb2_grpc.NestServiceStub, metadata, config: dict):
+        self.results: List[str] = []
+        self.error: Optional[Exception] = None
+        self.started = time.monotonic()
+        self.bytes_sent = 0
+        self.first_result_ms: Optional[float] = None  # Since the session started
+        self.finish_ms: Optional[float] = None  # From finish() to the final result
+        self._pending = bytearray()
+        self._requests: queue.Queue = queue.Queue()
+        self._requests.put(nest_pb2.NestRequest(
+            type=nest_pb2.RequestType.CONFIG,
+            config=nest_pb2.NestConfig(config=json.dumps(config))
+        ))
+        self._call = stub.recognize(iter(self._requests.get, _END), metadata=metadata)
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    @property
+    def text(self) -> str:
+        """Transcript so far."""
+        return " ".join(self.results)
+
+    def _send(self, chunk: bytes):
+        self._requests.put(nest_pb2.NestRequest(
+            type=nest_pb2.RequestType.DATA,
+            data=nest_pb2.NestData(chunk=chunk)
+        ))
+        self.bytes_sent += len(chunk)
+
+    def feed(self, audio_data: np.ndarray):
+        """Queue int16 audio; full 100ms chunks go out right away."""
+        self._pending += audio_data.tobytes()
+        while len(self._pending) >= STREAM_CHUNK_BYTES:
+            self._send(bytes(self._pending[:STREAM_CHUNK_BYTES]))
+            del self._pending[:STREAM_CHUNK_BYTES]
+
+    def _read(self):
+        """Reader thread: collect results as the server sends them."""
+        try:
+            for response in self._call:
+                text = parse_contents(response.contents)
+                if not text:
+                    continue
+                if self.first_result_ms is None:
+                    self.first_result_ms = (time.monotonic() - self.started) * 1000
+                self.results.append(text)
+                print(f"🎙️ Clova partial: {text}", flush=True)
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.CANCELLED:
+                self.error = e
+
+    def finish(self, timeout: float = FINISH_TIMEOUT) -> str:
+        """Send what's left, close the stream and wait for the final result."""
+        finished_at = time.monotonic()
+        if self._pending:
+            self._send(bytes(self._pending))
+            self._pending.clear()
+        self._requests.put(_END)
+        self._reader.join(timeout)
+        if self._reader.is_alive():
+            self._call.cancel()
+            raise Exception(f"Clova STT gave no final result within {timeout:.0f}s")
+        if self.error is not None:
+            raise self.error
+        self.finish_ms = (time.monotonic() - finished_at) * 1000
+        return self.text
+
+    def cancel(self):
+        """Drop the session without waiting for results."""
+        self._requests.put(_END)
+        self._call.cancel()
+
+
+class ClovaStreamingSTT:
+    """Holds the long-lived channel and starts a ClovaSession per utterance."""
+
+    def __init__(self, secret: str, target: str = CLOVA_ENDPOINT, secure: bool = True,
+                 config: Optional[dict] = None):
+        self.target = target
+        self.secure = secure
+        self.config = config or DEFAULT_CONFIG
+        self.metadata = (("authorization", f"Bearer {secret}"),)
+        self.channel: Optional[grpc.Channel] = None
+        self._stub: Optional[nest_pb2_grpc.NestServiceStub] = None
+        self._lock = threading.Lock()
+
+    def _get_stub(self) -> nest_pb2_grpc.NestServiceStub:
+        with self._lock:
+            if self._stub is None:
+                if self.secure:
+                    self.channel = grpc.secure_channel(self.target, grpc.ssl_channel_credentials(), options=CHANNEL_OPTIONS)
+                else:
+                    self.channel = grpc.insecure_channel(self.target, options=CHANNEL_OPTIONS)
+                self._stub = nest_pb2_grpc.NestServiceStub(self.channel)
+            return self._stub
+
+    def connect(self, timeout: float = CONNECT_TIMEOUT):
+        """Open the channel now (TLS handshake included) rather than on the first utterance."""
+        self._get_stub()
+        grpc.channel_ready_future(self.channel).result(timeout=timeout)
+
+    def start_session(self) -> ClovaSession:
+        return ClovaSession(self._get_stub(), self.metadata, self.config)
+
+    def transcribe(self, audio_data: np.ndarray, timeout: float = FINISH_TIMEOUT) -> str:
+        """Whole-utterance transcription over the same channel."""
+        session = self.start_session()
+        session.feed(audio_data)
+        return session.finish(timeout)
+
+    def close(self):
+        with self._lock:
+            if self.channel is not None:
+                self.channel.close()
+            self.channel = None
+            self._stub = None
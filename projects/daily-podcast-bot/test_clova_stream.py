@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming Clova STT (clova_stt.py) against a local gRPC stand-in
+built from nest.proto, so no Clova credentials or network are needed.
+
+The stand-in checks the auth header and CONFIG-first protocol, records
+every DATA chunk with its arrival time, recognizes at 20x real time,
+sends a partial result for every 500ms of audio and a final one when the
+request stream closes.
+"""
+
+import json
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+import nest_pb2
+import nest_pb2_grpc
+from clova_stt import STREAM_CHUNK_BYTES, ClovaStreamingSTT, parse_contents
+from test_vad import SAMPLE_RATE, make_buffer, make_chunk
+
+SECRET = "test-secret"
+FRAME = SAMPLE_RATE // 100  # Daily delivers 10ms frames
+CHUNKS_PER_PARTIAL = 5  # Stand-in answers every 500ms of audio
+CHUNK_DELAY = 0.005  # Stand-in recognizes at 20x real time
+FINAL_DELAY = 0.02  # Stand-in "thinks" this long before the final result
+
+
+class NestStandIn(nest_pb2_grpc.NestServiceServicer):
+    """Local NestService: records what it receives and answers like a streaming recognizer."""
+
+    def __init__(self):
+        self.calls = []  # One dict per recognize() call
+
+    def recognize(self, request_iterator, context):
+        metadata = dict(context.invocation_metadata())
+        if metadata.get("authorization") != f"Bearer {SECRET}":
+            context.abort(grpc.StatusCode.UNAUTHENTICATED, "bad token")
+        call = {"peer": context.peer(), "config": None, "chunks": [], "arrivals": [], "order_ok": True}
+        self.calls.append(call)
+
+        for request in request_iterator:
+            if request.type == nest_pb2.RequestType.CONFIG:
+                call["order_ok"] &= not call["chunks"] and call["config"] is None
+                call["config"] = json.loads(request.config.config)
+                continue
+            call["order_ok"] &= call["config"] is not None
+            call["chunks"].append(len(request.data.chunk))
+            call["arrivals"].append(time.monotonic())
+            time.sleep(CHUNK_DELAY)
+            if len(call["chunks"]) % CHUNKS_PER_PARTIAL == 0:
+                yield nest_pb2.NestResponse(contents=json.dumps(
+                    {"transcription": {"text": f"part{len(call['chunks']) // CHUNKS_PER_PARTIAL}"}}))
+
+        time.sleep(FINAL_DELAY)
+        if len(call["chunks"]) % CHUNKS_PER_PARTIAL:
+            yield nest_pb2.NestResponse(contents=json.dumps({"transcription": {"text": "end"}}))
+
+
+def start_standin():
+    """Start the stand-in on a free localhost port. Returns (server, servicer, target)."""
+    servicer = NestStandIn()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    nest_pb2_grpc.add_NestServiceServicer_to_server(servicer, server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    return server, servicer, f"localhost:{port}"
+
+
+# ─────────────────────────────────────────────
+# Test 1: Audio goes out as 100ms DATA chunks after the CONFIG
+# ─────────────────────────────────────────────
+def test_streams_100ms_chunks():
+    """10ms frames are regrouped into 3200-byte chunks; only the last one may be short."""
+    print("TEST 1: Audio is streamed as 100ms DATA chunks after CONFIG...")
+
+    server, standin, target = start_standin()
+    stt = ClovaStreamingSTT(SECRET, target=target, secure=False)
+    try:
+        session = stt.start_session()
+        audio = make_chunk(amplitude=200, samples=int(SAMPLE_RATE * 1.23))
+        for i in range(0, len(audio), FRAME):
+            session.feed(audio[i:i + FRAME])
+        transcript = session.finish()
+
+        call = standin.calls[0]
+        assert call["order_ok"] and call["config"]["transcription"]["language"] == "ko", "FAIL: CONFIG not sent first"
+        assert all(n == STREAM_CHUNK_BYTES for n in call["chunks"][:-1]), f"FAIL: chunk sizes {set(call['chunks'])}"
+        assert sum(call["chunks"]) == audio.nbytes, f"FAIL: sent {sum(call['chunks'])} of {audio.nbytes} bytes"
+        assert transcript == "part1 part2 end", f"FAIL: transcript {transcript!r}"
+        print(f"  PASS: {len(call['chunks'])} chunks ({call['chunks'][-1]} bytes last), transcript {transcript!r}")
+    finally:
+        stt.close()
+        server.stop(None)
+
+
+# ─────────────────────────────────────────────
+# Test 2: Streaming starts at speech onset, transcript ready right after end of speech
+# ─────────────────────────────────────────────
+def test_streams_during_speech():
+    """
+    With AudioBuffer.on_speech_start wired to the STT, audio reaches the
+    server while the host is still talking, partial results come back
+    during speech, and the final transcript follows end-of-speech within
+    a few ms (vs. sending the whole utterance only after it ended).
+    """
+    print("TEST 2: Audio streams from speech onset; transcript ready at end of speech...")
+
+    server, standin, target = start_standin()
+    stt = ClovaStreamingSTT(SECRET, target=target, secure=False)
+    try:
+        stt.connect()
+        utterances = []
+        ended = threading.Event()
+        buf = make_buffer(silence_timeout_ms=200)
+        buf.on_speech_start = stt.start_session
+        buf.on_utterance = lambda u, session: (utterances.append((u.copy(), session, time.monotonic())), ended.set())
+
+        # 1.5s of speech in real time, 10ms frames
+        speech = make_chunk(amplitude=200, samples=int(SAMPLE_RATE * 1.5))
+        for i in range(0, len(speech), FRAME):
+            buf.add_chunk(speech[i:i + FRAME])
+            time.sleep(0.01)
+        speech_end = time.monotonic()
+        assert ended.wait(2), "FAIL: no utterance"
+
+        utterance, session, ended_at = utterances[0]
+        sent_during_speech = sum(1 for t in standin.calls[0]["arrivals"] if t <= speech_end)
+        partials_during_speech = len(session.results)
+        transcript = session.finish()
+        streamed_ms = session.finish_ms
+
+        # Baseline: whole utterance sent after end of speech over the same channel
+        started = time.monotonic()
+        stt.transcribe(utterance)
+        batch_ms = (time.monotonic() - started) * 1000
+
+        assert sent_during_speech >= 10, f"FAIL: only {sent_during_speech} chunks sent before speech ended"
+        assert partials_during_speech >= 2, f"FAIL: {partials_during_speech} partials before end of speech"
+        assert transcript == "part1 part2 part3", f"FAIL: transcript {transcript!r}"
+        assert streamed_ms < 100, f"FAIL: final result took {streamed_ms:.0f}ms after end of speech"
+        assert streamed_ms < batch_ms, f"FAIL: streaming ({streamed_ms:.0f}ms) no faster than batch ({batch_ms:.0f}ms)"
+        print(f"  {sent_during_speech} chunks and {partials_during_speech} partials before end of speech "
+              f"(endpoint {(ended_at - speech_end) * 1000:.0f}ms later)")
+        print(f"  PASS: transcript {streamed_ms:.0f}ms after end of speech streamed vs {batch_ms:.0f}ms sending it whole")
+    finally:
+        stt.close()
+        server.stop(None)
+
+
+# ─────────────────────────────────────────────
+# Test 3: Utterance still delivered when the stream can't be opened
+# ─────────────────────────────────────────────
+def test_stream_open_failure():
+    """If on_speech_start raises (Clova down), the utterance arrives without a stream for the Whisper path."""
+    print("TEST 3: Utterance still delivered when the speech stream fails to open...")
+
+    def unavailable():
+        raise ConnectionError("Clova unreachable")
+
+    utterances = []
+    ended = threading.Event()
+    buf = make_buffer(silence_timeout_ms=200)
+    buf.on_speech_start = unavailable
+    buf.on_utterance = lambda u: (utterances.append(u.copy()), ended.set())
+
+    speech = [make_chunk(amplitude=200) for _ in range(5)]  # 500ms in 100ms chunks
+    for chunk in speech:
+        buf.add_chunk(chunk)
+    assert ended.wait(2), "FAIL: no utterance after the stream failed to open"
+    assert len(utterances) == 1 and len(utterances[0]) == 5 * len(speech[0]), \
+        f"FAIL: got {[len(u) for u in utterances]} samples, expected [{5 * len(speech[0])}]"
+    print(f"  PASS: {len(utterances[0])} samples delivered for the Whisper fallback")
+
+
+# ─────────────────────────────────────────────
+# Test 4: One channel for every utterance
+# ─────────────────────────────────────────────
+def test_channel_reused():
+    """Sessions share one channel: the server sees every call from the same connection."""
+    print("TEST 4: One long-lived channel serves every utterance...")
+
+    server, standin, target = start_standin()
+    stt = ClovaStreamingSTT(SECRET, target=target, secure=False)
+    try:
+        stt.connect()
+        channel = stt.channel
+        for _ in range(3):
+            stt.transcribe(make_chunk(amplitude=200, samples=SAMPLE_RATE // 2))
+
+        peers = {call["peer"] for call in standin.calls}
+        assert stt.channel is channel, "FAIL: channel was recreated"
+        assert len(standin.calls) == 3 and len(peers) == 1, f"FAIL: {len(standin.calls)} calls from {peers}"
+        print(f"  PASS: 3 sessions over one connection ({peers.pop()})")
+    finally:
+        stt.close()
+        server.stop(None)
+
+
+# ─────────────────────────────────────────────
+# Test 5: Server errors surface from finish()
+# ─────────────────────────────────────────────
+def test_auth_error_raises():
+    """A rejected call raises from finish() so the bot can fall back to Whisper."""
+    print("TEST 5: Server errors are raised from finish()...")
+
+    server, standin, target = start_standin()
+    stt = ClovaStreamingSTT("wrong-secret", target=target, secure=False)
+    try:
+        session = stt.start_session()
+        session.feed(make_chunk(amplitude=200))
+        try:
+            session.finish(timeout=5)
+        except grpc.RpcError as e:
+            assert e.code() == grpc.StatusCode.UNAUTHENTICATED, f"FAIL: got {e.code()}"
+            print(f"  PASS: finish() raised {e.code().name}")
+            return
+        raise AssertionError("FAIL: finish() returned despite the rejected call")
+    finally:
+        stt.close()
+        server.stop(None)
+
+
+# ─────────────────────────────────────────────
+# Test 6: Response parsing
+# ─────────────────────────────────────────────
+def test_parse_contents():
+    """Text is found in each response shape the old parser handled."""
+    print("TEST 6: Response contents parsing...")
+
+    cases = {
+        '{"text": "a"}': "a",
+        '{"transcription": {"text": "b"}}': "b",
+        '{"result": "c"}': "c",
+        '{"utterance": "d"}': "d",
+        '{"responseType": ["config"]}': None,
+        'plain text': "plain text",
+        '': None,
+    }
+    for contents, expected in cases.items():
+        assert parse_contents(contents) == expected, f"FAIL: {contents!r} -> {parse_contents(contents)!r}"
+    print(f"  PASS: {len(cases)} response shapes parsed")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Streaming Clova STT Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_streams_100ms_chunks,
+        test_streams_during_speech,
+        test_stream_open_failure,
+        test_channel_reused,
+        test_auth_error_raises,
+        test_parse_contents,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
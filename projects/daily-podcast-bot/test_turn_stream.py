@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Tests for the streamed reply pipeline (turn_stream.py) with a fake OpenAI
+client, so no API key or network is needed.
+
+The fake streams completion tokens at a fixed pace and synthesizes each
+segment after a delay that shrinks for later segments, so they finish out
+of order. Playback writes into a list at real-time pace, like a Daily
+virtual microphone.
+"""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from turn_stream import PCMPlayer, SentenceSegmenter, StreamingTurn
+
+TOKEN_DELAY = 0.02  # Fake LLM: one token every 20ms
+TTS_DELAY = 0.06  # Fake TTS: first segment's audio after 60ms, later ones sooner
+PLAY_SECONDS_PER_CHUNK = 0.005  # Fake mic plays 100ms of audio in 5ms
+
+
+def tokens_of(text: str) -> list:
+    """Roughly word-sized tokens, spaces attached to the front like GPT's."""
+    words = text.split(" ")
+    return [words[0]] + [" " + w for w in words[1:]]
+
+
+class FakeOpenAI:
+    """Just enough of AsyncOpenAI: streamed chat completions and streamed PCM speech."""
+
+    def __init__(self, reply: str, fail_on: str = None):
+        self.tokens = tokens_of(reply)
+        self.fail_on = fail_on
+        self.tts_inputs = []
+        self.completion_kwargs = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.audio = SimpleNamespace(speech=SimpleNamespace(
+            with_streaming_response=SimpleNamespace(create=self._speech)))
+
+    async def _create(self, **kwargs):
+        self.completion_kwargs = kwargs
+
+        async def stream():
+            for token in self.tokens:
+                await asyncio.sleep(TOKEN_DELAY)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+            yield SimpleNamespace(choices=[])  # Usage chunk at the end
+        return stream()
+
+    def _speech(self, **kwargs):
+        fake = self
+        index = len(self.tts_inputs)
+        self.tts_inputs.append(kwargs["input"])
+
+        class Response:
+            async def __aenter__(self):
+                if fake.fail_on and fake.fail_on in kwargs["input"]:
+                    raise RuntimeError("TTS unavailable")
+                await asyncio.sleep(max(0.005, TTS_DELAY - 0.02 * index))
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def iter_bytes(self, chunk_size):
+                # Two chunks per segment, each tagged with the segment number
+                for part in range(2):
+                    yield bytes([index, part]) * (chunk_size // 2)
+        return Response()
+
+
+def make_player():
+    """PCMPlayer writing into a list at a real-time-like pace. Returns (player, played)."""
+    played = []
+
+    def write(pcm):
+        time.sleep(PLAY_SECONDS_PER_CHUNK)
+        played.append((pcm[0], pcm[1], time.monotonic()))
+
+    player = PCMPlayer(write)
+    player.start()
+    return player, played
+
+
+# ─────────────────────────────────────────────
+# Test 1: Sentence segmentation
+# ─────────────────────────────────────────────
+def test_segmenter():
+    """Sentences split as soon as the next token shows the boundary; numbers and ellipses don't split."""
+    print("TEST 1: Sentence segmentation of streamed tokens...")
+
+    cases = [
+        ("The price went up 3.5 percent today. That's a lot! Right?",
+         ["The price went up 3.5 percent today.", "That's a lot!", "Right?"]),
+        ("Well... I think so. Oh. Okay then, let's move on.",
+         ["Well... I think so.", "Oh. Okay then, let's move on."]),
+        ("오늘 날씨가 정말 좋네요. 산책 가실래요? 네!",
+         ["오늘 날씨가 정말 좋네요.", "산책 가실래요?", "네!"]),
+        ("So when you look at the whole history of podcasting, it started small, and then it grew.",
+         ["So when you look at the whole history of podcasting,", "it started small, and then it grew."]),
+        ("First line here\nSecond line here",
+         ["First line here", "Second line here"]),
+    ]
+    for text, expected in cases:
+        segmenter = SentenceSegmenter()
+        segments = []
+        for token in tokens_of(text):
+            segments += segmenter.feed(token)
+        tail = segmenter.flush()
+        if tail:
+            segments.append(tail)
+        assert segments == expected, f"FAIL: {text!r} -> {segments}"
+    print(f"  PASS: {len(cases)} texts segmented")
+
+
+# ─────────────────────────────────────────────
+# Test 2: Segments are emitted while the reply is still streaming
+# ─────────────────────────────────────────────
+def test_segment_emitted_early():
+    """A sentence comes out on the token after its end, not at the end of the reply."""
+    print("TEST 2: Segments are emitted before the stream ends...")
+
+    segmenter = SentenceSegmenter()
+    tokens = tokens_of("Hello there, my friend. How are you doing today?")
+    emitted_at = None
+    for i, token in enumerate(tokens):
+        if segmenter.feed(token):
+            emitted_at = i
+            break
+    assert emitted_at == 4, f"FAIL: first segment at token {emitted_at} of {len(tokens)}"
+    print(f"  PASS: first segment out at token {emitted_at + 1} of {len(tokens)}")
+
+
+# ─────────────────────────────────────────────
+# Test 3: Playback order and first-audio latency
+# ─────────────────────────────────────────────
+def test_plays_in_order_early():
+    """
+    Segments that synthesize out of order still play in order, and the
+    first audio plays long before the completion has finished streaming.
+    """
+    print("TEST 3: Audio plays in segment order, starting before the reply is written...")
+
+    reply = "Great question. I think podcasts are here to stay. People love long talks. That's my take."
+    openai = FakeOpenAI(reply)
+    player, played = make_player()
+    try:
+        turn = StreamingTurn(openai, player, voice="alloy")
+        text = asyncio.run(turn.run([{"role": "user", "content": "hi"}]))
+        latency = turn.latency
+
+        order = [(segment, part) for segment, part, _ in played]
+        expected = [(s, p) for s in range(len(openai.tts_inputs)) for p in range(2)]
+        stream_ms = len(openai.tokens) * TOKEN_DELAY * 1000
+
+        assert text == reply, f"FAIL: reply {text!r}"
+        assert openai.completion_kwargs["stream"] is True, "FAIL: completion not streamed"
+        assert len(openai.tts_inputs) == 4 and latency.segments == 4, f"FAIL: segments {openai.tts_inputs}"
+        assert order == expected, f"FAIL: played {order}"
+        assert latency.first_token <= latency.first_segment <= latency.first_audio_byte <= latency.first_audio_played
+        assert latency.ms("first_audio_played") < stream_ms / 2, (
+            f"FAIL: first audio at {latency.ms('first_audio_played'):.0f}ms of a {stream_ms:.0f}ms stream")
+        print(f"  {latency.report()}")
+        print(f"  PASS: {len(played)} chunks in order, first audio at {latency.ms('first_audio_played'):.0f}ms "
+              f"of a {stream_ms:.0f}ms completion")
+    finally:
+        player.stop()
+
+
+# ─────────────────────────────────────────────
+# Test 4: A failed segment doesn't stop the rest
+# ─────────────────────────────────────────────
+def test_tts_error_skips_segment():
+    """TTS failing on one sentence skips just that sentence."""
+    print("TEST 4: A TTS error skips only its own segment...")
+
+    openai = FakeOpenAI("This one is fine. This one breaks badly. And this one is fine too.", fail_on="breaks")
+    player, played = make_player()
+    try:
+        turn = StreamingTurn(openai, player, voice="alloy")
+        asyncio.run(asyncio.wait_for(turn.run([]), timeout=5))
+        segments = sorted({segment for segment, _, _ in played})
+        assert segments == [0, 2], f"FAIL: played segments {segments}"
+        print(f"  PASS: segments {segments} played, segment 1 skipped")
+    finally:
+        player.stop()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Streaming Reply Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_segmenter,
+        test_segment_emitted_early,
+        test_plays_in_order_early,
+        test_tts_error_skips_segment,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
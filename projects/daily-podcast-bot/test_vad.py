@@ -3,71 +3,34 @@
 Tests for VAD (Voice Activity Detection) and audio pipeline.
 Validates the critical fix: all audio is buffered during active speech,
 not just chunks above the energy threshold.
+
+Also benchmarks the VAD backends (detection latency, false endpoints,
+false triggers) on synthetic speech and on recordings saved by the bot:
+
+    python test_vad.py                      # tests
+    python test_vad.py benchmark [DIR]      # full benchmark table
 """
 
+import glob
+import os
 import sys
 import time
 import threading
+import wave
 import numpy as np
 
-# We can't import Daily in test environment, so we test AudioBuffer directly
-# by extracting the relevant constants and class
+from vad import FRAME_MS, VAD_BACKENDS, VAD_THRESHOLD, make_vad
+
+from audio_buffer import SAMPLE_RATE, SILENCE_TIMEOUT_MS, AudioBuffer
 
-SAMPLE_RATE = 16000
-VAD_THRESHOLD = 80.0
-SILENCE_TIMEOUT_MS = 3000
 CHUNK_DURATION_MS = 100
 SAMPLES_PER_CHUNK = int(SAMPLE_RATE * CHUNK_DURATION_MS / 1000)  # 1600 samples per 100ms
 
 
-class AudioBufferForTest:
-    """Isolated copy of AudioBuffer for testing (no Daily dependency)."""
-
-    def __init__(self, sample_rate=SAMPLE_RATE, silence_timeout_ms=SILENCE_TIMEOUT_MS):
-        self.sample_rate = sample_rate
-        self.silence_timeout_ms = silence_timeout_ms
-        self.buffer = []
-        self.is_speaking = False
-        self.last_audio_time = time.time()
-        self.lock = threading.Lock()
-        self.on_utterance = None
-        self._chunk_count = 0
-
-        self.silence_thread = threading.Thread(target=self._silence_checker, daemon=True)
-        self.silence_thread.start()
-
-    def _silence_checker(self):
-        while True:
-            time.sleep(0.05)  # Faster check for tests
-            with self.lock:
-                if self.is_speaking:
-                    elapsed = (time.time() - self.last_audio_time) * 1000
-                    if elapsed > self.silence_timeout_ms:
-                        if len(self.buffer) > 0:
-                            utterance = np.concatenate(self.buffer)
-                            self.buffer = []
-                            self.is_speaking = False
-                            if self.on_utterance:
-                                self.on_utterance(utterance)
-
-    def add_chunk(self, audio_data: np.ndarray):
-        with self.lock:
-            if len(audio_data) == 0:
-                return
-
-            audio_data = np.nan_to_num(audio_data, nan=0.0, posinf=0.0, neginf=0.0)
-
-            mean_square = np.mean(audio_data.astype(np.float64) ** 2)
-            rms = np.sqrt(mean_square) if mean_square > 0 else 0.0
-
-            if rms > VAD_THRESHOLD:
-                self.last_audio_time = time.time()
-                if not self.is_speaking:
-                    self.is_speaking = True
-
-            # CRITICAL FIX: buffer ALL audio while speaking
-            if self.is_speaking:
-                self.buffer.append(audio_data)
+def make_buffer(**kwargs) -> AudioBuffer:
+    """The bot's AudioBuffer, on the plain threshold VAD (no hangover) the tests below were written for."""
+    kwargs.setdefault("vad", make_vad("energy", SAMPLE_RATE, hangover_ms=0))
+    return AudioBuffer(**kwargs)
 
 
 def make_chunk(amplitude: float, samples: int = SAMPLES_PER_CHUNK) -> np.ndarray:
@@ -94,7 +57,7 @@ def test_amplitude_dip_preserved():
     print("TEST 1: Amplitude dips during speech are preserved...")
 
     result = []
-    buf = AudioBufferForTest(silence_timeout_ms=500)  # Short timeout for test speed
+    buf = make_buffer(silence_timeout_ms=500)  # Short timeout for test speed
     buf.on_utterance = lambda u: result.append(u)
 
     # Phase 1: Loud speech (5 chunks, RMS ~141 > 80)
@@ -111,7 +74,7 @@ def test_amplitude_dip_preserved():
 
     # Verify buffer has ALL 15 chunks (not just the 10 loud ones)
     with buf.lock:
-        total_buffered = sum(len(c) for c in buf.buffer)
+        total_buffered = buf.buffered
         expected = 15 * SAMPLES_PER_CHUNK
         assert total_buffered == expected, (
             f"FAIL: buffered {total_buffered} samples, expected {expected}. "
@@ -127,14 +90,14 @@ def test_silence_not_buffered():
     """Silence chunks before speech onset should NOT be buffered."""
     print("TEST 2: Pre-speech silence is not buffered...")
 
-    buf = AudioBufferForTest(silence_timeout_ms=500)
+    buf = make_buffer(silence_timeout_ms=500)
 
     # Feed 10 chunks of silence
     for _ in range(10):
         buf.add_chunk(make_silence())
 
     with buf.lock:
-        total_buffered = sum(len(c) for c in buf.buffer)
+        total_buffered = buf.buffered
         assert total_buffered == 0, f"FAIL: {total_buffered} samples buffered from silence"
         assert not buf.is_speaking, "FAIL: is_speaking should be False during silence"
     print(f"  PASS: 0 samples buffered, is_speaking=False")
@@ -148,7 +111,7 @@ def test_utterance_callback():
     print("TEST 3: Utterance callback fires after silence timeout...")
 
     results = []
-    buf = AudioBufferForTest(silence_timeout_ms=300)  # 300ms for fast test
+    buf = make_buffer(silence_timeout_ms=300)  # 300ms for fast test
     buf.on_utterance = lambda u: results.append(u)
 
     # Feed 10 chunks of speech
@@ -173,7 +136,7 @@ def test_threshold_detects_moderate_speech():
     """VAD_THRESHOLD=80 should detect moderate speech (amplitude ~120)."""
     print("TEST 4: Threshold detects moderate-volume speech...")
 
-    buf = AudioBufferForTest()
+    buf = make_buffer()
 
     # Moderate speech: amplitude 120 → RMS ≈ 85
     chunk = make_chunk(amplitude=120)
@@ -248,14 +211,14 @@ def test_realistic_speech_pattern():
     """
     print("TEST 7: Realistic variable-amplitude speech pattern...")
 
-    buf = AudioBufferForTest(silence_timeout_ms=500)
+    buf = make_buffer(silence_timeout_ms=500)
     amplitudes = [300, 150, 40, 120, 250, 30, 180, 350]  # Natural speech variation
 
     for amp in amplitudes:
         buf.add_chunk(make_chunk(amplitude=amp))
 
     with buf.lock:
-        total_buffered = sum(len(c) for c in buf.buffer)
+        total_buffered = buf.buffered
         expected = len(amplitudes) * SAMPLES_PER_CHUNK
         assert total_buffered == expected, (
             f"FAIL: buffered {total_buffered}/{expected} samples. "
@@ -264,7 +227,318 @@ def test_realistic_speech_pattern():
     print(f"  PASS: All {len(amplitudes)} chunks buffered ({total_buffered} samples)")
 
 
+# ─────────────────────────────────────────────
+# Test 8: Utterances are zero-copy views, even across the ring's end
+# ─────────────────────────────────────────────
+def test_utterance_views_across_wrap():
+    """
+    Utterances come out as views into the ring (no concatenate), and one that
+    straddles the end of the ring is still contiguous and intact.
+    """
+    print("TEST 8: Utterances are contiguous ring views across the wrap...")
+
+    results = []
+    buf = make_buffer(silence_timeout_ms=200, ring_seconds=2, max_utterance_seconds=1.5)
+    buf.on_utterance = lambda u: results.append(u)
+
+    # First utterance leaves the write cursor 1.5s into a 2s ring
+    for _ in range(15):
+        buf.add_chunk(make_chunk(amplitude=200))
+    time.sleep(0.4)
+
+    # Second utterance wraps: distinct sample values so we can check order
+    chunks = [np.full(SAMPLES_PER_CHUNK, 1000 + i, dtype=np.int16) for i in range(10)]
+    for chunk in chunks:
+        buf.add_chunk(chunk)
+    time.sleep(0.4)
+
+    assert len(results) == 2, f"FAIL: expected 2 utterances, got {len(results)}"
+    wrapped = results[1]
+    assert np.shares_memory(wrapped, buf._ring), "FAIL: utterance was copied out of the ring"
+    assert np.array_equal(wrapped, np.concatenate(chunks)), "FAIL: wrapped utterance is out of order"
+    print(f"  PASS: {len(wrapped)}-sample utterance across the wrap is an intact view")
+
+
+# ─────────────────────────────────────────────
+# Test 9: Long monologue keeps memory flat
+# ─────────────────────────────────────────────
+def test_long_monologue_memory_flat():
+    """
+    A monologue longer than the ring is handed over in max-utterance pieces;
+    no sample is lost and the ring is never reallocated.
+    """
+    print("TEST 9: Long monologue is split without growing the buffer...")
+
+    results = []
+    buf = make_buffer(silence_timeout_ms=5000, ring_seconds=4, max_utterance_seconds=3)
+    buf.on_utterance = lambda u: results.append(len(u))
+    ring = buf._ring
+
+    # 10 seconds of continuous speech through a 4-second ring
+    for _ in range(100):
+        buf.add_chunk(make_chunk(amplitude=200))
+
+    assert buf._ring is ring and ring.nbytes == 2 * 4 * SAMPLE_RATE * 2, "FAIL: ring was reallocated"
+    assert results == [3 * SAMPLE_RATE] * 3, f"FAIL: unexpected pieces {results}"
+    with buf.lock:
+        assert buf.buffered == SAMPLE_RATE, f"FAIL: {buf.buffered} samples left, expected {SAMPLE_RATE}"
+    print(f"  PASS: 10s monologue -> {len(results)} x 3s pieces + 1s buffered, ring {ring.nbytes} bytes")
+
+
+# ─────────────────────────────────────────────
+# Test 10: Endpoint latency (deadline timer vs. silent frames)
+# ─────────────────────────────────────────────
+def measure_endpoint_latency(silence_timeout_ms: int, frames_after_speech: bool, runs: int = 5) -> list:
+    """
+    Feed speech, then either keep sending silent 10ms frames in real time or
+    stop sending. Returns, per run, how long after the silence timeout the
+    utterance callback fired (ms).
+    """
+    latencies = []
+    buf = make_buffer(silence_timeout_ms=silence_timeout_ms)
+    for _ in range(runs):
+        fired = threading.Event()
+        fired_at = []
+        lock_free = []
+
+        def on_utterance(utterance):
+            fired_at.append(time.monotonic())
+            lock_free.append(not buf.lock.locked())
+            fired.set()
+
+        buf.on_utterance = on_utterance
+        for _ in range(3):
+            buf.add_chunk(make_chunk(amplitude=200))
+        last_speech = time.monotonic()
+
+        while not fired.wait(0.01 if frames_after_speech else 5):
+            buf.add_chunk(make_silence(SAMPLE_RATE // 100))
+
+        assert lock_free == [True], "FAIL: on_utterance was called with the lock held"
+        latencies.append((fired_at[0] - last_speech) * 1000 - silence_timeout_ms)
+    return latencies
+
+
+def test_endpoint_latency():
+    """
+    End of speech fires within a few ms of the deadline whether or not audio
+    frames keep coming (the old 100ms poll added up to 100ms of jitter).
+    """
+    print("TEST 10: Endpoint latency after the silence timeout...")
+
+    for frames_after_speech, label in ((False, "frames stop"), (True, "silent frames")):
+        latencies = measure_endpoint_latency(200, frames_after_speech)
+        worst = max(latencies)
+        print(f"  {label:<13}: mean {np.mean(latencies):5.1f}ms, max {worst:5.1f}ms after deadline")
+        assert worst < 50, f"FAIL: endpoint fired {worst:.1f}ms after the deadline ({label})"
+    print("  PASS: Endpoint fired within 50ms of the deadline, callback outside the lock")
+
+
+# ─────────────────────────────────────────────
+# VAD benchmark
+# ─────────────────────────────────────────────
+RECORDINGS_DIR = os.getenv("VAD_RECORDINGS", "/tmp/kimiwan_debug")  # Where bot.py saves utterances
+BENCH_NOISE_LEVELS = (0, 50, 100)  # White noise RMS (int16); speech syllables are ~150-600
+BENCH_TIMEOUTS_MS = (300, 500, 800, 3000)
+
+
+def make_syllable(rng, duration: float, f0: float, rms: float) -> np.ndarray:
+    """A voiced syllable: harmonics of f0 shaped by three random formants, with a smooth envelope."""
+    t = np.arange(int(SAMPLE_RATE * duration)) / SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))) / SAMPLE_RATE
+    formants = (rng.uniform(300, 900), rng.uniform(900, 2200), rng.uniform(2200, 3200))
+    signal = np.zeros_like(t)
+    for k in range(1, int(4000 // f0) + 1):
+        gain = 0.15 / k + sum(w * np.exp(-((k * f0 - f) / 120) ** 2) for f, w in zip(formants, (1, 0.5, 0.25)))
+        signal += gain * np.sin(k * phase)
+    signal *= np.sin(np.pi * np.arange(len(t)) / len(t)) ** 0.5
+    return signal * rms / np.sqrt(np.mean(signal ** 2))
+
+
+def make_utterance(rng, words: int = 8) -> np.ndarray:
+    """Words of 1-3 syllables with natural gaps, some soft syllables and one 350ms thinking pause."""
+    f0 = rng.uniform(100, 220)
+    parts = []
+    for word in range(words):
+        for _ in range(rng.integers(1, 4)):
+            rms = rng.uniform(150, 600) if rng.random() > 0.15 else rng.uniform(50, 100)
+            parts.append(make_syllable(rng, rng.uniform(0.1, 0.25), f0 * rng.uniform(0.9, 1.1), rms))
+            parts.append(np.zeros(int(SAMPLE_RATE * rng.uniform(0.02, 0.08))))
+        pause = 0.35 if word == words // 2 else rng.uniform(0.05, 0.3)
+        parts.append(np.zeros(int(SAMPLE_RATE * pause)))
+    return np.concatenate(parts[:-1])
+
+
+def make_clicks(rng, samples: int) -> np.ndarray:
+    """Keyboard-like broadband bursts (20-50ms, loud) every 450ms."""
+    out = np.zeros(samples)
+    for start in range(SAMPLE_RATE // 5, samples - SAMPLE_RATE // 10, int(0.45 * SAMPLE_RATE)):
+        n = int(SAMPLE_RATE * rng.uniform(0.02, 0.05))
+        out[start:start + n] += rng.normal(0, rng.uniform(300, 1000), n) * np.exp(-np.arange(n) / (n / 3))
+    return out
+
+
+def make_scenario(seed: int, noise: float, clicks: bool = False):
+    """Two utterances in background noise (optionally with clicks between them). Returns (audio, truth)."""
+    rng = np.random.default_rng(seed)
+    parts, truth, pos = [], [], 0
+    for lead in (1.0, 4.0):  # Gap longer than the old 3s timeout, so that one is scored fairly
+        parts.append(np.zeros(int(SAMPLE_RATE * lead)))
+        pos += len(parts[-1])
+        utterance = make_utterance(rng)
+        truth.append((pos / SAMPLE_RATE, (pos + len(utterance)) / SAMPLE_RATE))
+        parts.append(utterance)
+        pos += len(utterance)
+    parts.append(np.zeros(2 * SAMPLE_RATE))
+    audio = np.concatenate(parts)
+    audio += rng.normal(0, max(noise, 2.0), len(audio))  # At least a little dither
+    if clicks:
+        quiet = np.ones(len(audio), dtype=bool)
+        for start, end in truth:
+            quiet[int((start - 0.5) * SAMPLE_RATE):int((end + 0.5) * SAMPLE_RATE)] = False
+        audio += make_clicks(rng, len(audio)) * quiet
+    return np.clip(audio, -32768, 32767).astype(np.int16), truth
+
+
+def load_recordings(directory: str = RECORDINGS_DIR):
+    """
+    Utterances the bot saved (*.raw int16 16kHz, or mono 16kHz *.wav), each
+    padded with 1s of lead-in and 2s of trailing dither. Each recording is
+    taken to be one utterance, so any extra endpoint inside it is false.
+    """
+    scenarios = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.raw")) + glob.glob(os.path.join(directory, "*.wav"))):
+        if path.endswith(".wav"):
+            with wave.open(path, "rb") as wav_file:
+                if wav_file.getnchannels() != 1 or wav_file.getframerate() != SAMPLE_RATE:
+                    continue
+                audio = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+        else:
+            audio = np.fromfile(path, dtype=np.int16)
+        if len(audio) < SAMPLE_RATE // 10:
+            continue
+        rng = np.random.default_rng(0)
+        lead = rng.normal(0, 2.0, SAMPLE_RATE).astype(np.int16)
+        tail = rng.normal(0, 2.0, 2 * SAMPLE_RATE).astype(np.int16)
+        scenarios.append((np.concatenate([lead, audio, tail]), [(1.0, 1.0 + len(audio) / SAMPLE_RATE)]))
+    return scenarios
+
+
+def simulate_endpoints(vad, audio: np.ndarray, silence_timeout_ms: float, chunk_ms: int = FRAME_MS):
+    """
+    Run audio through a VAD in stream time with AudioBuffer's deadline logic
+    (speech pushes a deadline back; the first chunk past it ends the utterance).
+    Returns detected utterances as [start, end] in seconds.
+    """
+    chunk = SAMPLE_RATE * chunk_ms // 1000
+    detected, deadline = [], None
+    for i in range(0, len(audio) - chunk + 1, chunk):
+        now = (i + chunk) / SAMPLE_RATE
+        if deadline is not None and now >= deadline:
+            detected[-1][1] = now
+            deadline = None
+        if vad.process(audio[i:i + chunk]):
+            if deadline is None:
+                detected.append([now, None])
+            deadline = now + silence_timeout_ms / 1000
+    if deadline is not None:
+        detected[-1][1] = deadline
+    return detected
+
+
+def score_endpoints(detected, truth) -> dict:
+    """Onset/endpoint latency per true utterance, plus false endpoints, false triggers and misses."""
+    result = {"onset_ms": [], "end_ms": [], "false_endpoints": 0, "false_triggers": 0, "missed": 0}
+    for start, end in truth:
+        overlapping = [d for d in detected if d[0] < end + 0.01 and d[1] > start]
+        if not overlapping:
+            result["missed"] += 1
+            continue
+        result["onset_ms"].append((overlapping[0][0] - start) * 1000)
+        result["end_ms"].append((overlapping[-1][1] - end) * 1000)
+        result["false_endpoints"] += len(overlapping) - 1
+    result["false_triggers"] = sum(1 for d in detected if not any(d[0] < e + 0.01 and d[1] > s for s, e in truth))
+    return result
+
+
+def run_benchmark(backends, scenarios, timeouts_ms) -> dict:
+    """Score every backend at every timeout over the scenarios; prints a row per combination."""
+    rows = {}
+    for name in backends:
+        for timeout_ms in timeouts_ms:
+            total = {"onset_ms": [], "end_ms": [], "false_endpoints": 0, "false_triggers": 0, "missed": 0}
+            utterances, audio_seconds, started = 0, 0.0, time.perf_counter()
+            for audio, truth in scenarios:
+                scored = score_endpoints(simulate_endpoints(make_vad(name, SAMPLE_RATE), audio, timeout_ms), truth)
+                for key, value in scored.items():
+                    total[key] += value
+                utterances += len(truth)
+                audio_seconds += len(audio) / SAMPLE_RATE
+            cpu = (time.perf_counter() - started) / audio_seconds
+            onset = np.mean(total["onset_ms"]) if total["onset_ms"] else float("nan")
+            end = np.mean(total["end_ms"]) if total["end_ms"] else float("nan")
+            print(f"    {name:<9} {timeout_ms:>5}ms  onset {onset:6.0f}ms  endpoint {end:6.0f}ms  "
+                  f"false endpoints {total['false_endpoints']:>2}/{utterances}  "
+                  f"false triggers {total['false_triggers']:>2}  missed {total['missed']}  cpu {cpu:.1%}")
+            rows[(name, timeout_ms)] = {**total, "utterances": utterances, "onset": onset, "end": end}
+    return rows
+
+
+# ─────────────────────────────────────────────
+# Test 11: VAD benchmark on synthetic speech
+# ─────────────────────────────────────────────
+def test_vad_benchmark_synthetic(timeouts_ms=(SILENCE_TIMEOUT_MS,), seeds=range(5)):
+    """
+    The default spectral backend at the default timeout keeps whole utterances
+    together in quiet and moderate noise, ignores keyboard clicks, and ends
+    speech well within a second (the old fixed threshold + 3s timeout took
+    3s+ and false-triggers on clicks).
+    """
+    print("TEST 11: VAD benchmark on synthetic speech...")
+
+    results = {}
+    for noise in BENCH_NOISE_LEVELS:
+        print(f"  white noise RMS {noise}:")
+        results[noise] = run_benchmark(VAD_BACKENDS, [make_scenario(s, noise) for s in seeds], timeouts_ms)
+    print("  keyboard clicks between utterances (noise RMS 20):")
+    clicks = run_benchmark(VAD_BACKENDS, [make_scenario(s, 20, clicks=True) for s in seeds], timeouts_ms)
+
+    if SILENCE_TIMEOUT_MS in timeouts_ms:
+        timeout_ms = SILENCE_TIMEOUT_MS
+        for noise in (0, 50):
+            row = results[noise][("spectral", timeout_ms)]
+            assert row["false_endpoints"] == 0, (
+                f"FAIL: spectral split {row['false_endpoints']} utterances at noise {noise}, {timeout_ms}ms"
+            )
+            assert row["missed"] == 0, f"FAIL: spectral missed {row['missed']} utterances at noise {noise}"
+            assert row["end"] < timeout_ms + 400, f"FAIL: spectral endpoint {row['end']:.0f}ms at noise {noise}"
+        assert clicks[("spectral", timeout_ms)]["false_triggers"] == 0, "FAIL: spectral triggered on clicks"
+    print("  PASS: spectral VAD: no false endpoints or click triggers, endpoint within timeout + 400ms")
+
+
+# ─────────────────────────────────────────────
+# Test 12: VAD benchmark on recorded audio
+# ─────────────────────────────────────────────
+def test_vad_benchmark_recorded(directory=RECORDINGS_DIR, timeouts_ms=(SILENCE_TIMEOUT_MS,)):
+    """Same benchmark on utterances the bot recorded (informational; skipped if none)."""
+    print("TEST 12: VAD benchmark on recorded audio...")
+
+    scenarios = load_recordings(directory)
+    if not scenarios:
+        print(f"  SKIP: no recordings in {directory} (set VAD_RECORDINGS)")
+        return
+    print(f"  {len(scenarios)} recordings from {directory}:")
+    run_benchmark(VAD_BACKENDS, scenarios, timeouts_ms)
+    print("  PASS: benchmark ran")
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        test_vad_benchmark_synthetic(timeouts_ms=BENCH_TIMEOUTS_MS)
+        print()
+        test_vad_benchmark_recorded(sys.argv[2] if len(sys.argv) > 2 else RECORDINGS_DIR, BENCH_TIMEOUTS_MS)
+        sys.exit(0)
+
     print("=" * 60)
     print("VAD & Audio Pipeline Tests")
     print("=" * 60)
@@ -278,6 +552,11 @@ if __name__ == "__main__":
         test_old_threshold_too_high,
         test_wav_creation,
         test_realistic_speech_pattern,
+        test_utterance_views_across_wrap,
+        test_long_monologue_memory_flat,
+        test_endpoint_latency,
+        test_vad_benchmark_synthetic,
+        test_vad_benchmark_recorded,
     ]
 
     passed = 0
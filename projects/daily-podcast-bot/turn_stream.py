@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Streaming reply for one conversation turn: LLM tokens -> sentences -> TTS -> playback.
+
+The completion is requested with stream=True and cut into sentences (or
+long clauses) as tokens arrive. Each finished segment goes to TTS right
+away, a few at a time, with the PCM streamed back; a sequencer hands the
+audio to the player strictly in segment order, so the first sentence is
+playing while the rest of the reply is still being written and spoken.
+
+    player = PCMPlayer(mic.write_frames)
+    player.start()
+    turn = StreamingTurn(openai, player, voice="alloy")
+    reply = await turn.run(messages)
+    print(turn.latency.report())
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+LLM_MODEL = "gpt-5-mini"
+TTS_MODEL = "tts-1"
+TTS_SAMPLE_RATE = 24000  # OpenAI TTS "pcm": 24kHz 16-bit mono
+MAX_COMPLETION_TOKENS = 150
+PCM_CHUNK_BYTES = 4800  # 100ms of TTS audio
+TTS_CONCURRENCY = 2  # Segments synthesized at once
+SENTENCE_ENDINGS = ".!?…"
+CJK_SENTENCE_ENDINGS = "。！？"  # No space follows these
+CLAUSE_BREAKS = ",;:"
+MIN_SEGMENT_CHARS = 8  # Shorter sentences ("Oh.") are merged into the next one
+MIN_CLAUSE_CHARS = 40  # Break at a comma only once a segment is this long
+
+
+class SentenceSegmenter:
+    """Cuts streamed text into sentences, or clauses once a sentence runs long."""
+
+    def __init__(self, min_chars: int = MIN_SEGMENT_CHARS, min_clause_chars: int = MIN_CLAUSE_CHARS):
+        self.min_chars = min_chars
+        self.min_clause_chars = min_clause_chars
+        self._text = ""
+        self._scanned = 0  # Characters of _text already checked for a boundary
+
+    def _is_boundary(self, i: int, length: int) -> bool:
+        ch = self._text[i]
+        if ch == "\n" or ch in CJK_SENTENCE_ENDINGS:
+            return True
+        # "3.5" and "..." aren't boundaries: wait for the next character to be a space
+        if ch in SENTENCE_ENDINGS or (ch in CLAUSE_BREAKS and length >= self.min_clause_chars):
+            return self._text[i + 1].isspace()
+        return False
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns the segments it completed."""
+        self._text += text
+        segments = []
+        start = 0
+        i = self._scanned
+        while i < len(self._text) - 1:  # The last character needs a lookahead
+            if self._is_boundary(i, i + 1 - start):
+                segment = self._text[start:i + 1].strip()
+                if len(segment) >= self.min_chars:
+                    segments.append(segment)
+                    start = i + 1
+            i += 1
+        self._text = self._text[start:]
+        self._scanned = i - start
+        return segments
+
+    def flush(self) -> Optional[str]:
+        """Whatever is left at the end of the stream."""
+        segment = self._text.strip()
+        self._text = ""
+        self._scanned = 0
+        return segment or None
+
+
+@dataclass
+class TurnLatency:
+    """Milestones of one turn, as time.monotonic() values."""
+    started: float = field(default_factory=time.monotonic)
+    transcript: Optional[float] = None
+    first_token: Optional[float] = None
+    first_segment: Optional[float] = None
+    first_audio_byte: Optional[float] = None
+    first_audio_played: Optional[float] = None
+    finished: Optional[float] = None
+    segments: int = 0
+
+    def mark(self, name: str):
+        """Record a milestone the first time it is reached."""
+        if getattr(self, name) is None:
+            setattr(self, name, time.monotonic())
+
+    def ms(self, name: str) -> Optional[float]:
+        value = getattr(self, name)
+        return None if value is None else (value - self.started) * 1000
+
+    def report(self) -> str:
+        parts = []
+        for name in ("transcript", "first_token", "first_segment", "first_audio_byte", "first_audio_played", "finished"):
+            ms = self.ms(name)
+            if ms is not None:
+                parts.append(f"{name.replace('_', ' ')} {ms:.0f}ms")
+        return f"⏱️  {', '.join(parts)} ({self.segments} segments)"
+
+
+class PCMPlayer:
+    """
+    Plays PCM chunks in the order they are queued, on its own thread.
+
+    `write` is a blocking sink that paces itself in real time, such as a
+    Daily virtual microphone's write_frames.
+    """
+
+    def __init__(self, write: Callable[[bytes], None]):
+        self.write = write
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def enqueue(self, pcm: bytes, latency: Optional[TurnLatency] = None):
+        self._queue.put((pcm, latency))
+
+    def drain(self):
+        """Block until everything queued so far has been played."""
+        self._queue.join()
+
+    def stop(self):
+        self._queue.put(None)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                pcm, latency = item
+                if latency is not None:
+                    latency.mark("first_audio_played")
+                self.write(pcm)
+            except Exception as e:
+                print(f"⚠️ Playback error: {e}", flush=True)
+            finally:
+                self._queue.task_done()
+
+
+class StreamingTurn:
+    """One reply: streams the completion, synthesizes it sentence by sentence and plays it in order."""
+
+    def __init__(self, openai, player: PCMPlayer, voice: str, model: str = LLM_MODEL,
+                 tts_model: str = TTS_MODEL, max_completion_tokens: int = MAX_COMPLETION_TOKENS,
+                 tts_concurrency: int = TTS_CONCURRENCY, latency: Optional[TurnLatency] = None):
+        self.openai = openai
+        self.player = player
+        self.voice = voice
+        self.model = model
+        self.tts_model = tts_model
+        self.max_completion_tokens = max_completion_tokens
+        self.tts_concurrency = tts_concurrency
+        self.latency = latency or TurnLatency()
+
+    async def _synthesize(self, text: str, pcm_queue: asyncio.Queue, slots: asyncio.Semaphore):
+        """Stream one segment's TTS audio into its queue; None marks the end."""
+        try:
+            async with slots:
+                async with self.openai.audio.speech.with_streaming_response.create(
+                    model=self.tts_model,
+                    voice=self.voice,
+                    input=text,
+                    response_format="pcm"
+                ) as response:
+                    async for pcm in response.iter_bytes(PCM_CHUNK_BYTES):
+                        self.latency.mark("first_audio_byte")
+                        await pcm_queue.put(pcm)
+        except Exception as e:
+            print(f"⚠️ TTS error on '{text[:30]}': {e}", flush=True)
+        finally:
+            await pcm_queue.put(None)
+
+    async def _play_in_order(self, segments: asyncio.Queue):
+        """Pass each segment's audio to the player, one whole segment after another."""
+        while True:
+            pcm_queue = await segments.get()
+            if pcm_queue is None:
+                return
+            while True:
+                pcm = await pcm_queue.get()
+                if pcm is None:
+                    break
+                self.player.enqueue(pcm, self.latency)
+
+    async def run(self, messages: list) -> str:
+        """Speak the reply to messages; returns its full text once it has all been played."""
+        segmenter = SentenceSegmenter()
+        segments: asyncio.Queue = asyncio.Queue()
+        slots = asyncio.Semaphore(self.tts_concurrency)
+        synthesis = []
+        sequencer = asyncio.create_task(self._play_in_order(segments))
+        reply = []
+
+        def dispatch(text: str):
+            self.latency.mark("first_segment")
+            self.latency.segments += 1
+            pcm_queue: asyncio.Queue = asyncio.Queue()
+            segments.put_nowait(pcm_queue)
+            synthesis.append(asyncio.create_task(self._synthesize(text, pcm_queue, slots)))
+
+        try:
+            stream = await self.openai.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_completion_tokens=self.max_completion_tokens,  # GPT-5 doesn't support temperature
+                stream=True
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                self.latency.mark("first_token")
+                reply.append(delta)
+                for text in segmenter.feed(delta):
+                    dispatch(text)
+            tail = segmenter.flush()
+            if tail:
+                dispatch(tail)
+        finally:
+            segments.put_nowait(None)
+            await asyncio.gather(*synthesis)
+            await sequencer
+
+        await asyncio.get_running_loop().run_in_executor(None, self.player.drain)
+        self.latency.mark("finished")
+        return "".join(reply).strip()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Voice activity detection backends for the podcast bot.
+
+Each backend cuts incoming int16 chunks into short frames, decides per
+frame whether it is voiced (vectorized over the frames of a chunk), and
+the shared VAD base smooths those decisions:
+
+- onset: speech starts only after ONSET_MS of consecutive voiced frames,
+  so clicks and pops don't open an utterance
+- hangover: speech lasts HANGOVER_MS past the last voiced frame, so soft
+  word endings and short gaps between words don't close it
+
+Backends:
+- energy:   frame RMS above a fixed threshold (the original detector)
+- adaptive: frame RMS a margin above a tracked noise floor
+- spectral: speech-band (300-3400 Hz) energy above a tracked noise floor,
+            gated on band-energy ratio and zero-crossing rate
+
+    vad = make_vad("spectral")
+    if vad.process(chunk):
+        ...
+"""
+
+from typing import Dict, Optional, Type
+
+import numpy as np
+
+FRAME_MS = 10
+ONSET_MS = 20  # Voiced run needed to start speech
+HANGOVER_MS = 200  # Speech held this long after the last voiced frame
+VAD_THRESHOLD = 80.0  # Energy backend: int16 RMS (typical speech: 30-300)
+NOISE_MARGIN_DB = 9.0  # Adaptive backend: how far above the noise floor counts as speech
+SPECTRAL_MARGIN_DB = 6.0  # Spectral backend: less needed, the band excludes most noise
+MIN_SPEECH_LEVEL = 30.0  # Adaptive backends: int16 RMS below which nothing is speech
+FLOOR_RISE_MS = 500  # Noise floor time constant while not speaking (10x slower while speaking)
+WARMUP_MS = 200  # Adaptive backends learn the floor from this much audio before detecting
+SPEECH_BAND_HZ = (300.0, 3400.0)
+MIN_BAND_RATIO = 0.5  # Share of frame energy inside the speech band
+MAX_ZCR = 0.4  # Zero crossings per sample; white noise is ~0.5
+
+
+class VAD:
+    """Base class: framing plus onset/hangover smoothing. Subclasses implement voiced()."""
+
+    name = "base"
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: float = FRAME_MS,
+                 onset_ms: float = ONSET_MS, hangover_ms: float = HANGOVER_MS):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.onset_frames = max(1, round(onset_ms / frame_ms))
+        self.hangover_frames = round(hangover_ms / frame_ms)
+        self._scratch = np.empty(self.frame_len * 10, dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        self.active = False
+        self.level = 0.0  # Loudest frame of the last chunk, for logging
+        self._run = 0  # Consecutive voiced frames
+        self._hang = 0  # Frames of hangover left
+
+    def _frames(self, audio_data: np.ndarray) -> np.ndarray:
+        """The chunk as float32 frames (n_frames, frame_len), copied into the scratch buffer."""
+        n = len(audio_data)
+        frame_len = self.frame_len if n >= self.frame_len else n
+        usable = n - n % frame_len
+        if usable > len(self._scratch):
+            self._scratch = np.empty(usable, dtype=np.float32)
+        frames = self._scratch[:usable]
+        np.copyto(frames, audio_data[:usable])
+        return frames.reshape(-1, frame_len)
+
+    @staticmethod
+    def _rms(frames: np.ndarray) -> np.ndarray:
+        return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frames.shape[1])
+
+    def voiced(self, frames: np.ndarray) -> np.ndarray:
+        """Raw per-frame speech decisions (bool array); sets self.level."""
+        raise NotImplementedError
+
+    def process(self, audio_data: np.ndarray) -> bool:
+        """Whether the chunk holds speech after onset/hangover smoothing."""
+        if len(audio_data) == 0:
+            return self.active
+        speech = False
+        for is_voiced in self.voiced(self._frames(audio_data)):
+            if is_voiced:
+                self._run += 1
+                if self.active or self._run >= self.onset_frames:
+                    self.active = True
+                    self._hang = self.hangover_frames
+            else:
+                self._run = 0
+                if self.active:
+                    self._hang -= 1
+                    if self._hang < 0:
+                        self.active = False
+            speech = speech or self.active
+        return speech
+
+
+class EnergyVAD(VAD):
+    """Frame RMS above a fixed int16 threshold."""
+
+    name = "energy"
+
+    def __init__(self, sample_rate: int = 16000, threshold: float = VAD_THRESHOLD, **kwargs):
+        self.threshold = threshold
+        super().__init__(sample_rate, **kwargs)
+
+    def voiced(self, frames: np.ndarray) -> np.ndarray:
+        levels = self._rms(frames)
+        self.level = float(levels.max())
+        return levels > self.threshold
+
+
+class AdaptiveVAD(VAD):
+    """
+    Frame level NOISE_MARGIN_DB above a tracked noise floor.
+
+    The floor drops straight to quieter frames and rises slowly through
+    non-speech ones (far more slowly during speech, so a long monologue
+    doesn't become the floor). The first WARMUP_MS only set the floor.
+    """
+
+    name = "adaptive"
+
+    def __init__(self, sample_rate: int = 16000, margin_db: float = NOISE_MARGIN_DB,
+                 min_level: float = MIN_SPEECH_LEVEL, rise_ms: float = FLOOR_RISE_MS,
+                 warmup_ms: float = WARMUP_MS, **kwargs):
+        self.ratio = 10 ** (margin_db / 20)
+        self.min_level = min_level
+        self.rise_ms = rise_ms
+        self.warmup_ms = warmup_ms
+        super().__init__(sample_rate, **kwargs)
+        frame_ms = self.frame_len * 1000 / sample_rate
+        self.rise = min(1.0, frame_ms / rise_ms)
+        self.warmup_frames = round(warmup_ms / frame_ms)
+
+    def reset(self):
+        super().reset()
+        self.floor: Optional[float] = None
+        self._warmup_seen = 0
+
+    def levels(self, frames: np.ndarray) -> np.ndarray:
+        """Per-frame level compared against the floor (int16 RMS scale)."""
+        return self._rms(frames)
+
+    def gate(self, frames: np.ndarray) -> np.ndarray:
+        """Extra per-frame conditions for speech; none here."""
+        return np.ones(len(frames), dtype=bool)
+
+    def voiced(self, frames: np.ndarray) -> np.ndarray:
+        levels = self.levels(frames)
+        gate = self.gate(frames)
+        self.level = float(levels.max())
+        voiced = np.zeros(len(levels), dtype=bool)
+        for i, level in enumerate(levels.tolist()):
+            if self._warmup_seen < self.warmup_frames:
+                self._warmup_seen += 1
+                self.floor = level if self.floor is None else self.floor + (level - self.floor) / self._warmup_seen
+                continue
+            floor = self.floor if self.floor is not None else level
+            voiced[i] = gate[i] and level > max(floor * self.ratio, self.min_level)
+            if level < floor:
+                floor = level
+            else:
+                floor += (self.rise / 10 if voiced[i] or self.active else self.rise) * (level - floor)
+            self.floor = floor
+        return voiced
+
+
+class SpectralVAD(AdaptiveVAD):
+    """
+    Speech-band energy above the noise floor, for voiced frames only.
+
+    Computed for all frames of a chunk at once: a Hann-windowed rFFT gives the
+    energy in SPEECH_BAND_HZ and its share of the total, and sign changes give
+    the zero-crossing rate. Broadband noise (fans, hiss) fails the band ratio
+    and ZCR gates even when it is loud.
+    """
+
+    name = "spectral"
+
+    def __init__(self, sample_rate: int = 16000, band_hz=SPEECH_BAND_HZ,
+                 min_band_ratio: float = MIN_BAND_RATIO, max_zcr: float = MAX_ZCR,
+                 margin_db: float = SPECTRAL_MARGIN_DB, **kwargs):
+        self.band_hz = band_hz
+        self.min_band_ratio = min_band_ratio
+        self.max_zcr = max_zcr
+        self._bands: Dict[int, tuple] = {}  # frame length -> (window, band mask, scale)
+        super().__init__(sample_rate, margin_db=margin_db, **kwargs)
+
+    def _band(self, frame_len: int) -> tuple:
+        if frame_len not in self._bands:
+            window = np.hanning(frame_len).astype(np.float32)
+            freqs = np.fft.rfftfreq(frame_len, 1 / self.sample_rate)
+            mask = (freqs >= self.band_hz[0]) & (freqs <= self.band_hz[1])
+            # One-sided power back to int16 RMS: Parseval plus the window's energy
+            scale = 2.0 / (frame_len * float(np.sum(window ** 2)))
+            self._bands[frame_len] = (window, mask, scale)
+        return self._bands[frame_len]
+
+    def voiced(self, frames: np.ndarray) -> np.ndarray:
+        window, mask, scale = self._band(frames.shape[1])
+        power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2
+        band = power[:, mask].sum(axis=1)
+        self._band_level = np.sqrt(band * scale)
+        self._band_ratio = band / (power.sum(axis=1) + 1e-9)
+        self._zcr = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1) / (frames.shape[1] - 1)
+        return super().voiced(frames)
+
+    def levels(self, frames: np.ndarray) -> np.ndarray:
+        return self._band_level
+
+    def gate(self, frames: np.ndarray) -> np.ndarray:
+        return (self._band_ratio >= self.min_band_ratio) & (self._zcr <= self.max_zcr)
+
+
+VAD_BACKENDS: Dict[str, Type[VAD]] = {
+    EnergyVAD.name: EnergyVAD,
+    AdaptiveVAD.name: AdaptiveVAD,
+    SpectralVAD.name: SpectralVAD,
+}
+
+
+def make_vad(name: str = "spectral", sample_rate: int = 16000, **kwargs) -> VAD:
+    """Build a VAD backend by name (energy, adaptive or spectral)."""
+    if name not in VAD_BACKENDS:
+        raise ValueError(f"Unknown VAD backend '{name}' (choose from {', '.join(VAD_BACKENDS)})")
+    return VAD_BACKENDS[name](sample_rate, **kwargs)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Shared JSON state files with cross-process locking and merge-on-write.
+
+Several cron-driven runners read-modify-write the same files in memory/.
+StateFile keeps the snapshot a runner started from; on save it takes an
+exclusive fcntl lock, and if another process has written in the meantime
+(the `_version` counter moved) it three-way merges the two sets of changes
+instead of overwriting them. Writes go through a temp file + os.replace,
+so readers never see a half-written file and don't need to lock.
+
+    state = get_state("mersoom_state.json")
+    with state.edit() as data:
+        data["last_engagement"] = datetime.now().isoformat()
+
+In this repo mersoom_memory.json (mersoom_memory's JSON backend and
+mersoom_engagement.py) and mersoom_templates.json (mersoom_templates) are
+written through StateFile. The other SHARED_STATE_FILES are not written by
+any script here; they are listed so `status` and `show` can report them,
+and anything that starts writing them should go through get_state().
+"""
+
+import copy
+import fcntl
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+STATE_DIR = "/root/.openclaw/workspace/memory"
+SHARED_STATE_FILES = (  # Files `status` reports on (see the module docstring)
+    "mersoom_memory.json",
+    "mersoom_state.json",
+    "mersoom_templates.json",
+    "moltbook-state.json",
+    "x-social-state.json",
+    "heartbeat-state.json",
+)
+VERSION_KEY = "_version"
+
+_MISSING = object()
+
+
+def _identity(value: Any) -> str:
+    """Hashable stand-in for a JSON value, used to diff lists."""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def _unversioned(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in data.items() if k != VERSION_KEY}
+
+
+def merge3(base: Any, ours: Any, theirs: Any) -> Any:
+    """
+    Three-way merge of JSON values.
+
+    Dicts merge key by key and lists keep both sides' additions and
+    removals relative to base. When both sides changed the same scalar,
+    ours (the process saving now) wins.
+    """
+    if ours == base:
+        return theirs
+    if theirs == base or theirs == ours:
+        return ours
+
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        merged = {}
+        for key in list(theirs) + [k for k in ours if k not in theirs]:
+            value = merge3(base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING))
+            if value is not _MISSING:
+                merged[key] = value
+        return merged
+
+    if isinstance(ours, list) and isinstance(theirs, list):
+        base_ids = {_identity(x) for x in base} if isinstance(base, list) else set()
+        our_ids = {_identity(x) for x in ours}
+        their_ids = set()
+        merged = []
+        for item in theirs:
+            item_id = _identity(item)
+            their_ids.add(item_id)
+            if item_id in our_ids or item_id not in base_ids:  # Not removed by us
+                merged.append(item)
+        merged.extend(x for x in ours if _identity(x) not in base_ids and _identity(x) not in their_ids)
+        return merged
+
+    return ours
+
+
+class StateFile:
+    """A JSON state file shared between processes."""
+
+    def __init__(self, path: str, default: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.default = default or {}
+        self.base: Optional[Dict[str, Any]] = None  # Snapshot the caller started from
+        self.merges = 0
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Any]:
+        data = copy.deepcopy(self.default)
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data.update(json.load(f))
+        return data
+
+    def version(self) -> int:
+        """Version counter of the file on disk."""
+        return self._read().get(VERSION_KEY, 0)
+
+    def load(self) -> Dict[str, Any]:
+        """Read the file and remember it as the base for the next save()."""
+        data = self._read()
+        self.base = copy.deepcopy(data)
+        return data
+
+    def save(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Write data, merging with whatever other processes wrote since load().
+        Returns what was written, which becomes the new base.
+        """
+        with self._locked():
+            current = self._read()
+            current_version = current.get(VERSION_KEY, 0)
+            # The version check is the fast path; the comparison also catches hand edits
+            if self.base is not None and (current_version != self.base.get(VERSION_KEY, 0) or current != self.base):
+                data = merge3(_unversioned(self.base), _unversioned(data), _unversioned(current))
+                self.merges += 1
+            data = {**data, VERSION_KEY: current_version + 1}
+            self._write(data)
+        self.base = copy.deepcopy(data)
+        return data
+
+    def _write(self, data: Dict[str, Any]):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    @contextmanager
+    def edit(self):
+        """Load, let the caller modify the dict, then save with merge."""
+        data = self.load()
+        yield data
+        self.save(data)
+
+
+def get_state(name: str, default: Optional[Dict[str, Any]] = None) -> StateFile:
+    """StateFile for a file in the shared memory directory."""
+    return StateFile(os.path.join(STATE_DIR, name), default)
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+    if cmd == "status":
+        for name in SHARED_STATE_FILES:
+            path = os.path.join(STATE_DIR, name)
+            version = get_state(name).version() if os.path.exists(path) else None
+            print(f"{name}: {'missing' if version is None else f'version {version}'}")
+    elif cmd == "show":
+        print(json.dumps(get_state(sys.argv[2]).load(), indent=2, ensure_ascii=False))
+    else:
+        print("Usage: python shared_state.py [status|show FILE]")
@@ -25,9 +25,11 @@ from pathlib import Path
 
 # Add skill to path
 sys.path.insert(0, '/root/.openclaw/workspace/skill/mersoom')
-from mersoom_api import MersoomClient, analyze_content_quality, generate_comment, generate_post_title_and_content
+from mersoom_api import (MersoomClient, analyze_content_quality, comment_failed, comment_posted, generate_comment,
+                         generate_post_title_and_content)
 
 # Configuration
+MAX_COMMENTS = 2  # Comments attempted per run
 LOG_DIR = Path("/root/.openclaw/workspace/memory/mersoom_logs")
 STATE_FILE = LOG_DIR / "state.json"
 HOURLY_LOG = LOG_DIR / f"{datetime.now().strftime('%Y-%m-%d')}.jsonl"
@@ -138,6 +140,12 @@ def main():
         post_id = post.get('id')
         title = post.get('title', '')[:40]
         
+        # Each generated comment holds its template until posted or released,
+        # so only generate as many as we will attempt
+        if len(summary["comments_suggested"]) >= MAX_COMMENTS:
+            break
+        if not post_id:
+            continue
         comment_text = generate_comment(post)
         if comment_text:
             summary["comments_suggested"].append({
@@ -152,7 +160,7 @@ def main():
     print("\n5. Attempting to post comments...")
     print("   Note: Commenting requires PoW authentication")
     
-    for item in summary["comments_suggested"][:2]:
+    for item in summary["comments_suggested"]:
         post_id = item['post_id']
         comment_text = item['suggested_comment']
         
@@ -161,12 +169,15 @@ def main():
             result = client.create_comment(post_id, comment_text)
             # Verify the comment was actually created by checking for ID
             if result.get('id'):
+                comment_posted(comment_text, post_id)
                 summary["comments_succeeded"] += 1
                 print(f"   ✓ Commented on: {item['title'][:40]}...")
                 log_activity("comment_success", {"post_id": post_id, "content": comment_text})
             else:
+                comment_failed(comment_text)
                 print(f"   ✗ Comment failed: {item['title'][:40]}... (no ID returned)")
         except Exception as e:
+            comment_failed(comment_text)
             error_msg = str(e)
             if "PoW" in error_msg or "401" in error_msg or "Token" in error_msg or "proof" in error_msg.lower():
                 if "pow_auth_required" not in summary["api_limitations"]:
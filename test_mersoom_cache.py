@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for the Mersoom read cache (mersoom_cache.ResponseCache) behind
+AsyncMersoomClient: TTL hits, ETag and Last-Modified revalidation, LRU
+eviction and a 304 for an entry evicted in the meantime. The API is an
+httpx mock and the cache lives in a temporary directory.
+"""
+
+import asyncio
+import sys
+import tempfile
+
+import httpx
+
+from mersoom_cache import ResponseCache
+from mersoom_client import AsyncMersoomClient
+from mersoom_ratelimit import RateLimiter
+from mersoom_retry import RetryBudget, RetryPolicy
+from test_mersoom_client import BASE_URL, TokenPoolStandIn
+
+LAST_MODIFIED = "Sat, 17 Oct 2026 12:00:00 GMT"
+
+
+class PostsStandIn:
+    """GET /posts/{id} with validators; answers matching conditional requests with 304."""
+
+    def __init__(self, etag=True, last_modified=True):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.versions = {}  # post_id -> version, bumped when the post changes
+        self.requests = []  # (post_id, conditional headers)
+        self.before_304 = None  # Called just before a 304 goes out
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        post_id = request.url.path.rstrip("/").split("/")[-1]
+        conditional = {k: v for k, v in request.headers.items() if k in ("if-none-match", "if-modified-since")}
+        self.requests.append((post_id, conditional))
+        version = self.versions.setdefault(post_id, 1)
+        headers = {}
+        if self.etag:
+            headers["ETag"] = f'"{post_id}-v{version}"'
+        if self.last_modified:
+            headers["Last-Modified"] = LAST_MODIFIED if version == 1 else f"Sun, 18 Oct 2026 12:00:0{version} GMT"
+        if conditional and all(headers.get(h) == v for h, v in (
+                ("ETag", conditional.get("if-none-match")), ("Last-Modified", conditional.get("if-modified-since")))
+                if v is not None):
+            if self.before_304:
+                self.before_304(post_id)
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, headers=headers, json={"id": post_id, "version": version})
+
+
+def fetch(server, cache, *post_ids):
+    """get_post() each ID in turn through a client on the stand-in; returns the bodies."""
+    async def run():
+        async with AsyncMersoomClient(
+                base_url=BASE_URL, token_pool=TokenPoolStandIn(), transport=httpx.MockTransport(server.handle),
+                cache=cache, rate_limiter=RateLimiter(),
+                retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.05, budget=RetryBudget())) as client:
+            return [await client.get_post(post_id) for post_id in post_ids]
+    return asyncio.run(run())
+
+
+# ─────────────────────────────────────────────
+# Test 1: Within the TTL the cached body is served without a request
+# ─────────────────────────────────────────────
+def test_ttl_hit():
+    """A second read inside the TTL doesn't reach the server."""
+    print("TEST 1: Reads within the TTL are served from the cache...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(directory, ttl=60)
+        server = PostsStandIn()
+        bodies = fetch(server, cache, "p1", "p1")
+    assert bodies == [{"id": "p1", "version": 1}] * 2, f"FAIL: bodies {bodies}"
+    assert len(server.requests) == 1, f"FAIL: {len(server.requests)} requests"
+    assert cache.stats["hits"] == 1, f"FAIL: stats {cache.stats}"
+    print("  PASS: 2 reads, 1 request, 1 cache hit")
+
+
+# ─────────────────────────────────────────────
+# Test 2: ETag revalidation
+# ─────────────────────────────────────────────
+def test_etag_revalidation():
+    """Past the TTL the read sends If-None-Match; a 304 reuses the body, a changed post is stored anew."""
+    print("TEST 2: Stale entries are revalidated with If-None-Match...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(directory, ttl=0)
+        server = PostsStandIn(last_modified=False)
+        first, second = fetch(server, cache, "p1", "p1")
+        server.versions["p1"] = 2
+        third, fourth = fetch(server, cache, "p1", "p1")
+
+    conditions = [conditional for _, conditional in server.requests]
+    assert conditions[0] == {}, f"FAIL: first request sent {conditions[0]}"
+    assert conditions[1] == {"if-none-match": '"p1-v1"'}, f"FAIL: second request sent {conditions[1]}"
+    assert first == second == {"id": "p1", "version": 1}, f"FAIL: bodies {first} {second}"
+    assert third == fourth == {"id": "p1", "version": 2}, f"FAIL: bodies after change {third} {fourth}"
+    assert cache.stats["revalidated"] == 2, f"FAIL: stats {cache.stats}"
+    print(f"  PASS: {cache.stats['revalidated']} reads answered by 304, the changed post fetched in full")
+
+
+# ─────────────────────────────────────────────
+# Test 3: Last-Modified revalidation
+# ─────────────────────────────────────────────
+def test_last_modified_revalidation():
+    """Without an ETag the stored Last-Modified goes out as If-Modified-Since."""
+    print("TEST 3: Stale entries are revalidated with If-Modified-Since...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(directory, ttl=0)
+        server = PostsStandIn(etag=False)
+        bodies = fetch(server, cache, "p1", "p1")
+
+    assert server.requests[1][1] == {"if-modified-since": LAST_MODIFIED}, f"FAIL: sent {server.requests[1][1]}"
+    assert bodies[1] == {"id": "p1", "version": 1}, f"FAIL: body {bodies[1]}"
+    assert cache.stats["revalidated"] == 1, f"FAIL: stats {cache.stats}"
+    print("  PASS: 304 on If-Modified-Since reused the stored body")
+
+
+# ─────────────────────────────────────────────
+# Test 4: The least recently used entry is evicted
+# ─────────────────────────────────────────────
+def test_lru_eviction():
+    """Past max_entries the entry read longest ago goes, not the one stored first."""
+    print("TEST 4: Entries are evicted least recently used first...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(directory, ttl=60, max_entries=2)
+        server = PostsStandIn()
+        fetch(server, cache, "p1", "p2", "p1", "p3")  # p1 is read again after p2
+        fetched = [post_id for post_id, _ in server.requests]
+        server.requests = []
+        fetch(server, cache, "p1", "p3", "p2")
+        refetched = [post_id for post_id, _ in server.requests]
+        info = cache.info()
+
+    assert fetched == ["p1", "p2", "p3"], f"FAIL: first round fetched {fetched}"
+    assert refetched == ["p2"], f"FAIL: second round fetched {refetched}"
+    assert info["entries"] == 2 and info["evictions"] == 2, f"FAIL: info {info}"
+    print(f"  PASS: p2 evicted before p1; {info['evictions']} evictions, {info['entries']} entries kept")
+
+
+# ─────────────────────────────────────────────
+# Test 5: A 304 for an evicted entry refetches instead of failing
+# ─────────────────────────────────────────────
+def test_304_after_eviction():
+    """If the entry is evicted while the conditional request is out, the read repeats it without validators."""
+    print("TEST 5: A 304 for an evicted entry is refetched unconditionally...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(directory, ttl=0)
+        server = PostsStandIn()
+        server.before_304 = lambda post_id: cache.invalidate(f"{BASE_URL}/posts/{post_id}")
+        bodies = fetch(server, cache, "p1", "p1")
+
+    conditions = [conditional for _, conditional in server.requests]
+    assert bodies[1] == {"id": "p1", "version": 1}, f"FAIL: body {bodies[1]}"
+    assert len(conditions) == 3 and conditions[1] and conditions[2] == {}, f"FAIL: requests {conditions}"
+    print("  PASS: conditional read got 304 after eviction, repeated without validators")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Mersoom Read Cache Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_ttl_hit,
+        test_etag_revalidation,
+        test_last_modified_revalidation,
+        test_lru_eviction,
+        test_304_after_eviction,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
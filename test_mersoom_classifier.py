@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the classifier's persistent decision cache
+(mersoom_classifier.DecisionCache): runners on different classifier
+versions sharing one file, and pruning by age and row count. The cache
+lives in a temporary directory.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from mersoom_classifier import DecisionCache, classify_batch, classify_post, content_hash
+
+POSTS = [
+    {"id": "p1", "title": "AI 에이전트 자동화", "content": "컨텍스트를 쪼개서 작업하는 방법을 정리했습니다"},
+    {"id": "p2", "title": "오늘의 생각", "content": "겨울 아침의 고요한 바람"},
+]
+
+
+# ─────────────────────────────────────────────
+# Test 1: Runners on different versions don't wipe each other's cache
+# ─────────────────────────────────────────────
+def test_versions_coexist():
+    """Opening the cache with another version keeps the first version's rows and hits."""
+    print("TEST 1: Decisions of other classifier versions survive an open...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "decisions.db")
+        keywords = DecisionCache(path, version="v-keywords")
+        classify_batch(POSTS, cache=keywords)
+
+        ngram = DecisionCache(path, version="v-ngram")
+        classify_batch(POSTS, cache=ngram)
+        ngram.close()
+
+        classify_batch(POSTS, cache=keywords)
+        keywords.close()
+        reopened = DecisionCache(path, version="v-keywords")
+        decisions = classify_batch(POSTS, cache=reopened)
+        reopened.close()
+
+    assert ngram.stats["misses"] == 2 and ngram.stats["pruned"] == 0, f"FAIL: ngram stats {ngram.stats}"
+    assert keywords.stats["hits"] == 2, f"FAIL: keywords stats {keywords.stats}"
+    assert reopened.stats["hits"] == 2, f"FAIL: reopened stats {reopened.stats}"
+    assert decisions == [classify_post(p) for p in POSTS], "FAIL: cached decisions differ from fresh ones"
+    print("  PASS: both versions cached side by side, each still hits after the other opened")
+
+
+# ─────────────────────────────────────────────
+# Test 2: Old rows and rows past the cap are pruned
+# ─────────────────────────────────────────────
+def test_prune():
+    """Rows older than the max age go, then all but the newest max_rows, across versions."""
+    print("TEST 2: Decisions are pruned by age and row count...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "decisions.db")
+        cache = DecisionCache(path, version="v1")
+        decision = classify_post(POSTS[0])
+        cache.put_many({(f"p{i}", content_hash(POSTS[0])): decision for i in range(5)})
+        DecisionCache(path, version="v2").put_many({("q1", "h"): decision})
+        with cache.conn:
+            cache.conn.execute("UPDATE decisions SET stored_at = ? WHERE post_id = 'p0'", (time.time() - 3600,))
+            cache.conn.execute("UPDATE decisions SET stored_at = ? WHERE post_id = 'p1'", (time.time() - 60,))
+
+        by_age = cache.prune(max_age=600, max_rows=100)
+        by_rows = cache.prune(max_age=600, max_rows=3)
+        left = sorted(row[0] for row in cache.conn.execute("SELECT post_id FROM decisions"))
+        cache.close()
+
+    assert by_age == 1, f"FAIL: pruned {by_age} by age"
+    assert by_rows == 2 and len(left) == 3, f"FAIL: pruned {by_rows} by count, left {left}"
+    assert "p1" not in left, f"FAIL: the oldest remaining row survived the cap: {left}"
+    print(f"  PASS: {by_age} row pruned by age, {by_rows} by count, kept {left}")
+
+
+# ─────────────────────────────────────────────
+# Test 3: Caches written before pruning existed are upgraded
+# ─────────────────────────────────────────────
+def test_upgrade_old_cache():
+    """A decisions table without stored_at gets the column; its undated rows are pruned as old."""
+    print("TEST 3: Old cache files get a stored_at column on open...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "decisions.db")
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE decisions (
+                post_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                PRIMARY KEY (post_id, content_hash, version)
+            )""")
+        conn.execute("INSERT INTO decisions VALUES ('p1', 'h', 'v0', '{}')")
+        conn.commit()
+        conn.close()
+
+        cache = DecisionCache(path, version="v1")
+        classify_batch(POSTS, cache=cache)
+        count = cache.conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        cache.close()
+
+    assert cache.stats["pruned"] == 1, f"FAIL: stats {cache.stats}"
+    assert count == 2, f"FAIL: {count} rows after classifying 2 posts"
+    print("  PASS: column added, undated row pruned, new decisions stored")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Mersoom Decision Cache Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_versions_coexist,
+        test_prune,
+        test_upgrade_old_cache,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
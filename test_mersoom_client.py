@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Tests for AsyncMersoomClient writes and request pacing against an
+in-process httpx mock of the Mersoom API, so no network or credentials
+are needed.
+
+The mock serves GET /posts and GET /posts/{id}/comments from its own
+state, fails the first N writes of a path with a chosen status, and
+records every request. PoW headers come from a stand-in token pool.
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+
+import mersoom_memory
+import mersoom_ratelimit
+from mersoom_client import AGENT_AUTH_ID, AsyncMersoomClient
+from mersoom_ratelimit import RateLimiter, get_rate_limiter
+from mersoom_retry import RetryBudget, RetryPolicy
+
+BASE_URL = "https://mersoom.test/api"
+
+
+class TokenPoolStandIn:
+    """Hands out distinct, already 'solved' PoW headers."""
+
+    def __init__(self):
+        self.served = 0
+
+    def get_headers(self, timeout=None):
+        self.served += 1
+        return {"X-Mersoom-Token": f"token-{self.served}", "X-Mersoom-Proof": "0"}
+
+
+class MersoomStandIn:
+    """Just enough of the Mersoom API for writes and the dedup lookups."""
+
+    def __init__(self):
+        self.posts = []
+        self.comments = {}  # post_id -> [comment]
+        self.failures = {}  # path -> [(status, headers), ...] served before succeeding
+        self.requests = []
+
+    def fail(self, path, *responses):
+        self.failures.setdefault(path, []).extend(responses)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path[len("/api"):]
+        self.requests.append((request.method, path, request.headers.get("X-Mersoom-Token")))
+        if request.method == "GET":
+            if path == "/posts":
+                return httpx.Response(200, json={"posts": list(reversed(self.posts))})
+            if path.endswith("/comments"):
+                return httpx.Response(200, json={"comments": self.comments.get(path.split("/")[2], [])})
+            return httpx.Response(404)
+
+        if self.failures.get(path):
+            status, headers = self.failures[path].pop(0)
+            return httpx.Response(status, headers=headers, json={"error": "try again"})
+        body = json.loads(request.content)
+        if path == "/posts":
+            post = {"id": f"p{len(self.posts) + 1}", **body}
+            self.posts.append(post)
+            return httpx.Response(200, json=post)
+        if path.endswith("/comments"):
+            thread = self.comments.setdefault(path.split("/")[2], [])
+            comment = {"id": f"c{len(thread) + 1}", **body}
+            thread.append(comment)
+            return httpx.Response(200, json=comment)
+        return httpx.Response(200, json={"ok": True})
+
+    def writes(self, path):
+        return [r for r in self.requests if r[0] == "POST" and r[1] == path]
+
+
+def make_client(server, handler=None):
+    """Client on the stand-in (or a handler wrapping it) with fast retries and default rate limits."""
+    return AsyncMersoomClient(
+        base_url=BASE_URL,
+        token_pool=TokenPoolStandIn(),
+        transport=httpx.MockTransport(handler or server.handle),
+        rate_limiter=RateLimiter(),
+        retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.05, budget=RetryBudget()),
+    )
+
+
+# ─────────────────────────────────────────────
+# Test 1: A retried post doesn't wait for another post-bucket token
+# ─────────────────────────────────────────────
+def test_post_retry_skips_bucket():
+    """
+    The post bucket holds one token an hour. A 5xx on create_post is
+    retried right away with a fresh PoW token instead of sleeping ~3600s
+    for the bucket to refill.
+    """
+    print("TEST 1: A post retried after a 5xx doesn't block on the post bucket...")
+
+    server = MersoomStandIn()
+    server.fail("/posts", (503, {}))
+
+    async def run():
+        async with make_client(server) as client:
+            started = time.monotonic()
+            result = await asyncio.wait_for(client.create_post("Title", "Body"), timeout=5)
+            return result, time.monotonic() - started, client.rate_limiter.info()["post"]
+
+    result, elapsed, bucket = asyncio.run(run())
+    tokens = [token for _, _, token in server.writes("/posts")]
+    assert result["id"] == "p1", f"FAIL: result {result}"
+    assert len(tokens) == 2 and tokens[0] != tokens[1], f"FAIL: sent with PoW tokens {tokens}"
+    assert bucket["acquired"] == 1, f"FAIL: post bucket taken {bucket['acquired']} times"
+    assert elapsed < 1.0, f"FAIL: retry took {elapsed:.1f}s"
+    print(f"  PASS: posted after one retry in {elapsed * 1000:.0f}ms, one bucket token, two PoW tokens")
+
+
+# ─────────────────────────────────────────────
+# Test 2: A 429 waits out Retry-After, not the halved bucket rate
+# ─────────────────────────────────────────────
+def test_post_retry_after_429():
+    """After a 429 the retry waits for Retry-After only, even though the bucket's rate was halved."""
+    print("TEST 2: A post retried after a 429 waits only for Retry-After...")
+
+    server = MersoomStandIn()
+    server.fail("/posts", (429, {"Retry-After": "0.2"}))
+
+    async def run():
+        async with make_client(server) as client:
+            started = time.monotonic()
+            result = await asyncio.wait_for(client.create_post("Title", "Body"), timeout=5)
+            return result, time.monotonic() - started, client.rate_limiter.info()["post"]
+
+    result, elapsed, bucket = asyncio.run(run())
+    assert result["id"] == "p1", f"FAIL: result {result}"
+    assert bucket["throttled"] == 1 and bucket["acquired"] == 1, f"FAIL: bucket {bucket}"
+    assert 0.2 <= elapsed < 1.0, f"FAIL: retry after {elapsed:.2f}s"
+    print(f"  PASS: posted {elapsed * 1000:.0f}ms after the 429 (Retry-After 200ms)")
+
+
+# ─────────────────────────────────────────────
+# Test 3: A retried comment on a thread we commented on before is still posted
+# ─────────────────────────────────────────────
+def test_comment_retry_on_known_thread():
+    """
+    The memory store knows we commented on the post before, and the thread
+    holds that older comment. A new comment whose first attempt fails must
+    be retried and posted, not reported as a duplicate of the old one.
+    """
+    print("TEST 3: A retried comment on a thread we commented on before is posted...")
+
+    server = MersoomStandIn()
+    server.comments["p1"] = [{"id": "c1", "auth_id": AGENT_AUTH_ID, "content": "Earlier comment"}]
+    server.fail("/posts/p1/comments", (502, {}))
+    already_recorded = mersoom_memory.already_recorded
+    mersoom_memory.already_recorded = lambda kind, post_id: True  # Every post is in the store
+
+    async def run():
+        async with make_client(server) as client:
+            return await asyncio.wait_for(client.create_comment("p1", "A different comment"), timeout=5)
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        mersoom_memory.already_recorded = already_recorded
+
+    contents = [c["content"] for c in server.comments["p1"]]
+    assert not result.get("deduplicated"), f"FAIL: retry dropped as a duplicate: {result}"
+    assert contents == ["Earlier comment", "A different comment"], f"FAIL: thread holds {contents}"
+    print(f"  PASS: posted as {result['id']} after one retry; thread now has {len(contents)} comments")
+
+
+# ─────────────────────────────────────────────
+# Test 4: A comment that landed before its error isn't sent twice
+# ─────────────────────────────────────────────
+def test_comment_retry_finds_landed_comment():
+    """A timed-out attempt that did land is found in the thread by its content and not re-sent."""
+    print("TEST 4: A comment that landed despite an error isn't posted again...")
+
+    server = MersoomStandIn()
+    handle = server.handle
+    dropped = []
+
+    def landed_then_timeout(request):
+        response = handle(request)
+        if request.method == "POST" and not dropped:
+            dropped.append(response)
+            raise httpx.ReadTimeout("response lost", request=request)
+        return response
+
+    async def run():
+        async with make_client(server, landed_then_timeout) as client:
+            return await asyncio.wait_for(client.create_comment("p1", "Only once"), timeout=5)
+
+    result = asyncio.run(run())
+    contents = [c["content"] for c in server.comments["p1"]]
+    assert contents == ["Only once"], f"FAIL: thread holds {contents}"
+    assert result.get("id") == "c1", f"FAIL: result {result}"
+    print(f"  PASS: retry found {result['id']} in the thread and didn't send again")
+
+
+
+def with_challenges(server, seen):
+    """Handler serving POST /challenge (easy target) in front of the stand-in; 429s the first one."""
+    def handle(request):
+        if request.url.path.endswith("/challenge"):
+            seen.append(time.monotonic())
+            if len(seen) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0.2"}, json={"error": "slow down"})
+            return httpx.Response(200, json={"token": f"t{len(seen)}", "challenge": {"seed": "s", "target_prefix": "0"}})
+        return server.handle(request)
+    return handle
+
+
+# ─────────────────────────────────────────────
+# Test 5: Inline PoW challenges go through the rate limiter
+# ─────────────────────────────────────────────
+def test_challenge_rate_limited():
+    """
+    Without a token pool the client POSTs /challenge itself; that request
+    takes a 'challenge' slot and a 429 on it blocks the bucket.
+    """
+    print("TEST 5: /challenge requests are rate limited...")
+
+    server = MersoomStandIn()
+    seen = []
+
+    async def run():
+        async with make_client(server, with_challenges(server, seen)) as client:
+            client.token_pool = None  # Solve inline
+            client.rate_limiter = RateLimiter({"challenge": (20.0, 1)})  # Halved, still well under Retry-After
+            headers = await asyncio.wait_for(client.get_pow_headers(), timeout=5)
+            return headers, client.rate_limiter.info()["challenge"]
+
+    headers, bucket = asyncio.run(run())
+    assert headers["X-Mersoom-Token"] == "t2", f"FAIL: headers {headers}"
+    assert bucket["acquired"] == 2 and bucket["throttled"] == 1, f"FAIL: bucket {bucket}"
+    assert seen[1] - seen[0] >= 0.2, f"FAIL: retried {seen[1] - seen[0]:.2f}s after the 429"
+    print(f"  PASS: 2 challenge slots taken, retried {(seen[1] - seen[0]) * 1000:.0f}ms after the 429")
+
+
+# ─────────────────────────────────────────────
+# Test 6: Clients in one process share a rate limiter
+# ─────────────────────────────────────────────
+def test_shared_rate_limiter():
+    """
+    Clients built without a limiter (as in fetch_new_posts and
+    fetch_comments_many) draw on the same buckets, across separate
+    asyncio.run() calls.
+    """
+    print("TEST 6: Clients share one process-wide rate limiter...")
+
+    saved = mersoom_ratelimit._limiter
+    # Burst of one, so the reads queue on the bucket's lock in both event loops
+    limiter = mersoom_ratelimit._limiter = RateLimiter({"read": (50.0, 1)})
+
+    async def burst():
+        client = AsyncMersoomClient(base_url=BASE_URL, token_pool=TokenPoolStandIn(),
+                                    transport=httpx.MockTransport(MersoomStandIn().handle))
+        async with client:
+            assert client.rate_limiter is get_rate_limiter(), "FAIL: client built its own limiter"
+            await asyncio.gather(*(client.get_posts() for _ in range(3)))
+
+    try:
+        asyncio.run(burst())
+        asyncio.run(burst())  # The bucket's first lock belongs to the first loop
+    finally:
+        mersoom_ratelimit._limiter = saved
+    read = limiter.info()["read"]
+    assert read["acquired"] == 6 and read["waited"] >= 4, f"FAIL: read bucket {read}"
+    print(f"  PASS: both runs paced by the shared read bucket ({read['waited']} of {read['acquired']} reads waited)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Mersoom Client Write Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_post_retry_skips_bucket,
+        test_post_retry_after_429,
+        test_comment_retry_on_known_thread,
+        test_comment_retry_finds_landed_comment,
+        test_challenge_rate_limited,
+        test_shared_rate_limiter,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
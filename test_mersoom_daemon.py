@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the engagement daemon's control socket (mersoom_daemon): `run`,
+`status`, `stop` and bad commands, sent with send_command() to the
+daemon's handler on a socket in a temporary directory. The daemon talks
+to the httpx mock from test_mersoom_client and keeps its memory in a
+temporary SQLite database.
+"""
+
+import asyncio
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import mersoom_api_retry
+import mersoom_cache
+from mersoom_cache import ResponseCache
+from mersoom_daemon import EngagementDaemon, send_command
+from test_mersoom_client import MersoomStandIn, TokenPoolStandIn, make_client
+from test_mersoom_memory import temp_db
+
+
+class StatsTokenPool(TokenPoolStandIn):
+    """Token pool stand-in with the counters `status` reports."""
+
+    def __init__(self):
+        super().__init__()
+        self.stats = {"solved": 0, "served": 0, "expired": 0, "errors": 0}
+
+
+@contextmanager
+def daemon_env():
+    """Temporary memory, cache and token pool for a daemon; yields the directory."""
+    saved = mersoom_api_retry._token_pool, mersoom_cache._cache
+    with temp_db() as directory:
+        mersoom_api_retry._token_pool = StatsTokenPool()
+        mersoom_cache._cache = ResponseCache(os.path.join(directory, "cache"))
+        try:
+            yield directory
+        finally:
+            mersoom_api_retry._token_pool, mersoom_cache._cache = saved
+
+
+def control(daemon, server, directory, *commands):
+    """Serve the daemon's control socket with a client on `server`; returns the reply to each command."""
+    path = os.path.join(directory, "daemon.sock")
+
+    async def run():
+        async with make_client(server) as daemon.client:
+            control_server = await asyncio.start_unix_server(daemon._handle_control, path=path)
+            try:
+                return [await asyncio.to_thread(send_command, command, path, 10) for command in commands]
+            finally:
+                control_server.close()
+                await control_server.wait_closed()
+    return asyncio.run(run())
+
+
+# ─────────────────────────────────────────────
+# Test 1: `run JOB` runs the job and replies with its result
+# ─────────────────────────────────────────────
+def test_run_job():
+    """`run replies` counts comments on our posts; `run post` posts once and then waits out the hour."""
+    print("TEST 1: run commands execute jobs and reply with their results...")
+
+    server = MersoomStandIn()
+    server.comments = {"p1": [{"id": "c1"}, {"id": "c2"}], "p2": []}
+    with daemon_env() as directory:
+        daemon = EngagementDaemon(socket_path=os.path.join(directory, "daemon.sock"))
+        earlier = (datetime.now() - timedelta(hours=2)).isoformat()  # Past the one-post-an-hour limit
+        daemon.memory.record_post_created("p1", "First", timestamp=earlier)
+        daemon.memory.record_post_created("p2", "Second", timestamp=earlier)
+        replies, posted, again = control(daemon, server, directory, "run replies", "run post", "run post")
+        created = daemon.memory.memory["posts_created"]
+
+    assert replies["replies"]["replies"] == {"p1": 2, "p2": 0}, f"FAIL: replies {replies}"
+    assert posted["post"]["created"] and len(server.writes("/posts")) == 1, f"FAIL: post {posted}"
+    assert created[-1]["post_id"] == "p1" and len(created) == 3, f"FAIL: posts_created {created}"
+    assert again["post"]["created"] is None and again["post"]["wait_minutes"] > 0, f"FAIL: second post {again}"
+    assert daemon.stats["post"]["runs"] == 2 and daemon.stats["replies"]["runs"] == 1, f"FAIL: {daemon.stats}"
+    print(f"  PASS: replies counted, 1 post created, second post waits {again['post']['wait_minutes']} minutes")
+
+
+# ─────────────────────────────────────────────
+# Test 2: A failing job is reported, not fatal
+# ─────────────────────────────────────────────
+def test_run_job_error():
+    """A job that raises replies with the error and counts it; the next command still works."""
+    print("TEST 2: A failing job replies with its error...")
+
+    server = MersoomStandIn()
+    server.fail("/posts", (400, {}))
+    with daemon_env() as directory:
+        daemon = EngagementDaemon(socket_path=os.path.join(directory, "daemon.sock"))
+        failed, status = control(daemon, server, directory, "run post", "status")
+
+    assert "error" in failed["post"], f"FAIL: reply {failed}"
+    assert daemon.stats["post"]["errors"] == 1 and daemon.stats["post"]["runs"] == 1, f"FAIL: {daemon.stats}"
+    assert status["jobs"]["post"]["last_result"] == failed["post"], f"FAIL: status {status['jobs']['post']}"
+    print(f"  PASS: error reported ({failed['post']['error'][:40]}...) and shown in status")
+
+
+# ─────────────────────────────────────────────
+# Test 3: status, stop and bad commands
+# ─────────────────────────────────────────────
+def test_status_stop_unknown():
+    """`status` reports every job; unknown jobs and commands are refused; `stop` ends the daemon."""
+    print("TEST 3: status, stop and unknown commands...")
+
+    with daemon_env() as directory:
+        daemon = EngagementDaemon(intervals={"vote": 60}, socket_path=os.path.join(directory, "daemon.sock"))
+        status, unknown_job, unknown_cmd, stop = control(
+            daemon, MersoomStandIn(), directory, "status", "run vote nap", "dance", "stop")
+
+    assert set(status["jobs"]) == {"vote", "comment", "post", "replies"}, f"FAIL: jobs {status['jobs']}"
+    assert status["jobs"]["vote"]["interval"] == 60, f"FAIL: vote {status['jobs']['vote']}"
+    assert status["rate_limits"] is not None and "entries" in status["cache"], f"FAIL: status {status}"
+    assert unknown_job == {"error": "unknown job(s): nap"}, f"FAIL: {unknown_job}"
+    assert daemon.stats["vote"]["runs"] == 0, "FAIL: vote ran although the command was refused"
+    assert unknown_cmd == {"error": "unknown command: dance"}, f"FAIL: {unknown_cmd}"
+    assert stop == {"stopping": True} and daemon._stopped.is_set(), f"FAIL: stop {stop}"
+    print("  PASS: status lists 4 jobs, bad job and command refused, stop sets the event")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Mersoom Daemon Control Socket Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_run_job,
+        test_run_job_error,
+        test_status_stop_unknown,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
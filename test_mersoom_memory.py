@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests for the mersoom_memory SQLite backend and compaction, run against a
+database and archive in a temporary directory instead of the workspace
+memory/ files.
+"""
+
+import glob
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import mersoom_memory
+
+
+@contextmanager
+def temp_db():
+    """Point mersoom_memory at a fresh SQLite database and archive; yields their directory."""
+    saved = os.environ.get(mersoom_memory.BACKEND_ENV), mersoom_memory.MEMORY_DB, mersoom_memory.ARCHIVE_DIR
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ[mersoom_memory.BACKEND_ENV] = "sqlite"
+        mersoom_memory.MEMORY_DB = os.path.join(directory, "mersoom_memory.db")
+        mersoom_memory.ARCHIVE_DIR = os.path.join(directory, "mersoom_archive")
+        mersoom_memory._conn = None
+        mersoom_memory._db_loaded = None
+        try:
+            yield directory
+        finally:
+            if mersoom_memory._conn is not None:
+                mersoom_memory._conn.close()
+            mersoom_memory._conn = None
+            mersoom_memory._db_loaded = None
+            backend, mersoom_memory.MEMORY_DB, mersoom_memory.ARCHIVE_DIR = saved
+            if backend is None:
+                os.environ.pop(mersoom_memory.BACKEND_ENV, None)
+            else:
+                os.environ[mersoom_memory.BACKEND_ENV] = backend
+
+
+def other_process(db_path):
+    """Separate connection standing in for another runner."""
+    return mersoom_memory._connect(db_path)
+
+
+# ─────────────────────────────────────────────
+# Test 1: save_memory keeps rows other processes wrote after our load
+# ─────────────────────────────────────────────
+def test_save_keeps_other_writers():
+    """A vote another runner recorded between our load_memory() and save_memory() survives the save."""
+    print("TEST 1: save_memory() keeps rows written by other processes since load_memory()...")
+
+    with temp_db():
+        mersoom_memory.record_vote("p1", "up", "First")
+        memory = mersoom_memory.load_memory()
+
+        conn = other_process(mersoom_memory.MEMORY_DB)
+        with conn:
+            mersoom_memory._put_vote(conn, "p2", {"vote": "down", "title": "Theirs", "timestamp": "2026-01-01T00:00:00"})
+
+        memory["posts_voted"]["p3"] = {"vote": "up", "title": "Ours", "timestamp": "2026-01-01T00:00:01"}
+        memory["notes"] = "hello"
+        mersoom_memory.save_memory(memory)
+
+        saved = mersoom_memory._load_db(conn)
+        conn.close()
+        assert set(saved["posts_voted"]) == {"p1", "p2", "p3"}, f"FAIL: votes {sorted(saved['posts_voted'])}"
+        assert saved["notes"] == "hello", f"FAIL: notes {saved.get('notes')!r}"
+        print(f"  PASS: {len(saved['posts_voted'])} votes after save, including the other runner's")
+
+
+# ─────────────────────────────────────────────
+# Test 2: save_memory only writes what changed
+# ─────────────────────────────────────────────
+def test_save_writes_changes_only():
+    """Saving a loaded dict with one new vote writes one row, not the whole history."""
+    print("TEST 2: save_memory() writes only the changed records...")
+
+    with temp_db():
+        with mersoom_memory.session() as m:
+            for i in range(200):
+                m.record_vote(f"p{i}", "up", f"Post {i}")
+            m.record_post_created("x1", "Mine")
+
+        memory = mersoom_memory.load_memory()
+        memory["posts_voted"]["new"] = {"vote": "up", "title": "New", "timestamp": "2026-01-01T00:00:00"}
+        del memory["posts_voted"]["p0"]
+
+        statements = []
+        mersoom_memory._db().set_trace_callback(statements.append)
+        mersoom_memory.save_memory(memory)
+        mersoom_memory._db().set_trace_callback(None)
+
+        writes = [s for s in statements if s.split()[0] in ("INSERT", "DELETE")]
+        saved = mersoom_memory.load_memory()
+        assert len(writes) == 2, f"FAIL: {len(writes)} writes: {writes}"
+        assert "new" in saved["posts_voted"] and "p0" not in saved["posts_voted"], "FAIL: change not saved"
+        assert len(saved["posts_created"]) == 1, f"FAIL: posts_created {saved['posts_created']}"
+        print(f"  PASS: {len(writes)} row writes for a store of {len(saved['posts_voted'])} votes")
+
+
+# ─────────────────────────────────────────────
+# Test 3: migrate still replaces the database contents
+# ─────────────────────────────────────────────
+def test_migrate_replaces():
+    """migrate() copies a JSON file into the database, dropping rows that aren't in it."""
+    print("TEST 3: migrate() replaces the database with the JSON file...")
+
+    with temp_db() as directory:
+        mersoom_memory.record_vote("stale", "up", "Old")
+        mersoom_memory._conn.close()
+        mersoom_memory._conn = None
+
+        json_path = os.path.join(directory, "memory.json")
+        with open(json_path, "w") as f:
+            f.write('{"posts_voted": {"p1": {"vote": "up", "title": "A"}}, "posts_commented": {}, '
+                    '"posts_created": [], "entities": {}, "last_run": null}')
+        mersoom_memory.migrate(json_path, mersoom_memory.MEMORY_DB)
+
+        conn = sqlite3.connect(mersoom_memory.MEMORY_DB)
+        votes = [row[0] for row in conn.execute("SELECT post_id FROM votes")]
+        conn.close()
+        assert votes == ["p1"], f"FAIL: votes {votes}"
+        print("  PASS: database holds exactly the migrated votes")
+
+
+
+# ─────────────────────────────────────────────
+# Test 4: compact() archives old and surplus records and still finds them
+# ─────────────────────────────────────────────
+def test_compact_archives():
+    """
+    Votes past the retention window, and all but the newest `keep`, move
+    to the monthly archive; get_seen_post_ids() still reports them.
+    """
+    print("TEST 4: compact() moves old records to the archive...")
+
+    now = datetime.now()
+    with temp_db():
+        with mersoom_memory.session() as m:
+            for i in range(3):
+                m.record_vote(f"old{i}", "up", "Old", timestamp=(now - timedelta(days=30, hours=i)).isoformat())
+            for i in range(4):
+                m.record_vote(f"new{i}", "up", "New", timestamp=(now - timedelta(hours=i)).isoformat())
+
+        archived = mersoom_memory.compact(keep_days=14, keep=3)
+        hot = set(mersoom_memory.load_memory()["posts_voted"])
+        seen = mersoom_memory.get_seen_post_ids()
+        entries = []
+        for path in glob.glob(os.path.join(mersoom_memory.ARCHIVE_DIR, "*.jsonl.gz")):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entries += [json.loads(line) for line in f]
+        missing = [post_id for post_id in ("old0", "old1", "old2", "new3") if post_id not in seen]
+        seen.archived.close()
+
+    assert archived == 4, f"FAIL: archived {archived}"
+    assert hot == {"new0", "new1", "new2"}, f"FAIL: hot votes {sorted(hot)}"
+    assert sorted(e["id"] for e in entries) == ["new3", "old0", "old1", "old2"], f"FAIL: archive {entries}"
+    assert not missing, f"FAIL: archived IDs not seen: {missing}"
+    print(f"  PASS: {archived} votes archived, {len(hot)} kept hot, archived IDs still seen")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Mersoom Memory Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_save_keeps_other_writers,
+        test_save_writes_changes_only,
+        test_migrate_replaces,
+        test_compact_archives,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Tests for the staged engagement pipeline (mersoom_pipeline): stage order,
+fan-out and error handling in Pipeline, and run_engagement() end to end
+against the httpx mock from test_mersoom_client. Memory, the decision
+cache and the template store live in a temporary directory.
+"""
+
+import asyncio
+import os
+import sys
+from contextlib import contextmanager
+
+import mersoom_classifier
+import mersoom_memory
+import mersoom_templates
+from mersoom_classifier import DecisionCache
+from mersoom_client import AGENT_NICKNAME
+from mersoom_pipeline import Pipeline, run_engagement
+from mersoom_ratelimit import RateLimiter
+from mersoom_templates import TemplateStore, pick_comment
+from test_mersoom_client import MersoomStandIn, TokenPoolStandIn, make_client
+from test_mersoom_memory import temp_db
+
+TEMPLATES = {"productivity": ["첫 번째 댓글입니다.", "두 번째 댓글입니다.", "세 번째 댓글입니다."]}
+POSTS = [
+    {"id": "p1", "title": "작업 쪼개기", "content": "집중이 안 될 때 10분 단위로 작업을 시작합니다", "nickname": "a"},
+    {"id": "p2", "title": "생산성 팁", "content": "작업 시작 전에 계획을 세우고 집중합니다", "nickname": "b"},
+    {"id": "p3", "title": "자동화 작업", "content": "반복 작업을 자동화해서 집중 시간을 늘렸습니다", "nickname": "c"},
+]
+
+
+@contextmanager
+def pipeline_env():
+    """Temporary memory, decision cache and template store; yields the template store."""
+    saved = mersoom_classifier._decision_cache, mersoom_templates._store
+    with temp_db() as directory:
+        mersoom_classifier._decision_cache = DecisionCache(os.path.join(directory, "decisions.db"))
+        mersoom_templates._store = TemplateStore(os.path.join(directory, "templates.json"))
+        try:
+            yield mersoom_templates._store
+        finally:
+            mersoom_classifier._decision_cache.close()
+            mersoom_classifier._decision_cache, mersoom_templates._store = saved
+
+
+def generate_comment(post, decision):
+    return pick_comment(TEMPLATES, "productivity", post["id"])
+
+
+async def pages_of(*pages):
+    for page in pages:
+        yield page
+
+
+def engage(server, *pages, client=None, **kwargs):
+    """run_engagement() over `pages` with a client on the stand-in; returns (counts, pipeline)."""
+    async def run():
+        async with (client or make_client(server)) as c:
+            with mersoom_memory.session() as m:
+                return await run_engagement(c, m, pages_of(*pages), **kwargs)
+    return asyncio.run(run())
+
+
+# ─────────────────────────────────────────────
+# Test 1: Items go through the stages in order
+# ─────────────────────────────────────────────
+def test_stage_order():
+    """Every item passes each stage in the order they were added; a list fans out."""
+    print("TEST 1: Items pass the stages in order and lists fan out...")
+
+    seen = []
+
+    def stage(name, fan_out=False):
+        async def fn(item):
+            seen.append((name, item))
+            await asyncio.sleep(0)
+            return [f"{item}a", f"{item}b"] if fan_out else item
+        return fn
+
+    pipeline = (Pipeline(queue_size=1)
+                .stage("split", stage("split", fan_out=True))
+                .stage("middle", stage("middle"), concurrency=3)
+                .stage("last", stage("last")))
+    results = asyncio.run(pipeline.run(pages_of("x", "y", "z"), source_name="source"))
+
+    for item in ("xa", "xb", "ya", "yb", "za", "zb"):
+        order = [seen.index(step) for step in (("split", item[0]), ("middle", item), ("last", item))]
+        assert order == sorted(order), f"FAIL: {item} went through the stages as {order}"
+    assert sorted(results) == ["xa", "xb", "ya", "yb", "za", "zb"], f"FAIL: results {results}"
+    items = {name: s.items for name, s in pipeline.stats.items()}
+    assert items == {"source": 3, "split": 3, "middle": 6, "last": 6}, f"FAIL: items {items}"
+    assert list(pipeline.timings()["stages"]) == ["source", "split", "middle", "last"], "FAIL: stage order"
+    print(f"  PASS: {len(results)} items out, stage counts {items}")
+
+
+# ─────────────────────────────────────────────
+# Test 2: Errors drop one item, not the run
+# ─────────────────────────────────────────────
+def test_stage_errors():
+    """
+    A stage exception drops that item and counts an error; None drops it
+    silently; a failing source ends the input but what it already sent
+    still goes through.
+    """
+    print("TEST 2: Stage and source errors drop items without stopping the run...")
+
+    async def source():
+        for item in (1, 2, 3, 4):
+            yield item
+        raise Exception("feed broke")
+
+    async def check(item):
+        if item == 2:
+            raise Exception("bad item")
+        return None if item == 3 else item
+
+    async def double(item):
+        return item * 2
+
+    pipeline = Pipeline().stage("check", check, concurrency=2).stage("double", double)
+    results = asyncio.run(pipeline.run(source()))
+
+    assert sorted(results) == [2, 8], f"FAIL: results {results}"
+    stats = pipeline.stats
+    assert stats["fetch"].errors == 1 and stats["fetch"].items == 4, f"FAIL: source {stats['fetch']}"
+    assert stats["check"].errors == 1 and stats["check"].items == 3, f"FAIL: check {stats['check']}"
+    assert stats["double"].items == 2 and stats["double"].errors == 0, f"FAIL: double {stats['double']}"
+    print(f"  PASS: results {sorted(results)}, 1 source error and 1 stage error counted")
+
+
+# ─────────────────────────────────────────────
+# Test 3: run_engagement votes, comments and records
+# ─────────────────────────────────────────────
+def test_run_engagement():
+    """
+    Each new post gets one vote; comments stop at max_comments and skip
+    our own posts; everything is recorded, and the used templates are
+    marked posted. Posts already voted on aren't voted again.
+    """
+    print("TEST 3: run_engagement votes, comments and records the results...")
+
+    server = MersoomStandIn()
+    own = {"id": "p4", "title": "내 글", "content": "작업 집중 시간을 늘리는 방법", "nickname": AGENT_NICKNAME}
+    with pipeline_env() as store:
+        mersoom_memory.record_vote("p3", "up", "Already voted")
+        counts, pipeline = engage(server, POSTS[:2], [POSTS[2], own],
+                                  generate_comment=generate_comment, max_comments=2)
+        memory = mersoom_memory.load_memory()
+        used = sum(r["count"] for r in store.usage.values())
+        reserved = len(store._reserved)
+
+    voted = sorted(path.split("/")[2] for _, path, _ in server.requests if path.endswith("/vote"))
+    commented = sorted(server.comments)
+    assert counts == {"voted": 3, "vote_failed": 0, "commented": 2, "comment_failed": 0}, f"FAIL: counts {counts}"
+    assert voted == ["p1", "p2", "p4"], f"FAIL: voted on {voted}"
+    assert len(commented) == 2 and "p4" not in commented, f"FAIL: commented on {commented}"
+    assert set(memory["posts_voted"]) == {"p1", "p2", "p3", "p4"}, f"FAIL: votes {sorted(memory['posts_voted'])}"
+    assert sorted(memory["posts_commented"]) == commented, f"FAIL: comments {sorted(memory['posts_commented'])}"
+    assert used == 2 and reserved == 0, f"FAIL: templates used {used}, reserved {reserved}"
+    assert pipeline.stats["record"].items == 3, f"FAIL: record stage {pipeline.stats['record']}"
+    print(f"  PASS: voted on {voted}, commented on {commented}, templates settled")
+
+
+class FailingTokenPool(TokenPoolStandIn):
+    """PoW that never solves."""
+
+    def get_headers(self, timeout=None):
+        raise Exception("PoW solve timeout")
+
+
+# ─────────────────────────────────────────────
+# Test 4: An item dropped in the pow stage gives back its template
+# ─────────────────────────────────────────────
+def test_pow_failure_releases_template():
+    """When PoW fails the item is dropped and counted, and its reserved template is free again."""
+    print("TEST 4: A PoW failure drops the item and releases its template...")
+
+    server = MersoomStandIn()
+    with pipeline_env() as store:
+        client = make_client(server)
+        client.token_pool = FailingTokenPool()
+        counts, pipeline = engage(server, POSTS[:1], client=client, vote=False,
+                                  generate_comment=generate_comment, max_comments=1)
+        reserved = len(store._reserved)
+        memory = mersoom_memory.load_memory()
+
+    assert pipeline.stats["pow"].errors == 1, f"FAIL: pow stage {pipeline.stats['pow']}"
+    assert not server.writes("/posts/p1/comments"), "FAIL: comment written without PoW"
+    assert reserved == 0, f"FAIL: {reserved} templates still reserved"
+    assert not memory["posts_commented"], f"FAIL: recorded {memory['posts_commented']}"
+    assert counts["commented"] == 0, f"FAIL: counts {counts}"
+    print("  PASS: item dropped in the pow stage, template released")
+
+
+
+# ─────────────────────────────────────────────
+# Test 5: A failed vote isn't recorded, so the next run retries it
+# ─────────────────────────────────────────────
+def test_failed_vote_retried():
+    print("TEST 5: Failed votes are left unrecorded and retried next run...")
+
+    server = MersoomStandIn()
+    server.fail("/posts/p1/vote", (400, {}))
+    with pipeline_env():
+        first, _ = engage(server, POSTS[:1], comment=False)
+        after_failure = dict(mersoom_memory.load_memory()["posts_voted"])
+        second, _ = engage(server, POSTS[:1], comment=False)
+        after_retry = mersoom_memory.load_memory()["posts_voted"]
+
+    assert first["vote_failed"] == 1 and first["voted"] == 0, f"FAIL: first run {first}"
+    assert after_failure == {}, f"FAIL: failed vote recorded as {after_failure}"
+    assert second["voted"] == 1 and len(server.writes("/posts/p1/vote")) == 2, f"FAIL: second run {second}"
+    assert "error" not in after_retry["p1"], f"FAIL: recorded {after_retry['p1']}"
+    print("  PASS: nothing recorded after the failure, the retry went through and was recorded")
+
+
+class LoggingLimiter(RateLimiter):
+    """Rate limiter that logs when each slot is granted."""
+
+    def __init__(self, events, **kwargs):
+        super().__init__(**kwargs)
+        self.events = events
+
+    async def acquire(self, kind):
+        waited = await super().acquire(kind)
+        self.events.append(("slot", kind))
+        return waited
+
+
+class LoggingTokenPool(TokenPoolStandIn):
+    """Token pool stand-in that logs when each token is taken."""
+
+    def __init__(self, events):
+        super().__init__()
+        self.events = events
+
+    def get_headers(self, timeout=None):
+        self.events.append(("token", None))
+        return super().get_headers(timeout)
+
+
+# ─────────────────────────────────────────────
+# Test 6: Tokens are taken after every rate slot of the item
+# ─────────────────────────────────────────────
+def test_slots_before_tokens():
+    """
+    With the comment bucket empty, the item waits for its comment slot
+    before taking any PoW token, so the vote token doesn't age meanwhile.
+    """
+    print("TEST 6: The pow stage waits for all rate slots before taking tokens...")
+
+    events = []
+    server = MersoomStandIn()
+    with pipeline_env():
+        client = make_client(server)
+        client.rate_limiter = LoggingLimiter(events, limits={"comment": (5.0, 1)})
+        client.token_pool = LoggingTokenPool(events)
+        asyncio.run(client.rate_limiter.acquire("comment"))  # Empty the bucket: the next slot is 0.2s off
+        events.clear()
+        counts, _ = engage(server, POSTS[:1], client=client, generate_comment=generate_comment, max_comments=1)
+
+    assert counts["voted"] == 1 and counts["commented"] == 1, f"FAIL: counts {counts}"
+    assert events == [("slot", "vote"), ("slot", "comment"), ("token", None), ("token", None)], f"FAIL: {events}"
+    print("  PASS: vote slot, comment slot, then both tokens")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Mersoom Pipeline Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_stage_order,
+        test_stage_errors,
+        test_run_engagement,
+        test_pow_failure_releases_template,
+        test_failed_vote_retried,
+        test_slots_before_tokens,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
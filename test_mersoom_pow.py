@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Tests for the Mersoom PoW solver: the midstate/suffix nonce search, the
+process pool's frontier and the shared stop event, the prefetching token
+pool and the solve-time histogram. Challenges are made up locally, so no
+network is needed.
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from mersoom_pow import (SUFFIX_SPAN, PowResult, PowSolver, PowTokenPool, SolveHistogram, _legacy_search,
+                         _search_range, load_pow_stats)
+
+NEVER = "f" * 64  # Target no digest matches, so a solve can only time out
+
+
+def valid(seed, nonce, target_prefix):
+    return hashlib.sha256(f"{seed}{nonce}".encode()).hexdigest().startswith(target_prefix)
+
+
+def make_solver(workers=1, **kwargs):
+    """Solver whose solve-time stats stay in memory."""
+    return PowSolver(workers=workers, histogram=SolveHistogram(path="/nonexistent/pow_stats.json"), **kwargs)
+
+
+# ─────────────────────────────────────────────
+# Test 1: The midstate search finds the same nonce as the plain loop
+# ─────────────────────────────────────────────
+def test_search_matches_legacy():
+    """
+    For even and odd (nibble) prefixes, _search_range returns the first
+    nonce whose sha256(seed + nonce) starts with target_prefix, across the
+    high/suffix block boundaries.
+    """
+    print("TEST 1: Midstate search agrees with sha256(seed + nonce)...")
+
+    checked = 0
+    for i in range(6):
+        seed = f"seed-{i}"
+        for target_prefix in ("00", "abc"):
+            expected, _ = _legacy_search(seed, target_prefix, 1 << 20)
+            nonce, attempts, _, _ = _search_range(seed, target_prefix, 0, 1 << 20)
+            assert nonce == expected, f"FAIL: {seed}/{target_prefix}: {nonce} != {expected}"
+            assert attempts == nonce + 1, f"FAIL: {attempts} attempts for nonce {nonce}"
+            assert valid(seed, nonce, target_prefix), f"FAIL: {nonce} doesn't solve {seed}/{target_prefix}"
+            checked += 1
+
+    # A range that starts mid-block and crosses into the next one
+    seed, target_prefix = "boundary", "0"
+    start = SUFFIX_SPAN - 3
+    expected = next(n for n in range(start, start + 10_000) if valid(seed, n, target_prefix))
+    nonce, _, _, _ = _search_range(seed, target_prefix, start, start + 10_000)
+    assert nonce == expected, f"FAIL: from {start}: {nonce} != {expected}"
+    print(f"  PASS: {checked} challenges plus a block-crossing range match the plain loop")
+
+
+# ─────────────────────────────────────────────
+# Test 2: Single-core and pool solves return valid nonces
+# ─────────────────────────────────────────────
+def test_solve_small_prefix():
+    """solve() on a small-prefix challenge returns a nonce with sha256(seed + nonce) under the target."""
+    print("TEST 2: Single-core and multi-core solves return valid nonces...")
+
+    seed, target_prefix = "small-challenge", "000"
+    single = make_solver(workers=1)
+    result = single.solve(seed, target_prefix, timeout=30)
+    assert result.mode == "single", f"FAIL: mode {result.mode}"
+    assert result.nonce is not None and valid(seed, result.nonce, target_prefix), f"FAIL: nonce {result.nonce}"
+
+    pool = make_solver(workers=2, chunk_size=2_000)
+    try:
+        assert pool.start(), "FAIL: pool didn't start"
+        pool.single_core_rate = 1.0  # Pretend hashing is slow so the pool is used
+        multi = pool.solve(seed, target_prefix, timeout=30)
+    finally:
+        pool.close()
+    assert multi.mode == "multi", f"FAIL: mode {multi.mode}"
+    assert multi.nonce is not None and valid(seed, multi.nonce, target_prefix), f"FAIL: nonce {multi.nonce}"
+    assert len(multi.worker_rates) >= 1, f"FAIL: worker rates {multi.worker_rates}"
+    print(f"  PASS: single nonce {result.nonce}, pool nonce {multi.nonce} ({len(multi.worker_rates)} workers)")
+
+
+# ─────────────────────────────────────────────
+# Test 3: A solve that runs out of time stops and returns None
+# ─────────────────────────────────────────────
+def test_solve_timeout():
+    """
+    An unsolvable challenge returns nonce None soon after the timeout, in
+    both modes. In the pool the stop event ends ranges far larger than the
+    timeout allows, and the checkpoint resumes from the searched frontier.
+    """
+    print("TEST 3: Solves stop on timeout and return None...")
+
+    single = make_solver(workers=1)
+    started = time.monotonic()
+    result = single.solve("timeout", NEVER, timeout=0.2)
+    single_elapsed = time.monotonic() - started
+    assert result.nonce is None, f"FAIL: single solve returned {result.nonce}"
+    assert single_elapsed < 1.0, f"FAIL: single solve ran {single_elapsed:.2f}s"
+    assert single.checkpoint("timeout", NEVER) == result.next_nonce > 0, "FAIL: no checkpoint"
+
+    # Each range would take many seconds; only the stop event ends it early
+    pool = make_solver(workers=2, chunk_size=50_000_000)
+    try:
+        assert pool.start(), "FAIL: pool didn't start"
+        pool.single_core_rate = 1.0
+        started = time.monotonic()
+        multi = pool.solve("timeout", NEVER, timeout=0.3)
+        pool_elapsed = time.monotonic() - started
+    finally:
+        pool.close()
+    assert multi.mode == "multi" and multi.nonce is None, f"FAIL: {multi.mode} solve returned {multi.nonce}"
+    assert pool_elapsed < 2.0, f"FAIL: pool solve ran {pool_elapsed:.2f}s after a 0.3s timeout"
+    assert 0 < multi.next_nonce <= multi.attempts, f"FAIL: frontier {multi.next_nonce} of {multi.attempts} searched"
+    print(f"  PASS: None after {single_elapsed:.2f}s single-core and {pool_elapsed:.2f}s in the pool "
+          f"(resume at {multi.next_nonce})")
+
+
+class ChallengeStandIn:
+    """Numbered POST /challenge responses with an easy target."""
+
+    def __init__(self):
+        self.fetched = 0
+        self.seeds = {}  # token -> seed
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.fetched += 1
+            token = f"t{self.fetched}"
+        self.seeds[token] = f"seed-{token}"
+        return {"token": token, "challenge": {"seed": self.seeds[token], "target_prefix": "0"}}
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+# ─────────────────────────────────────────────
+# Test 4: The token pool refills after tokens are taken
+# ─────────────────────────────────────────────
+def test_token_pool_refill():
+    """The pool fills to `size` solved tokens, and taking one makes it fetch and solve another."""
+    print("TEST 4: Token pool fills up and refills after a get()...")
+
+    challenges = ChallengeStandIn()
+    pool = PowTokenPool(challenges, size=2, ttl=30, solver=make_solver())
+    try:
+        pool.start()
+        assert wait_until(lambda: len(pool._ready) == 2), f"FAIL: pool holds {len(pool._ready)} tokens"
+        time.sleep(0.1)
+        assert challenges.fetched == 2, f"FAIL: fetched {challenges.fetched} challenges for a pool of 2"
+
+        token = pool.get(timeout=1)
+        assert valid(challenges.seeds[token.token], token.proof, "0"), f"FAIL: bad proof {token.proof}"
+        assert wait_until(lambda: len(pool._ready) == 2), "FAIL: pool didn't refill"
+    finally:
+        pool.close()
+    assert pool.stats["solved"] == 3 and pool.stats["served"] == 1, f"FAIL: stats {pool.stats}"
+    print(f"  PASS: {pool.stats['solved']} tokens solved, {pool.stats['served']} served, pool back to 2")
+
+
+# ─────────────────────────────────────────────
+# Test 5: Expired tokens are dropped and replaced
+# ─────────────────────────────────────────────
+def test_token_pool_expiry():
+    """Tokens older than the TTL are never served; the prefetcher replaces them with fresh ones."""
+    print("TEST 5: Expired tokens are dropped and replaced...")
+
+    challenges = ChallengeStandIn()
+    pool = PowTokenPool(challenges, size=2, ttl=0.3, solver=make_solver())
+    try:
+        pool.start()
+        assert wait_until(lambda: len(pool._ready) == 2), "FAIL: pool didn't fill"
+        first = {t.token for t in pool._ready}
+        time.sleep(0.5)  # Both first tokens have expired by now
+        token = pool.get(timeout=1)
+    finally:
+        pool.close()
+    assert token.token not in first, f"FAIL: served expired token {token.token}"
+    assert not token.expired(), "FAIL: served token already expired"
+    assert pool.stats["expired"] >= 2, f"FAIL: stats {pool.stats}"
+    print(f"  PASS: {pool.stats['expired']} tokens expired, served fresh {token.token}")
+
+
+# ─────────────────────────────────────────────
+# Test 6: Solve-time histogram buckets and merges into the stats file
+# ─────────────────────────────────────────────
+def test_histogram_flush():
+    """
+    Solves are counted per day and difficulty into time buckets, timeouts
+    separately; flush() adds them to what the file already holds and
+    leaves no temp file behind.
+    """
+    print("TEST 6: Solve histogram buckets solves and merges flushes...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pow_stats.json")
+        histogram = SolveHistogram(path)
+        histogram.record("000", PowResult(nonce=1, attempts=4000, elapsed=0.03))
+        histogram.record("000", PowResult(nonce=2, attempts=5000, elapsed=0.2))
+        histogram.record("0000", PowResult(nonce=None, attempts=90000, elapsed=1.0))
+        histogram.flush()
+
+        histogram.record("000", PowResult(nonce=3, attempts=3000, elapsed=0.04))
+        histogram.flush()
+        assert histogram.days == {}, "FAIL: recorded solves kept after flush"
+
+        stats = load_pow_stats(path)
+        leftovers = [name for name in os.listdir(directory) if name != "pow_stats.json"]
+
+    (day, difficulties), = stats.items()
+    three, four = difficulties["3"], difficulties["4"]
+    assert three["count"] == 3 and three["attempts_total"] == 12000, f"FAIL: difficulty 3 {three}"
+    assert three["buckets"] == {"<=0.05s": 2, "<=0.25s": 1}, f"FAIL: buckets {three['buckets']}"
+    assert four["count"] == 0 and four["timeouts"] == 1, f"FAIL: difficulty 4 {four}"
+    assert leftovers == [], f"FAIL: left {leftovers} behind"
+    print(f"  PASS: {day}: {three['count']} solves in {len(three['buckets'])} buckets, {four['timeouts']} timeout")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Mersoom PoW Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_search_matches_legacy,
+        test_solve_small_prefix,
+        test_solve_timeout,
+        test_token_pool_refill,
+        test_token_pool_expiry,
+        test_histogram_flush,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for the hashed n-gram vote scorer (mersoom_scorer): training and
+prediction on a toy set, the model file round trip, and which vote
+history records become training labels. Files live in a temporary
+directory.
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+
+from mersoom_scorer import NgramScorer, load_vote_history
+
+SPAM = [
+    {"title": "코인 무료 click here", "content": "make money 지금 바로 코인 받기"},
+    {"title": "make money fast", "content": "click here 코인 이벤트 참여"},
+    {"title": "사칭 이벤트 코인", "content": "무료 코인 click here 링크"},
+    {"title": "코인 click here now", "content": "make money make money 코인"},
+]
+GOOD = [
+    {"title": "작업을 10분 단위로 쪼개기", "content": "집중이 안 될 때 작은 단위로 시작하는 방법을 정리했습니다"},
+    {"title": "로그 분석 팁", "content": "jq와 awk로 로그를 정리하는 구조를 공유합니다"},
+    {"title": "겨울 아침 생각", "content": "고요한 아침에 하루 계획을 정리하는 경험"},
+    {"title": "배포 체크리스트", "content": "배포 전에 확인하는 설계 원칙과 시스템 구조"},
+]
+
+
+# ─────────────────────────────────────────────
+# Test 1: A model trained on a toy set separates it
+# ─────────────────────────────────────────────
+def test_train_predict():
+    """Training on spam/normal posts labels them, and unseen posts like them, correctly."""
+    print("TEST 1: Training and prediction on a toy set...")
+
+    scorer = NgramScorer.train(SPAM + GOOD, ["down"] * len(SPAM) + ["up"] * len(GOOD), n_features=2 ** 12)
+    predicted = scorer.predict(SPAM + GOOD)
+    assert predicted == ["down"] * len(SPAM) + ["up"] * len(GOOD), f"FAIL: predicted {predicted}"
+
+    unseen = [{"title": "click here 코인", "content": "make money 무료"},
+              {"title": "집중 작업 방법", "content": "작은 단위로 시작하는 계획을 공유합니다"}]
+    assert scorer.predict(unseen) == ["down", "up"], f"FAIL: unseen {scorer.probabilities(unseen)}"
+    assert scorer.predict([]) == [], "FAIL: empty page"
+    print(f"  PASS: {len(predicted)} training posts and 2 unseen posts labelled correctly")
+
+
+# ─────────────────────────────────────────────
+# Test 2: Training needs both classes
+# ─────────────────────────────────────────────
+def test_train_needs_both_classes():
+    print("TEST 2: Training on one class is refused...")
+
+    try:
+        NgramScorer.train(GOOD, ["up"] * len(GOOD), n_features=2 ** 12)
+    except Exception as e:
+        assert "both" in str(e), f"FAIL: unexpected error {e}"
+    else:
+        assert False, "FAIL: trained on 'up' examples only"
+    print("  PASS: refused with a message")
+
+
+# ─────────────────────────────────────────────
+# Test 3: The saved model scores the same after loading
+# ─────────────────────────────────────────────
+def test_save_load():
+    print("TEST 3: Saved models load with the same weights and digest...")
+
+    scorer = NgramScorer.train(SPAM + GOOD, ["down"] * len(SPAM) + ["up"] * len(GOOD), n_features=2 ** 12)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "scorer.npz")
+        scorer.save(path)
+        loaded = NgramScorer.load(path)
+
+    assert loaded.digest == scorer.digest, f"FAIL: digest {loaded.digest} != {scorer.digest}"
+    assert loaded.predict(SPAM + GOOD) == scorer.predict(SPAM + GOOD), "FAIL: predictions changed"
+    print(f"  PASS: digest {loaded.digest} after the round trip")
+
+
+# ─────────────────────────────────────────────
+# Test 4: Failed votes aren't training labels
+# ─────────────────────────────────────────────
+def test_history_skips_failed_votes():
+    """
+    Votes from logs, the memory file and archives become labels; records
+    with `error` set (the vote never went through) are left out.
+    """
+    print("TEST 4: Vote history skips failed votes...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        log = os.path.join(directory, "run.jsonl")
+        with open(log, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"post_id": "p1", "vote": "down", "title": "코인 click here"}) + "\n")
+            f.write(json.dumps({"post_id": "p2", "vote": "up", "title": "실패한 투표", "error": "HTTP 500"}) + "\n")
+        memory = os.path.join(directory, "memory.json")
+        with open(memory, "w", encoding="utf-8") as f:
+            json.dump({"posts_voted": {
+                "p3": {"vote": "up", "title": "로그 분석 팁"},
+                "p4": {"vote": "down", "title": "rate limited", "error": "429"},
+            }}, f)
+        archive = os.path.join(directory, "2026-09.jsonl.gz")
+        with gzip.open(archive, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"collection": "posts_voted", "id": "p5",
+                                "record": {"vote": "up", "title": "겨울 아침 생각"}}) + "\n")
+            f.write(json.dumps({"collection": "posts_voted", "id": "p6",
+                                "record": {"vote": "up", "title": "timeout", "error": "timed out"}}) + "\n")
+
+        posts, labels = load_vote_history([log, memory, archive])
+
+    titles = dict(zip((p["title"] for p in posts), labels))
+    assert titles == {"코인 click here": "down", "로그 분석 팁": "up", "겨울 아침 생각": "up"}, f"FAIL: {titles}"
+    print(f"  PASS: {len(posts)} labels kept, 3 failed votes skipped")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Mersoom N-gram Scorer Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_train_predict,
+        test_train_needs_both_classes,
+        test_save_load,
+        test_history_skips_failed_votes,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for shared_state: the three-way merge of JSON values and
+StateFile's merge-on-save when another process wrote in between. State
+files live in a temporary directory.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from shared_state import VERSION_KEY, StateFile, merge3
+
+
+# ─────────────────────────────────────────────
+# Test 1: Dicts merge key by key
+# ─────────────────────────────────────────────
+def test_merge3_dicts():
+    """Both sides' additions and deletions survive; on a scalar both changed, ours wins."""
+    print("TEST 1: merge3 merges dicts key by key...")
+
+    base = {"voted": {"p1": "up"}, "notes": "old", "last_run": "t0", "ours_gone": 1, "theirs_gone": 2}
+    ours = {"voted": {"p1": "up", "p2": "down"}, "notes": "ours", "last_run": "t1", "theirs_gone": 2}
+    theirs = {"voted": {"p1": "up", "p3": "up"}, "notes": "theirs", "last_run": "t0", "ours_gone": 1, "new": 3}
+
+    merged = merge3(base, ours, theirs)
+    assert merged["voted"] == {"p1": "up", "p2": "down", "p3": "up"}, f"FAIL: voted {merged['voted']}"
+    assert merged["notes"] == "ours", f"FAIL: conflicting scalar {merged['notes']!r}"
+    assert merged["last_run"] == "t1", f"FAIL: last_run {merged['last_run']!r}"
+    assert "ours_gone" not in merged, "FAIL: key we deleted came back"
+    assert "theirs_gone" not in merged, "FAIL: key they deleted came back"
+    assert merged["new"] == 3, f"FAIL: {merged}"
+    print(f"  PASS: merged to {sorted(merged)}")
+
+
+# ─────────────────────────────────────────────
+# Test 2: Lists keep both sides' additions and removals
+# ─────────────────────────────────────────────
+def test_merge3_lists():
+    """Items appended on either side are kept once; items either side removed stay removed."""
+    print("TEST 2: merge3 merges lists by item...")
+
+    base = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+    ours = [{"id": "a"}, {"id": "c"}, {"id": "d"}]  # Removed b, added d
+    theirs = [{"id": "b"}, {"id": "c"}, {"id": "e"}, {"id": "d"}]  # Removed a, added e and d
+
+    merged = [x["id"] for x in merge3(base, ours, theirs)]
+    assert merged == ["c", "e", "d"], f"FAIL: merged {merged}"
+    print(f"  PASS: merged to {merged}")
+
+
+# ─────────────────────────────────────────────
+# Test 3: A save after another process's save merges instead of overwriting
+# ─────────────────────────────────────────────
+def test_version_conflict():
+    """
+    Two runners load the same file; the second to save sees the moved
+    _version and merges, so neither runner's records are lost.
+    """
+    print("TEST 3: Concurrent saves are merged on the _version conflict path...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.json")
+        default = {"posts_voted": {}, "posts_created": []}
+        first, second = StateFile(path, default), StateFile(path, default)
+        ours, theirs = first.load(), second.load()
+
+        theirs["posts_voted"]["p2"] = {"vote": "down"}
+        theirs["posts_created"].append({"id": "x2"})
+        second.save(theirs)
+
+        ours["posts_voted"]["p1"] = {"vote": "up"}
+        ours["posts_created"].append({"id": "x1"})
+        saved = first.save(ours)
+
+        with open(path) as f:
+            on_disk = json.load(f)
+        leftovers = sorted(os.listdir(directory))
+
+    assert first.merges == 1 and second.merges == 0, f"FAIL: merges {first.merges}/{second.merges}"
+    assert on_disk == saved, "FAIL: save() returned something other than what it wrote"
+    assert on_disk[VERSION_KEY] == 2, f"FAIL: version {on_disk[VERSION_KEY]}"
+    assert set(on_disk["posts_voted"]) == {"p1", "p2"}, f"FAIL: posts_voted {on_disk['posts_voted']}"
+    assert on_disk["posts_created"] == [{"id": "x2"}, {"id": "x1"}], f"FAIL: posts_created {on_disk['posts_created']}"
+    assert leftovers == ["state.json", "state.json.lock"], f"FAIL: files {leftovers}"
+    print(f"  PASS: version {on_disk[VERSION_KEY]} holds both runners' votes and posts")
+
+
+# ─────────────────────────────────────────────
+# Test 4: A hand edit without a version bump is merged too
+# ─────────────────────────────────────────────
+def test_hand_edit_merged():
+    """The content comparison catches edits that didn't touch _version."""
+    print("TEST 4: Hand edits that keep _version are merged, not overwritten...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.json")
+        state = StateFile(path)
+        with state.edit() as data:
+            data["notes"] = "from the runner"
+        data = state.load()
+
+        with open(path) as f:
+            edited = json.load(f)
+        edited["manual"] = "from an editor"
+        with open(path, "w") as f:
+            json.dump(edited, f)
+
+        data["last_run"] = "now"
+        saved = state.save(data)
+
+    assert state.merges == 1, f"FAIL: merges {state.merges}"
+    assert saved["manual"] == "from an editor" and saved["last_run"] == "now", f"FAIL: saved {saved}"
+    print(f"  PASS: saved {sorted(k for k in saved if k != VERSION_KEY)} at version {saved[VERSION_KEY]}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Shared State Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_merge3_dicts,
+        test_merge3_lists,
+        test_version_conflict,
+        test_hand_edit_merged,
+    ]
+
+    passed = 0
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            failed += 1
+        print()
+
+    print("=" * 60)
+    print(f"Results: {passed}/{len(tests)} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)